@@ -1,3 +1,3 @@
 
-
+python trimUiImports.py
 pyinstaller obeliscaDivergencia.spec
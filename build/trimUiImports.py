@@ -0,0 +1,89 @@
+"""
+Trims the PySide6 imports in the Ui_*.py files generated by pyside6-uic.
+
+pyside6-uic always emits the same wide QtCore/QtGui/QtWidgets imports, regardless of
+which names the form actually uses. This script rewrites each of those imports so that
+it only lists the names referenced in the rest of the file, and drops it if none are.
+It also lifts QSize(...) literals that occur more than once into module-level constants,
+so setupUi does not construct the same size over and over.
+Run it after regenerating the UI files:
+
+    pyside6-uic mainWindow.ui -o Ui_mainWindow.py
+    python build/trimUiImports.py
+"""
+
+import io
+import os
+import re
+import sys
+import glob
+import tokenize
+
+IMPORT_PATTERN = re.compile(r"^from (PySide6\.\w+) import \((?P<names>[^)]*)\)\n", re.MULTILINE)
+SIZE_PATTERN = re.compile(r"\bQSize\((\d+), (\d+)\)")
+CLASS_PATTERN = re.compile(r"^class ", re.MULTILINE)
+DEFAULT_GUI_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "obeliscaDivergencia", "gui")
+
+
+def usedNames(source: str) -> set:
+    """
+    Returns all identifiers referenced in the given source.
+    """
+    tokens = tokenize.generate_tokens(io.StringIO(source).readline)
+    return {token.string for token in tokens if token.type == tokenize.NAME}
+
+
+def formatImport(module: str, names: list) -> str:
+    """
+    Formats an import statement the way pyside6-uic does, four names per line.
+    """
+    lines = [", ".join(names[i:i + 4]) for i in range(0, len(names), 4)]
+    return "from %s import (%s)\n" % (module, ",\n    ".join(lines))
+
+
+def trimImports(source: str) -> str:
+    """
+    Returns the source with every wide PySide6 import reduced to the names actually used.
+    """
+    body = IMPORT_PATTERN.sub("", source)
+    referenced = usedNames(body)
+
+    def replace(match):
+        names = [name.strip() for name in match.group("names").split(",") if name.strip()]
+        keep = [name for name in names if name in referenced]
+        return formatImport(match.group(1), keep) if keep else ""
+
+    return IMPORT_PATTERN.sub(replace, source)
+
+
+def hoistRepeatedSizes(source: str) -> str:
+    """
+    Returns the source with every QSize(w, h) literal used more than once replaced by a shared constant.
+    """
+    counts = {}
+    for match in SIZE_PATTERN.finditer(source):
+        counts[match.groups()] = counts.get(match.groups(), 0) + 1
+    repeated = [size for size, count in counts.items() if count > 1]
+    if not repeated:
+        return source
+
+    source = SIZE_PATTERN.sub(lambda m: "_SIZE_%s_%s" % m.groups() if m.groups() in repeated else m.group(0), source)
+    constants = "".join("_SIZE_%s_%s = QSize(%s, %s)\n" % (w, h, w, h) for w, h in repeated)
+    classStart = CLASS_PATTERN.search(source).start()
+    return source[:classStart] + constants + "\n" + source[classStart:]
+
+
+def main(guiDir: str = DEFAULT_GUI_DIR):
+    for filePath in sorted(glob.glob(os.path.join(guiDir, "Ui_*.py"))):
+        with open(filePath, "r", encoding="utf-8", newline="") as fileHandle:
+            source = fileHandle.read()
+        newline = "\r\n" if "\r\n" in source else "\n"
+        trimmed = hoistRepeatedSizes(trimImports(source.replace("\r\n", "\n")))
+        if trimmed != source.replace("\r\n", "\n"):
+            with open(filePath, "w", encoding="utf-8", newline=newline) as fileHandle:
+                fileHandle.write(trimmed)
+            print(f"Post-processed {filePath}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -1,36 +1,125 @@
+import io
 import os
+import functools
+import shutil
 import logging
-from typing import Optional, Dict
-from docx import Document
-from pdfminer.high_level import extract_text
+import threading
+import zipfile
+from operator import attrgetter
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Tuple, Callable, Iterator
+from lxml import etree
 import tiktoken
 
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # pypdfium2 is optional; pdfminer is used instead.
+    pdfium = None
+
 from obeliscaDivergencia.config import initOpenAiClient
 from obeliscaDivergencia.utils.database import ConversationDatabase
+from obeliscaDivergencia.utils.fileUtils import walkFiles
+
+# Encoding used for deployments whose model tiktoken does not know.
+DEFAULT_ENCODING = "cl100k_base"
+
+# Start of the message returned (or yielded) in place of a reply when the API call fails.
+API_ERROR_PREFIX = "Error during API call"
+
+# Module logger for the per-file messages of directory walks, which are only formatted when DEBUG is enabled.
+_log = logging.getLogger(__name__)
+
+# PDFium is not thread-safe, and attachments are read on several threads: every use of it holds this lock.
+_pdfiumLock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=8)
+def _encodingFor(deploymentName: str) -> "tiktoken.Encoding":
+    """
+    Returns the tokenizer for the model behind a deployment. Encodings are stateless and thread-safe,
+    so one instance per model is shared by all chat sessions.
+
+    Args:
+        deploymentName (str): The deployment name, which usually is the model name (e.g. "gpt-4o").
+
+    Returns:
+        tiktoken.Encoding: The model's encoding, or DEFAULT_ENCODING for unknown models.
+    """
+    try:
+        encodingName = tiktoken.encoding_name_for_model(deploymentName)
+    except KeyError:
+        encodingName = DEFAULT_ENCODING
+    logging.info("Using tokenizer %s for deployment %s.", encodingName, deploymentName)
+    return tiktoken.get_encoding(encodingName)
+
+
+def _openDocxDocument(filePath: str):
+    """
+    Opens a DOCX file with python-docx. The package is only imported here, since it is
+    merely the fallback of the direct XML extraction and slow to import.
+    """
+    from docx import Document
+
+    return Document(filePath)
+
+
+def _extractPdfTextWithPdfminer(filePath: str, maxPages: int) -> str:
+    """
+    Extracts the text of the first maxPages pages of a PDF file with pdfminer, which is
+    only imported here, since it is merely the fallback of PDFium and slow to import.
+    """
+    from pdfminer.high_level import extract_text
+
+    return extract_text(filePath, maxpages=maxPages)
 
 
 class ChatSession:
-    FOLDER_BLACKLIST = (".git", ".github", ".svn", ".idea", ".vscode", "__pycache__")
-    # List of file extensions that are considered binary.
-    BINARY_EXTENSIONS = (
-        ".png",
-        ".jpg",
-        ".jpeg",
-        ".gif",
-        ".bmp",
-        ".zip",
-        ".tar",
-        ".gz",
-        ".url",
-        ".db",
-        ".sqlite",
-        ".exe",
-        ".dll",
-        ".pyd",
+    # Frozensets, since both are tested once per file/folder while walking directories.
+    FOLDER_BLACKLIST = frozenset({".git", ".github", ".svn", ".idea", ".vscode", "__pycache__"})
+    # Lower-case file extensions that are considered binary.
+    BINARY_EXTENSIONS = frozenset(
+        {
+            ".png",
+            ".jpg",
+            ".jpeg",
+            ".gif",
+            ".bmp",
+            ".zip",
+            ".tar",
+            ".gz",
+            ".url",
+            ".db",
+            ".sqlite",
+            ".exe",
+            ".dll",
+            ".pyd",
+        }
     )
 
     FILE_MARKER_START = "<|file|>"
     FILE_MARKER_END = "<|/file|>"
+    # WordprocessingML elements read by extractTextFromDocx.
+    DOCX_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+    DOCX_TEXT = DOCX_NAMESPACE + "t"
+    DOCX_TAB = DOCX_NAMESPACE + "tab"
+    DOCX_BREAKS = frozenset({DOCX_NAMESPACE + "br", DOCX_NAMESPACE + "cr"})
+    # Block size used when copying text files into the attachment buffer.
+    READ_BLOCK_SIZE = 64 * 1024
+    # Limits of the cache of file contents read for attachments (entries and total characters).
+    FILE_CACHE_MAX_ENTRIES = 512
+    FILE_CACHE_MAX_CHARS = 256 * 1024 * 1024
+    # Below this number of files, reading them one after another is cheaper than starting a thread pool.
+    PARALLEL_READ_THRESHOLD = 8
+    # Lower-case extensions of the files whose text is extracted by a parser, which takes far longer than reading
+    # a text file; two or more files are read concurrently as soon as one of them is such a document.
+    # PDFs are not among them: PDFium reads only one document at a time, so they gain nothing from the pool.
+    DOCUMENT_EXTENSIONS = frozenset({".docx"})
+    # Outcomes of _readFile, counted for the summary logged by readFilesContent.
+    READ_OK = "read"
+    READ_BINARY = "binary"
+    READ_OVERSIZE = "oversize"
+    READ_FAILED = "failed"
 
     def __init__(
         self,
@@ -58,10 +147,22 @@ class ChatSession:
         self.lastTotalTokens = 0  # Attribute to hold the total tokens from API response.
         # Set a file size limit of 5MB per file.
         self.maxFileSize = 5 * 1024 * 1024
+        # Only the first pages of a PDF are extracted.
+        self.maxPdfPages = 200
+        # LRU cache of wrapped file contents: (filePath, baseDir) -> ((mtime, size), content).
+        # Files are read from a thread pool, hence the lock.
+        self._fileCache: OrderedDict = OrderedDict()
+        self._fileCacheChars = 0
+        self._fileCacheLock = threading.Lock()
         # Set maximum context tokens (e.g., 4096 for GPT-3.5)
         self.maxContextTokens = maxContextTokens
         # Initialize the tokenizer
-        self.encoding = tiktoken.get_encoding("cl100k_base")  # Use appropriate encoding
+        self.encoding = _encodingFor(self.deploymentName)
+        # Token count per message content, so that messages are encoded only once.
+        self._tokenCounts: Dict[str, int] = {}
+        # Number of messages removed by trimConversationHistory, so callers can tell whether the history
+        # only grew at the end since they last looked at it.
+        self.trimmedMessageCount = 0
         logging.info("Initialized new chat session with system prompt and deployment: %s.", self.deploymentName)
 
         self.conversationId = conversationId
@@ -75,75 +176,208 @@ class ChatSession:
             conversationHistory (list): The conversation history to load.
         """
         self.conversationHistory = conversationHistory
+        # Encode all messages in one call; tiktoken tokenizes a batch in parallel.
+        contents = [message.get("content", "") for message in conversationHistory]
+        encoded = self.encoding.encode_batch(contents)
+        self._tokenCounts = {content: len(tokens) for content, tokens in zip(contents, encoded)}
         logging.info("Loaded existing conversation history into ChatSession.")
 
     def extractTextFromDocx(self, filePath: str) -> str:
+        """
+        Extracts the paragraph text of a DOCX file.
+        The text nodes are read straight from word/document.xml; python-docx, which builds a
+        full object model of the document, is only used if that fails.
+        """
         try:
-            doc = Document(filePath)
-            return "\n".join([para.text for para in doc.paragraphs])
+            return self._extractDocxParagraphs(filePath)
         except Exception as e:
-            logging.error(f"Error extracting text from DOCX: {e}")
+            logging.info("Fast DOCX extraction failed, using python-docx: %s", e)
+        try:
+            doc = _openDocxDocument(filePath)
+            return "\n".join(map(attrgetter("text"), doc.paragraphs))
+        except Exception as e:
+            logging.error("Error extracting text from DOCX: %s", e)
             return ""
 
+    def _extractDocxParagraphs(self, filePath: str) -> str:
+        """
+        Returns the text of the top-level paragraphs of a DOCX file, one paragraph per line,
+        like python-docx's Document.paragraphs.
+        """
+        with zipfile.ZipFile(filePath) as archive:
+            # Entities in the user's file are never expanded, as with python-docx's parser. A parser is
+            # created per call, since lxml parsers must not be shared between the reading threads.
+            parser = etree.XMLParser(resolve_entities=False)
+            root = etree.fromstring(archive.read("word/document.xml"), parser)
+        body = root.find(self.DOCX_NAMESPACE + "body")
+        paragraphs = []
+        for paragraph in body.iterchildren(self.DOCX_NAMESPACE + "p"):
+            parts = []
+            for element in paragraph.iter(self.DOCX_TEXT, self.DOCX_TAB, *self.DOCX_BREAKS):
+                if element.tag == self.DOCX_TEXT:
+                    parts.append(element.text or "")
+                elif element.tag == self.DOCX_TAB:
+                    parts.append("\t")
+                else:
+                    parts.append("\n")
+            paragraphs.append("".join(parts))
+        return "\n".join(paragraphs)
+
     def extractTextFromPdf(self, filePath: str) -> str:
+        """
+        Extracts the text of the first maxPdfPages pages of a PDF file.
+        Uses PDFium (pypdfium2) if it is installed, which is much faster than pdfminer;
+        pdfminer remains the fallback.
+        """
+        if pdfium is not None:
+            try:
+                return self._extractPdfTextWithPdfium(filePath)
+            except Exception as e:
+                logging.info("PDFium extraction failed, using pdfminer: %s", e)
         try:
-            text = extract_text(filePath)
+            text = _extractPdfTextWithPdfminer(filePath, self.maxPdfPages)
             return text
         except Exception as e:
-            logging.error(f"Error extracting text from PDF: {e}")
+            logging.error("Error extracting text from PDF: %s", e)
             return ""
 
-    def _readSingleFile(self, filePath: str, baseDir: Optional[str] = None) -> str:
+    def _extractPdfTextWithPdfium(self, filePath: str) -> str:
+        """
+        Returns the text of the first maxPdfPages pages of a PDF file, extracted with PDFium.
+        Only one thread at a time opens, reads and closes a document.
+        """
+        with _pdfiumLock:
+            pdf = pdfium.PdfDocument(filePath)
+            try:
+                parts = []
+                for pageIndex in range(min(len(pdf), self.maxPdfPages)):
+                    page = pdf[pageIndex]
+                    textPage = page.get_textpage()
+                    parts.append(textPage.get_text_range())
+                    textPage.close()
+                    page.close()
+                return "\n".join(parts)
+            finally:
+                pdf.close()
+
+    def _readSingleFile(self, filePath: str, baseDir: Optional[str] = None, entry: Optional[os.DirEntry] = None) -> str:
         """
         Attempts to read a single file. If the file is too large,
         has a binary extension, or fails to decode (non-UTF8), it returns an empty string.
         If a baseDir is provided (for files inside a directory), the file’s relative
-        path is used in the output header.
+        path is used in the output header. If the DirEntry from a directory scan is passed,
+        its (cached) stat result is used for the size check.
+        Results are cached until the file's modification time or size changes.
+        """
+        return self._readFile(filePath, baseDir, entry)[1]
+
+    def _readFile(self, filePath: str, baseDir: Optional[str] = None, entry: Optional[os.DirEntry] = None) -> Tuple[str, str]:
         """
+        Reads a single file like _readSingleFile, but also returns the outcome (one of the READ_* constants).
+        Per-file progress is logged at DEBUG level only; readFilesContent logs a summary instead.
+        """
+        debug = _log.isEnabledFor(logging.DEBUG)
         try:
-            fileSize = os.path.getsize(filePath)
+            ext = os.path.splitext(filePath)[1].lower()
+            if ext in self.BINARY_EXTENSIONS:
+                if debug:
+                    _log.debug("Skipping binary file: %s", filePath)
+                return self.READ_BINARY, ""
+
+            fileStat = entry.stat() if entry is not None else os.stat(filePath)
+            fileSize = fileStat.st_size
             if fileSize > self.maxFileSize:
                 logging.warning("File %s is too large (%d bytes) and will be skipped.", filePath, fileSize)
-                return ""
-
-            lowerFilePath = filePath.lower()
-
-            if lowerFilePath.endswith(self.BINARY_EXTENSIONS):
-                logging.info("Skipping binary file: %s", filePath)
-                return ""
-            elif lowerFilePath.endswith(".docx"):
-                logging.info("Processing DOCX file: %s", filePath)
-                fileContent = self.extractTextFromDocx(filePath)
-            elif lowerFilePath.endswith(".pdf"):
-                logging.info("Processing PDF file: %s", filePath)
-                fileContent = self.extractTextFromPdf(filePath)
-            else:
-                with open(filePath, "r", encoding="utf-8") as fileHandle:
-                    fileContent = fileHandle.read()
-
-            if baseDir:
-                relativePath = os.path.relpath(filePath, baseDir)
-                header = f"\n{self.FILE_MARKER_START}[Content from {baseDir}/{relativePath}]:\n"
-                footer = f"{self.FILE_MARKER_END}"
-            else:
-                header = f"\n{self.FILE_MARKER_START}[Content from {filePath}]:\n"
-                footer = f"{self.FILE_MARKER_END}"
-            logging.info("Successfully read file: %s", filePath)
-            return header + fileContent + footer + "\n"
+                return self.READ_OVERSIZE, ""
+
+            cacheKey = (filePath, baseDir)
+            signature = (fileStat.st_mtime_ns, fileSize)
+            content = self._cachedFileContent(cacheKey, signature)
+            if content is not None:
+                if debug:
+                    _log.debug("Using cached content of file: %s", filePath)
+                return self.READ_OK, content
+
+            content = self._buildFileContent(filePath, baseDir, ext, debug)
+            if debug:
+                _log.debug("Successfully read file: %s", filePath)
+            self._storeInFileCache(cacheKey, signature, content)
+            return self.READ_OK, content
         except UnicodeDecodeError as ude:
             logging.warning("Unicode decode error for file %s: %s", filePath, ude)
         except Exception as error:
             logging.error("Error reading file %s: %s", filePath, error)
-        return ""
+        return self.READ_FAILED, ""
+
+    def _cachedFileContent(self, cacheKey: tuple, signature: tuple) -> Optional[str]:
+        """
+        Returns the cached content of a file if it was read with the same signature (modification time and size),
+        marking it as most recently used, or None.
+        """
+        with self._fileCacheLock:
+            cached = self._fileCache.get(cacheKey)
+            if cached is None or cached[0] != signature:
+                return None
+            self._fileCache.move_to_end(cacheKey)
+            return cached[1]
+
+    def _buildFileContent(self, filePath: str, baseDir: Optional[str], ext: str, debug: bool) -> str:
+        """
+        Returns the text of a file framed by the file markers, with a header naming the file
+        (relative to baseDir for files inside a directory). DOCX and PDF files are converted to text.
+        """
+        if baseDir:
+            relativePath = os.path.relpath(filePath, baseDir)
+            header = f"\n{self.FILE_MARKER_START}[Content from {baseDir}/{relativePath}]:\n"
+        else:
+            header = f"\n{self.FILE_MARKER_START}[Content from {filePath}]:\n"
+
+        # Write header, content and footer into one buffer instead of concatenating strings,
+        # so the file content is copied only once more (by getvalue).
+        buffer = io.StringIO()
+        buffer.write(header)
+        if ext == ".docx":
+            if debug:
+                _log.debug("Processing DOCX file: %s", filePath)
+            buffer.write(self.extractTextFromDocx(filePath))
+        elif ext == ".pdf":
+            if debug:
+                _log.debug("Processing PDF file: %s", filePath)
+            buffer.write(self.extractTextFromPdf(filePath))
+        else:
+            with open(filePath, "r", encoding="utf-8") as fileHandle:
+                # Stream in blocks rather than materializing the whole file with read().
+                shutil.copyfileobj(fileHandle, buffer, self.READ_BLOCK_SIZE)
+        buffer.write(self.FILE_MARKER_END)
+        buffer.write("\n")
+        return buffer.getvalue()
+
+    def _storeInFileCache(self, cacheKey: tuple, signature: tuple, content: str):
+        """
+        Stores the content of a file in the LRU file cache, evicting the least recently used
+        entries while the cache exceeds its entry or size limit.
+        """
+        with self._fileCacheLock:
+            previous = self._fileCache.pop(cacheKey, None)
+            if previous is not None:
+                self._fileCacheChars -= len(previous[1])
+            self._fileCache[cacheKey] = (signature, content)
+            self._fileCacheChars += len(content)
+            while self._fileCache and (
+                len(self._fileCache) > self.FILE_CACHE_MAX_ENTRIES or self._fileCacheChars > self.FILE_CACHE_MAX_CHARS
+            ):
+                _, (_, evicted) = self._fileCache.popitem(last=False)
+                self._fileCacheChars -= len(evicted)
 
     def readFilesContent(self, filePathsStr: str) -> str:
         """
         Given a comma-separated string of file or directory paths, reads and combines their contents.
         For directories, it recursively traverses each folder (ignoring blacklisted folder names)
         and adds each file’s content with a header. Files that are too large or appear to be binary
-        are skipped.
+        are skipped. Larger sets of files are read concurrently; the output keeps the walk order.
         """
-        contentFragments = []
+        # Collect the arguments for every _readSingleFile call first.
+        readArguments = []
         filePaths = filePathsStr.split(",")
         for filePath in filePaths:
             filePath = filePath.strip()
@@ -155,76 +389,153 @@ class ChatSession:
 
             if os.path.isdir(filePath):
                 logging.info("Processing directory: %s", filePath)
-                for root, dirs, files in os.walk(filePath):
-                    # Filter out blacklisted directories.
-                    dirs[:] = [dirName for dirName in dirs if dirName not in self.FOLDER_BLACKLIST]
-                    for fileName in files:
-                        fullPath = os.path.join(root, fileName)
-                        fileContent = self._readSingleFile(fullPath, filePath)
-                        if fileContent:
-                            contentFragments.append(fileContent)
+                for entry in walkFiles(filePath, self.FOLDER_BLACKLIST):
+                    readArguments.append((entry.path, filePath, entry))
             else:
-                fileContent = self._readSingleFile(filePath)
-                if fileContent:
-                    contentFragments.append(fileContent)
-        return "".join(contentFragments)
+                readArguments.append((filePath,))
+
+        parallel = len(readArguments) >= self.PARALLEL_READ_THRESHOLD or (
+            len(readArguments) > 1
+            and any(os.path.splitext(arguments[0])[1].lower() in self.DOCUMENT_EXTENSIONS for arguments in readArguments)
+        )
+        if not parallel:
+            results = [self._readFile(*arguments) for arguments in readArguments]
+        else:
+            # Reading is dominated by blocking I/O and by parsers that release the GIL, so threads overlap well.
+            maxWorkers = min(32, (os.cpu_count() or 1) * 4, len(readArguments))
+            with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+                results = list(executor.map(lambda arguments: self._readFile(*arguments), readArguments))
+
+        outcomes = Counter()
+        contentBuffer = io.StringIO()
+        for outcome, fileContent in results:
+            outcomes[outcome] += 1
+            contentBuffer.write(fileContent)
+        _log.info(
+            "Read %d files, skipped %d binary, %d oversize, %d unreadable",
+            outcomes[self.READ_OK],
+            outcomes[self.READ_BINARY],
+            outcomes[self.READ_OVERSIZE],
+            outcomes[self.READ_FAILED],
+        )
+        return contentBuffer.getvalue()
+
+    def _countMessageTokens(self, text: str) -> int:
+        """
+        Returns the number of tokens in a message text, encoding it only the first time it is seen.
+        """
+        count = self._tokenCounts.get(text)
+        if count is None:
+            count = len(self.encoding.encode(text))
+            self._tokenCounts[text] = count
+        return count
 
     def countTokens(self) -> int:
         """
         Counts the tokens in the conversationHistory using tiktoken for accurate counting.
+        Each message is encoded only once; later calls reuse the cached counts.
         """
-        total = 0
-        for message in self.conversationHistory:
-            text = message.get("content", "")
-            total += len(self.encoding.encode(text))
-        return total
+        contents = [message.get("content", "") for message in self.conversationHistory]
+        newContents = list(dict.fromkeys(content for content in contents if content not in self._tokenCounts))
+        # encode_batch starts a thread pool per call, which only pays off for several messages.
+        if len(newContents) > 1:
+            for content, tokens in zip(newContents, self.encoding.encode_batch(newContents)):
+                self._tokenCounts[content] = len(tokens)
+        return sum(self._countMessageTokens(content) for content in contents)
 
     def trimConversationHistory(self):
         """
         Trims the conversation history to ensure total tokens are within the maximum context limit.
         Removes the oldest user and assistant messages.
         """
-        while self.countTokens() > self.maxContextTokens:
+        total = self.countTokens()
+        while total > self.maxContextTokens:
             if len(self.conversationHistory) > 2:
                 # Remove the second message (first user message after system prompt)
                 removed = self.conversationHistory.pop(1)
+                self.trimmedMessageCount += 1
+                removedText = removed.get("content", "")
+                total -= self._countMessageTokens(removedText)
+                self._tokenCounts.pop(removedText, None)
                 logging.info("Removed oldest message to trim tokens: %s", removed)
             else:
                 # If only system prompt and one message left, break to avoid removing system prompt
                 break
 
-    def sendMessage(self, userText: str, filePathList: list) -> str:
+    def _prepareMessage(
+        self, userText: str, filePathList: list, onTokensCounted: Optional[Callable[[int], None]] = None
+    ) -> list:
         """
-        Given the user's text and a list of file/directory paths, read their contents, append their
-        content to the user text, update the conversationHistory, then call the OpenAI API
-        and return the assistant's reply.
+        Reads the attached files, appends the user's text to the conversationHistory and returns
+        the messages to send to the API (the history with the file content added to the new message).
+        If onTokensCounted is given, it is called with the number of tokens that will be sent.
         """
-        filePathsStr = ",".join(filePathList)
         attachmentContent = ""
-        if filePathsStr.strip():
-            attachmentContent = self.readFilesContent(filePathsStr)
+        if filePathList:
+            attachmentContent = self.readFilesContent(",".join(filePathList))
 
         redactedUserMessage = userText.strip()  # The message that gets saved in the DB. Does not include file content.
-        fullUserMessage = userText.strip()  # The message that gets sent to OpenAI. Includes file content.
-        if attachmentContent:
-            fullUserMessage += "\n" + attachmentContent.strip()
+        self.conversationHistory.append({"role": "user", "content": redactedUserMessage})
+
+        # Trim conversation history if necessary
+        self.trimConversationHistory()
 
         # Schizophrenia maxima.
         # We have two conversations:
         #       * one for OpenAI,
         #       * one for the database.
-        # The database should not include file content.
-        apiConversationHistory = list(self.conversationHistory)
-        apiConversationHistory.append({"role": "user", "content": fullUserMessage})
-        self.conversationHistory.append({"role": "user", "content": redactedUserMessage})
-
-        # Trim conversation history if necessary
-        self.trimConversationHistory()
+        # The database should not include file content. Without attachments both are the same,
+        # so the stored history is sent as is and only a turn with files pays for a copy.
+        apiConversationHistory = self.conversationHistory
+        if attachmentContent:
+            messageBuffer = io.StringIO()
+            messageBuffer.write(redactedUserMessage)
+            messageBuffer.write("\n")
+            messageBuffer.write(attachmentContent.strip())
+            fullUserMessage = messageBuffer.getvalue()  # The message that gets sent to OpenAI. Includes file content.
+            apiConversationHistory = list(self.conversationHistory)
+            apiConversationHistory[-1] = {"role": "user", "content": fullUserMessage}
 
         # Optionally log the current token count before sending the API call.
         currentTokens = self.countTokens()
+        if attachmentContent:
+            # The API receives the full message in place of the redacted one.
+            currentTokens += len(self.encoding.encode(fullUserMessage)) - self._countMessageTokens(redactedUserMessage)
         logging.info("Current token count (before API call): %d", currentTokens)
+        if onTokensCounted is not None:
+            onTokensCounted(currentTokens)
+        return apiConversationHistory
+
+    def _recordReply(self, reply: str):
+        """
+        Appends the assistant's reply to the conversationHistory and trims the history if the reply
+        pushed it past the limit.
+        """
+        # Append the assistant's reply to the conversationHistory (DB storage)
+        self.conversationHistory.append({"role": "assistant", "content": reply})
 
+        # Trim conversation history again only if the reply pushed it past the limit
+        newTokenCount = self.countTokens()
+        if newTokenCount > self.maxContextTokens:
+            self.trimConversationHistory()
+            newTokenCount = self.countTokens()
+
+        # Log the new token count after receiving the reply.
+        logging.info("Current token count (after API call): %d", newTokenCount)
+
+        # The history and token count are persisted by the caller (ChatTab.saveConversationHistory)
+        # in a single transaction. This method runs in a worker thread, and the database connection
+        # belongs to the UI thread.
+
+    def sendMessage(self, userText: str, filePathList: list, onTokensCounted: Optional[Callable[[int], None]] = None) -> str:
+        """
+        Given the user's text and a list of file/directory paths, read their contents, append their
+        content to the user text, update the conversationHistory, then call the OpenAI API
+        and return the assistant's reply.
+        If onTokensCounted is given, it is called with the number of tokens sent to the API
+        (history plus the message including file content) right before the API call.
+        """
+        apiConversationHistory = self._prepareMessage(userText, filePathList, onTokensCounted)
         try:
             response = self.client.chat.completions.create(
                 model=self.deploymentName,
@@ -235,31 +546,59 @@ class ChatSession:
             totalUsage = response.usage.total_tokens if response.usage else None
             if totalUsage is not None:
                 self.lastTotalTokens = totalUsage
-                # Update tokens in the database
-                if self.db and self.conversationId:
-                    self.db.updateConversationTokens(self.conversationId, self.lastTotalTokens)
             logging.info("Received reply from OpenAI API. Total tokens used: %s", self.lastTotalTokens)
-
-            # Append the assistant's reply to the conversationHistory (DB storage)
-            self.conversationHistory.append({"role": "assistant", "content": reply})
-
-            # Trim conversation history again if necessary after appending the reply
-            self.trimConversationHistory()
-
-            # Log the new token count after receiving the reply.
-            newTokenCount = self.countTokens()
-            logging.info("Current token count (after API call): %d", newTokenCount)
-
-            # Update tokens in database
-            if self.db and self.conversationId:
-                self.db.updateConversationTokens(self.conversationId, newTokenCount)
-
+            self._recordReply(reply)
             return reply
         except Exception as error:
-            errorMessage = f"Error during API call: {error}"
+            errorMessage = f"{API_ERROR_PREFIX}: {error}"
             logging.error(errorMessage, exc_info=True)
             return errorMessage
 
+    def streamMessage(
+        self, userText: str, filePathList: list, onTokensCounted: Optional[Callable[[int], None]] = None
+    ) -> Iterator[str]:
+        """
+        Like sendMessage, but requests a streamed reply and yields its text as it arrives.
+        The complete reply is added to the conversationHistory once the stream has ended.
+        If the API call fails before any text arrived, the error message is yielded instead and the history keeps
+        only the user's message.
+
+        Raises:
+            RuntimeError: If the stream fails after part of the reply was yielded. The user's message is then
+                removed from the history again, since it got no reply.
+        """
+        apiConversationHistory = self._prepareMessage(userText, filePathList, onTokensCounted)
+        parts = []
+        try:
+            stream = self.client.chat.completions.create(
+                model=self.deploymentName,
+                messages=apiConversationHistory,  # Send the full conversation including file content
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+            for chunk in stream:
+                # With include_usage, the last chunk has no choices and carries the token usage.
+                if chunk.usage is not None and chunk.usage.total_tokens is not None:
+                    self.lastTotalTokens = chunk.usage.total_tokens
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        except Exception as error:
+            errorMessage = f"{API_ERROR_PREFIX}: {error}"
+            if parts:
+                # Yielding the error now would append it to the partial reply, as if it were part of it.
+                # The caller reports the raised error, with this one chained to it.
+                self.conversationHistory.pop()
+                raise RuntimeError(errorMessage) from error
+            logging.error(errorMessage, exc_info=True)
+            yield errorMessage
+            return
+        logging.info("Received streamed reply from OpenAI API. Total tokens used: %s", self.lastTotalTokens)
+        self._recordReply("".join(parts))
+
     def getFirstUserMessage(self) -> Optional[str]:
         """
         Retrieves the first user message from the conversation history.
@@ -272,15 +611,21 @@ class ChatSession:
                 return message.get("content", "").strip()
         return None
 
-    def generateSummary(self) -> Optional[str]:
+    def generateSummary(self, conversationText: Optional[str] = None) -> Optional[str]:
         """
         Generates a summary of the conversation using the OpenAI API.
 
+        Args:
+            conversationText (Optional[str]): The text to summarize, e.g. from ConversationDatabase.getConversationText.
+                Defaults to the text of the loaded conversation history.
+
         Returns:
             Optional[str]: The summary text or None if generation fails.
         """
+        if conversationText is None:
+            conversationText = self.getConversationText()
         try:
-            summaryPrompt = "Summarize the following conversation in seven words or less:\n" f"{self.getConversationText()}"
+            summaryPrompt = "Summarize the following conversation in seven words or less:\n" f"{conversationText}"
             response = self.client.chat.completions.create(
                 model=self.deploymentName,
                 messages=[{"role": "user", "content": summaryPrompt}],
@@ -1,21 +1,36 @@
 import os
 import logging
-import datetime
+import time
+import weakref
+from typing import Optional
 from pathlib import Path
 
-from PySide6.QtWidgets import QWidget, QFileDialog, QMessageBox, QListWidgetItem, QApplication, QMainWindow, QListView, QSizePolicy, QAbstractItemView
-from PySide6.QtGui import QIcon, QTextCursor
-from PySide6.QtCore import Signal, QThreadPool, QSize
+from PySide6.QtWidgets import QWidget, QFileDialog, QMessageBox, QListWidgetItem, QMainWindow, QListView, QSizePolicy, QAbstractItemView, QFrame, QLabel, QHBoxLayout
+from PySide6.QtGui import QTextCursor, QPixmap
+from PySide6.QtCore import Signal, QThreadPool, QSize, QEvent
 
-from obeliscaDivergencia.worker import WorkerRunnable
+from obeliscaDivergencia.worker import WorkerRunnable, DirectoryScanWorker
 from obeliscaDivergencia.gui.Ui_conversationWidget import Ui_conversationForm
 from obeliscaDivergencia.gui.customTextEdit import SendableTextEdit
 from obeliscaDivergencia.gui.customListItem import CustomListItem
 from obeliscaDivergencia.gui.customListWidget import DroppableListWidget
-from obeliscaDivergencia.utils.markdownUtils import convertMarkdownToHtml
-from obeliscaDivergencia.utils.fileUtils import normalizeFilePath, isBinaryFile
+from obeliscaDivergencia.utils.markdownUtils import convertMarkdownToHtml, getStyleSheet
+from obeliscaDivergencia.utils.fileUtils import normalizeFilePath, isBinaryFile, walkFiles
 from obeliscaDivergencia.chatSession import ChatSession
-from obeliscaDivergencia.config import resourcePath
+from obeliscaDivergencia.config import loadIcon, loadPixmap, setSettingIfChanged
+
+
+def _localTimestamp() -> str:
+    """
+    Returns the current local time formatted as "YYYY-MM-DD HH:MM:SS +HHMM".
+    Uses time.localtime, which is considerably cheaper than datetime.now().astimezone(). The UTC offset is
+    formatted from tm_gmtoff because the meaning of %z in time.strftime depends on the platform's C library.
+    """
+    localTime = time.localtime()
+    offsetMinutes = localTime.tm_gmtoff // 60
+    sign = "+" if offsetMinutes >= 0 else "-"
+    hours, minutes = divmod(abs(offsetMinutes), 60)
+    return f"{time.strftime('%Y-%m-%d %H:%M:%S', localTime)} {sign}{hours:02d}{minutes:02d}"
 
 
 class ChatTab(QWidget):
@@ -28,18 +43,60 @@ class ChatTab(QWidget):
     tokenUpdated = Signal(int, int)  # totalTokens, currentTokenCount
     titleUpdated = Signal(int, str)  # conversationId, newTitle
 
+    # Style of the attachedFilesList rows, set once the first file is attached.
+    ATTACHMENT_ITEM_STYLE = """QListWidget::item {
+                background-color: #eef2ff;  /* light blue background */
+                border: 1px solid #ccc; 
+                border-radius: 4px;
+            }
+            QListWidget::item:selected {
+                background-color: #8aa0d7;  /* darker blue background when selected */
+            }"""
+
+    # Spinner shown in the busy indicator. Shared by all tabs and loaded lazily (a QPixmap needs a QApplication).
+    _BUSY_PIXMAP = None
+
+    @classmethod
+    def _busyPixmap(cls) -> QPixmap:
+        """
+        Loads the busy indicator pixmap once, instead of letting every tab parse HTML and load the image.
+        """
+        if cls._BUSY_PIXMAP is None:
+            cls._BUSY_PIXMAP = loadPixmap("assets/ai-spark.png").scaled(16, 16)
+        return cls._BUSY_PIXMAP
+
     def __init__(self, chatSession: ChatSession, conversationId: int, parent=None):
         super().__init__(parent)
         self.chatSession = chatSession
         self.conversationId = conversationId  # Store the conversation ID
         self.threadPool = QThreadPool.globalInstance()
+        # WorkerRunnable used for sending messages, created with the first message.
+        self._sendWorker = None
+        # Weak reference to the ancestor owning conversationDb, resolved by _getMainWindow.
+        self._mainWindowRef = None
         # Initialize attachedFiles from database instead of starting with an empty list.
         self.attachedFiles = []  # List to hold attached file paths
+        # Same paths as attachedFiles, for constant-time duplicate checks. Kept in sync with the list.
+        self._attachedFilesSet = set()
+        # Row of every attached file in attachedFilesList, so a row can be removed without searching the list.
+        self._attachmentItems = {}
+        self._attachmentItemStyleApplied = False
+        # (history length, trimmedMessageCount) of the chat session at the last save, or None if unknown.
+        # The first save compares against the stored history; later ones only append new messages.
+        self._persistedHistoryState = None
+        # False once the conversation is known to have a title other than the default "Conversation N".
+        self._hasDefaultTitle = True
         self.loadAttachedFilesFromDatabase()  # Load from the database if any attachments exist
 
         # Load the conversation UI from the compiled UI file.
         self.ui = Ui_conversationForm()
         self.ui.setupUi(self)
+        # The CSS of the converted messages, parsed once instead of with every inserted message.
+        self.ui.conversationDisplay.document().setDefaultStyleSheet(getStyleSheet())
+        # Cursor used for every insert into the conversation display, moved to the end before each one.
+        self._displayCursor = QTextCursor(self.ui.conversationDisplay.document())
+        # Position where the plain text of a reply that is still streaming starts, or None.
+        self._streamStart = None
 
         # Replace the default QTextEdit with a custom SendableTextEdit.
         self.customUserInput = SendableTextEdit()
@@ -50,6 +107,20 @@ class ChatTab(QWidget):
         self.ui.userInput.deleteLater()
         self.ui.userInput = self.customUserInput
 
+        # Replace the HTML busy indicator label with an icon + text pair using the shared pixmap.
+        self.customBusyIndicator = QFrame()
+        busyLayout = QHBoxLayout(self.customBusyIndicator)
+        busyLayout.setContentsMargins(0, 0, 0, 0)
+        busyIcon = QLabel()
+        busyIcon.setPixmap(self._busyPixmap())
+        busyLayout.addStretch()
+        busyLayout.addWidget(busyIcon)
+        busyLayout.addWidget(QLabel(" Thinking... "))
+        busyLayout.addStretch()
+        parentLayout.replaceWidget(self.ui.busyIndicator, self.customBusyIndicator)
+        self.ui.busyIndicator.deleteLater()
+        self.ui.busyIndicator = self.customBusyIndicator
+
         self.ui.busyIndicator.setVisible(False)
 
         self.ui.attachDirectoryButton.setMinimumHeight(35)
@@ -63,13 +134,13 @@ class ChatTab(QWidget):
         self.ui.busyIndicator.setStyleSheet("background-color: #eef2ff; color: blue; font-weight: bold;")
 
         # Configure button icons and sizes.
-        self.ui.attachButton.setIcon(QIcon(resourcePath("assets/file-add.png", forcedPath=True)))
-        self.ui.attachDirectoryButton.setIcon(QIcon(resourcePath("assets/folder-add.png", forcedPath=True)))
-        self.ui.sendButton.setIcon(QIcon(resourcePath("assets/upload-circle.png", forcedPath=True)))
+        self.ui.attachButton.setIcon(loadIcon("assets/file-add.png"))
+        self.ui.attachDirectoryButton.setIcon(loadIcon("assets/folder-add.png"))
+        self.ui.sendButton.setIcon(loadIcon("assets/upload-circle.png"))
 
         # Replace the QListWidget with DroppableListWidget
         self.ui.attachedFilesList.setParent(None)  # Remove the existing widget from layout
-        self.droppableAttachedFilesList = DroppableListWidget(parent=self, binaryExtensions=ChatSession.BINARY_EXTENSIONS, folderBalcklist=ChatSession.FOLDER_BLACKLIST)
+        self.droppableAttachedFilesList = DroppableListWidget(parent=self, binaryExtensions=ChatSession.BINARY_EXTENSIONS, folderBlacklist=ChatSession.FOLDER_BLACKLIST)
         layout = self.ui.fileLayout
         layout.insertWidget(0, self.droppableAttachedFilesList)
         self.ui.attachedFilesList = self.droppableAttachedFilesList  # Update the reference
@@ -100,6 +171,29 @@ class ChatTab(QWidget):
         # Update the UI list widget with any loaded attachments.
         self.updateAttachedFilesList()
 
+    def _getMainWindow(self) -> Optional[QMainWindow]:
+        """
+        Returns the ancestor that owns conversationDb and settings (the MainWindow), or None if there is none yet.
+        The parent chain is walked once; the result is cached until the tab is reparented.
+        """
+        mainWindow = self._mainWindowRef() if self._mainWindowRef is not None else None
+        if mainWindow is None:
+            mainWindow = self.parentWidget()
+            while mainWindow and not hasattr(mainWindow, "conversationDb"):
+                mainWindow = mainWindow.parentWidget()
+            if mainWindow is None:
+                return None
+            self._mainWindowRef = weakref.ref(mainWindow)
+        return mainWindow
+
+    def changeEvent(self, event: QEvent):
+        """
+        Drops the cached main window when the tab is moved to another parent.
+        """
+        if event.type() == QEvent.Type.ParentChange:
+            self._mainWindowRef = None
+        super().changeEvent(event)
+
     def attachFiles(self, filePaths: list):
         """
         Handles files/folders dropped into the attachedFilesList.
@@ -113,22 +207,19 @@ class ChatTab(QWidget):
         newFiles = []
         for filePath in filePaths:
             normalizedPath = normalizeFilePath(filePath)
-            if normalizedPath in self.attachedFiles:
+            if normalizedPath in self._attachedFilesSet:
                 logging.info("File already attached: %s", normalizedPath)
                 continue
             if os.path.isdir(normalizedPath):
-                # Handle directory attachment
-                for root, dirs, files in os.walk(normalizedPath):
-                    # Filter out blacklisted directories.
-                    dirs[:] = [dirName for dirName in dirs if dirName not in self.chatSession.FOLDER_BLACKLIST]
-                    for fileName in files:
-                        fullPath = os.path.join(root, fileName)
-                        if isBinaryFile(fullPath, self.chatSession.BINARY_EXTENSIONS):
-                            logging.info("Skipping binary file: %s", fullPath)
-                            continue
-                        normalizedFullPath = normalizeFilePath(fullPath)
-                        if normalizedFullPath not in self.attachedFiles:
-                            newFiles.append(normalizedFullPath)
+                # Handle directory attachment; blacklisted directories are skipped by the walk.
+                binaryExtensions = self.chatSession.BINARY_EXTENSIONS
+                for entry in walkFiles(normalizedPath, self.chatSession.FOLDER_BLACKLIST):
+                    if os.path.splitext(entry.name)[1].lower() in binaryExtensions:
+                        logging.info("Skipping binary file: %s", entry.path)
+                        continue
+                    normalizedFullPath = normalizeFilePath(entry.path)
+                    if normalizedFullPath not in self._attachedFilesSet:
+                        newFiles.append(normalizedFullPath)
             else:
                 if isBinaryFile(normalizedPath, self.chatSession.BINARY_EXTENSIONS):
                     logging.info("Skipping binary file: %s", normalizedPath)
@@ -138,40 +229,30 @@ class ChatTab(QWidget):
         if not newFiles:
             return
 
-        # Append the new files and update the database.
+        # Append the new files (once each, so list and set stay in sync) and update the database.
+        newFiles = list(dict.fromkeys(newFiles))
         self.attachedFiles.extend(newFiles)
+        self._attachedFilesSet.update(newFiles)
 
         # Update the database
-        parent = self.parentWidget()
-        while parent and not hasattr(parent, "conversationDb"):
-            parent = parent.parentWidget()
+        parent = self._getMainWindow()
         if parent and hasattr(parent, "conversationDb"):
             parent.conversationDb.recordAttachmentsForConversation(self.conversationId, newFiles)
 
-        # Update the UI list widget.
-        self.updateAttachedFilesList()
+        # Add the new rows to the UI list widget.
+        self.appendAttachedFilesToList(newFiles)
 
     def loadAttachedFilesFromDatabase(self):
         """
         Loads attached files from the database for this conversation and initializes self.attachedFiles.
         """
         # Locate the parent that stores conversationDb (typically the MainWindow)
-        parent = self.parentWidget()
-        while parent and not hasattr(parent, "conversationDb"):
-            parent = parent.parentWidget()
+        parent = self._getMainWindow()
         if parent and hasattr(parent, "conversationDb"):
             try:
-                # Execute a query joining the files table with the conversation_attachements
-                query = """
-                    SELECT f.file_path 
-                    FROM files f 
-                    INNER JOIN conversation_attachements ca ON f.id = ca.file_id 
-                    WHERE ca.conversation_id = ?
-                """
-                cursor = parent.conversationDb.conn.execute(query, (self.conversationId,))
-                rows = cursor.fetchall()
                 # Save all the attached file paths into self.attachedFiles.
-                self.attachedFiles = [row[0] for row in rows]
+                self.attachedFiles = parent.conversationDb.getAttachedFiles(self.conversationId)
+                self._attachedFilesSet = set(self.attachedFiles)
                 logging.info("Loaded %d attached files for conversation ID %d", len(self.attachedFiles), self.conversationId)
             except Exception as e:
                 logging.error("Failed to load attached files for conversation %d: %s", self.conversationId, e)
@@ -180,6 +261,8 @@ class ChatTab(QWidget):
         """
         Loads the existing conversation history into the conversation display.
         """
+        # Group all appends into one edit block, so the document is laid out once instead of after every message.
+        self._displayCursor.beginEditBlock()
         for message in self.chatSession.conversationHistory[1:]:
             role = message.get("role", "")
             content = message.get("content", "")
@@ -187,6 +270,7 @@ class ChatTab(QWidget):
                 self.appendToConversation("**You:** " + content)
             elif role == "assistant":
                 self.appendToConversation("**Assistant:** " + content)
+        self._displayCursor.endEditBlock()
         self.ui.conversationDisplay.moveCursor(QTextCursor.MoveOperation.End)
         logging.info("Loaded existing conversation into ChatTab.")
 
@@ -210,7 +294,7 @@ class ChatTab(QWidget):
             if isBinaryFile(normalizedPath, self.chatSession.BINARY_EXTENSIONS):
                 logging.info("Skipping binary file: %s", normalizedPath)
                 continue
-            if normalizedPath in self.attachedFiles:
+            if normalizedPath in self._attachedFilesSet:
                 logging.info("File already attached: %s", normalizedPath)
                 continue
             newFiles.append(normalizedPath)
@@ -218,23 +302,23 @@ class ChatTab(QWidget):
         if not newFiles:
             return
 
-        # Append the new files and update the database.
+        # Append the new files (once each, so list and set stay in sync) and update the database.
+        newFiles = list(dict.fromkeys(newFiles))
         self.attachedFiles.extend(newFiles)
+        self._attachedFilesSet.update(newFiles)
 
         # Read from the database the files which were already attached if needed.
-        parent = self.parentWidget()
-        while parent and not hasattr(parent, "conversationDb"):
-            parent = parent.parentWidget()
+        parent = self._getMainWindow()
         if parent and hasattr(parent, "conversationDb"):
             parent.conversationDb.recordAttachmentsForConversation(self.conversationId, newFiles)
 
-        # Update the UI list widget.
-        self.updateAttachedFilesList()
+        # Add the new rows to the UI list widget.
+        self.appendAttachedFilesToList(newFiles)
 
     def onAttachDirectory(self):
         """
         Opens a directory dialog to select a directory. Recursively attaches eligible files.
-        Filters out binary files and duplicates. Updates the database.
+        The directory is scanned in a background thread; binary files and duplicates are filtered out there.
         """
         # Open directory dialog starting in the last used directory.
         directory = QFileDialog.getExistingDirectory(self, "Select Directory", self.getLastDirectory())
@@ -244,67 +328,99 @@ class ChatTab(QWidget):
         # Update last used directory.
         self.setLastDirectory(directory)
 
-        newFiles = []
-        # Walk recursively through the directory.
-        for root, dirs, files in os.walk(directory):
-            # Skip blacklisted directories.
-            dirs[:] = [dirName for dirName in dirs if dirName not in self.chatSession.FOLDER_BLACKLIST]
-            for fileName in files:
-                fullPath = os.path.join(root, fileName)
-                normalizedPath = normalizeFilePath(fullPath)
-                if isBinaryFile(normalizedPath, self.chatSession.BINARY_EXTENSIONS):
-                    logging.info("Skipping binary file: %s", normalizedPath)
-                    continue
-                if normalizedPath in self.attachedFiles:
-                    logging.info("File already attached: %s", normalizedPath)
-                    continue
-                newFiles.append(normalizedPath)
+        # Walking a large tree would freeze the GUI, so do it in the thread pool.
+        self.ui.attachButton.setEnabled(False)
+        self.ui.attachDirectoryButton.setEnabled(False)
+        worker = DirectoryScanWorker(directory, self._attachedFilesSet, self.chatSession.FOLDER_BLACKLIST, self.chatSession.BINARY_EXTENSIONS)
+        worker.signals.finished.connect(self.onDirectoryScanFinished)
+        worker.signals.error.connect(self.onDirectoryScanError)
+        self.threadPool.start(worker)
 
+    def onDirectoryScanFinished(self, newFiles: list):
+        """
+        Called when the directory scan started by onAttachDirectory is done. Attaches the found files
+        and updates the database.
+
+        Args:
+            newFiles (list): Normalized paths of the eligible files that were not attached when the scan started.
+        """
+        self.resetAfterDirectoryScan()
+        # Files may have been attached while the scan was running.
+        newFiles = [filePath for filePath in newFiles if filePath not in self._attachedFilesSet]
         if not newFiles:
             return
 
         # Append the new files and update the database.
         self.attachedFiles.extend(newFiles)
+        self._attachedFilesSet.update(newFiles)
 
-        parent = self.parentWidget()
-        while parent and not hasattr(parent, "conversationDb"):
-            parent = parent.parentWidget()
+        parent = self._getMainWindow()
         if parent and hasattr(parent, "conversationDb"):
             parent.conversationDb.recordAttachmentsForConversation(self.conversationId, newFiles)
 
-        # Update the UI list widget.
-        self.updateAttachedFilesList()
+        # Add the new rows to the UI list widget.
+        self.appendAttachedFilesToList(newFiles)
+
+    def onDirectoryScanError(self, errorMessage: str):
+        """
+        Called if scanning the selected directory fails.
+
+        Args:
+            errorMessage (str): The error message.
+        """
+        self.resetAfterDirectoryScan()
+        QMessageBox.critical(self, "Error", f"Could not read the directory: {errorMessage}")
+
+    def resetAfterDirectoryScan(self):
+        """
+        Re-enables the attach buttons after a directory scan, unless a message is being sent.
+        """
+        if self.ui.sendButton.isEnabled():
+            self.ui.attachButton.setEnabled(True)
+            self.ui.attachDirectoryButton.setEnabled(True)
 
     def updateAttachedFilesList(self):
         """
-        Updates the attachedFilesList QListWidget to display current attachments with appropriate icons.
+        Rebuilds the attachedFilesList QListWidget to display all current attachments with appropriate icons.
+        Adding and removing files only touches the affected rows (see appendAttachedFilesToList and removeAttachedFile).
         """
         self.ui.attachedFilesList.clear()
-        for path in self.attachedFiles:
-            # custom list item with two icons
-            displayText = str(Path(path).name)
-            item = QListWidgetItem(self.ui.attachedFilesList)
-            customWidget = CustomListItem(displayText)
-            item.setSizeHint(customWidget.sizeHint())
-            # store the path into the label
-            customWidget.rightIconButton.customData = path
-
-            # Connect the removeClicked signal to the removeAttachedFile slot
-            customWidget.removeClicked.connect(self.removeAttachedFile)
-
-            self.ui.attachedFilesList.setStyleSheet(
-                """QListWidget::item {
-                background-color: #eef2ff;  /* light blue background */
-                border: 1px solid #ccc; 
-                border-radius: 4px;
-            }
-            QListWidget::item:selected {
-                background-color: #8aa0d7;  /* darker blue background when selected */
-            }"""
-            )
+        self._attachmentItems.clear()
+        self.appendAttachedFilesToList(self.attachedFiles)
 
-            self.ui.attachedFilesList.addItem(item)
-            self.ui.attachedFilesList.setItemWidget(item, customWidget)
+    def appendAttachedFilesToList(self, filePaths: list):
+        """
+        Adds a row for each of the given attachments to the attachedFilesList QListWidget.
+
+        Args:
+            filePaths (list): The paths of the newly attached files.
+        """
+        if not filePaths:
+            return
+        listWidget = self.ui.attachedFilesList
+        if not self._attachmentItemStyleApplied:
+            listWidget.setStyleSheet(self.ATTACHMENT_ITEM_STYLE)
+            self._attachmentItemStyleApplied = True
+        # Repaint once after all rows are added.
+        listWidget.setUpdatesEnabled(False)
+        try:
+            for path in filePaths:
+                # custom list item with two icons
+                displayText = str(Path(path).name)
+                item = QListWidgetItem(listWidget)
+                customWidget = CustomListItem(displayText)
+                item.setSizeHint(customWidget.sizeHint())
+                # store the path into the label
+                customWidget.rightIconButton.customData = path
+
+                # Connect the removeClicked signal to the removeAttachedFile slot
+                customWidget.removeClicked.connect(self.removeAttachedFile)
+
+                listWidget.addItem(item)
+                listWidget.setItemWidget(item, customWidget)
+                self._attachmentItems[path] = item
+        finally:
+            listWidget.setUpdatesEnabled(True)
 
     def removeAttachedFile(self, filePath: str):
         """
@@ -313,73 +429,66 @@ class ChatTab(QWidget):
         Args:
             filePath (str): The path of the file to remove.
         """
-        logging.info(f"Attempting to remove attached file: {filePath}")
+        self.removeAttachedFiles([filePath])
+
+    def removeAttachedFiles(self, filePaths: list):
+        """
+        Removes the specified files from attachedFiles, attachedFilesList, and deletes them from the database.
+        The database is updated in one transaction, followed by a single sweep for orphaned files.
+
+        Args:
+            filePaths (list): The paths of the files to remove.
+        """
+        logging.info(f"Attempting to remove {len(filePaths)} attached file(s).")
 
         # Remove from attachedFiles list
-        if filePath in self.attachedFiles:
-            self.attachedFiles.remove(filePath)
-            logging.info(f"Removed '{filePath}' from attachedFiles.")
-        else:
-            logging.warning(f"File '{filePath}' not found in attachedFiles.")
+        toRemove = set()
+        for filePath in filePaths:
+            if filePath in self._attachedFilesSet:
+                toRemove.add(filePath)
+            else:
+                logging.warning(f"File '{filePath}' not found in attachedFiles.")
+        if toRemove:
+            self.attachedFiles = [path for path in self.attachedFiles if path not in toRemove]
+            self._attachedFilesSet -= toRemove
+            logging.info(f"Removed {len(toRemove)} file(s) from attachedFiles.")
 
-        # Find and remove the QListWidgetItem
+        # Find and remove the QListWidgetItems
         listWidget = self.ui.attachedFilesList
-        itemToRemove = None
-        for i in range(listWidget.count()):
-            item = listWidget.item(i)
-            widget = listWidget.itemWidget(item)
-            if hasattr(widget, "rightIconButton") and getattr(widget.rightIconButton, "customData", None) == filePath:
-                itemToRemove = item
-                break
-
-        if itemToRemove:
-            listWidget.takeItem(listWidget.row(itemToRemove))
-            logging.info(f"Removed QListWidgetItem for '{filePath}' from attachedFilesList.")
-        else:
-            logging.warning(f"No QListWidgetItem found for '{filePath}' in attachedFilesList.")
+        for filePath in filePaths:
+            itemToRemove = self._attachmentItems.pop(filePath, None)
+            if itemToRemove:
+                listWidget.takeItem(listWidget.row(itemToRemove))
+                logging.info(f"Removed QListWidgetItem for '{filePath}' from attachedFilesList.")
+            else:
+                logging.warning(f"No QListWidgetItem found for '{filePath}' in attachedFilesList.")
 
         # Remove from the database
-        parent = self.parentWidget()
-        while parent and not hasattr(parent, "conversationDb"):
-            parent = parent.parentWidget()
+        parent = self._getMainWindow()
         if parent and hasattr(parent, "conversationDb"):
             try:
-                # Retrieve the file ID
-                cursor = parent.conversationDb.conn.execute("SELECT id FROM files WHERE file_path = ?", (filePath,))
-                row = cursor.fetchone()
-                if row:
-                    fileId = row[0]
-                    # Delete the attachment relationship
-                    parent.conversationDb.conn.execute(
-                        "DELETE FROM conversation_attachements WHERE conversation_id = ? AND file_id = ?",
-                        (self.conversationId, fileId),
-                    )
-                    logging.info(
-                        f"Deleted attachment relationship for file ID {fileId} and conversation ID {self.conversationId}."
-                    )
+                # Delete the attachment relationships
+                parent.conversationDb.removeAttachments(self.conversationId, filePaths)
 
                 # Clean up orphaned files
                 parent.conversationDb.deleteOrphanedFiles()
-                logging.info(f"Completed database cleanup for '{filePath}'.")
+                logging.info(f"Completed database cleanup for {len(filePaths)} file(s).")
             except Exception as e:
-                logging.error(f"Failed to remove '{filePath}' from the database: {e}")
+                logging.error(f"Failed to remove {len(filePaths)} file(s) from the database: {e}")
         else:
             logging.error("ConversationDatabase not found in parent hierarchy.")
 
     def getLastDirectory(self) -> str:
         """
-        Retrieves the last used directory from settings.
+        Retrieves the last used directory from settings. The path is stored resolved by setLastDirectory,
+        so opening a dialog does not touch the file system.
 
         Returns:
             str: The path of the last used directory.
         """
-        parent = self.parentWidget()
-        while parent and not isinstance(parent, QMainWindow):
-            parent = parent.parentWidget()
+        parent = self._getMainWindow()
         if parent and hasattr(parent, "settings"):
-            lastDirValue = parent.settings.value("App/lastDirectory", "")
-            if lastDirValue:
-                return str(Path(lastDirValue).resolve())
+            return str(parent.settings.value("App/lastDirectory", ""))
 
         return ""
 
@@ -390,16 +499,14 @@ class ChatTab(QWidget):
         Args:
             directory (str): The path of the directory to save.
         """
-        parent = self.parentWidget()
-        while parent and not isinstance(parent, QMainWindow):
-            parent = parent.parentWidget()
+        parent = self._getMainWindow()
         if parent and hasattr(parent, "settings"):
-            parent.settings.setValue("App/lastDirectory", directory)
+            setSettingIfChanged(parent.settings, "App/lastDirectory", str(Path(directory).resolve()))
 
     def onSendClicked(self):
         """
         Sends the user text (with any file attachments) to the ChatSession.
-        Displays a preview of the estimated token count before sending.
+        The attachments are read and counted in the worker, which reports the token count before sending.
         Disables UI elements while waiting for a reply.
         """
         userText = self.ui.userInput.toPlainText().strip()
@@ -407,21 +514,8 @@ class ChatTab(QWidget):
             QMessageBox.warning(self, "Warning", "Please type a message before sending.")
             return
 
-        # Prepare the full user message with attachments
-        filePathList = self.attachedFiles
-        filePathsStr = ",".join(filePathList)
-        attachmentContent = ""
-        if filePathsStr.strip():
-            attachmentContent = self.chatSession.readFilesContent(filePathsStr)
-
-        fullUserMessage = userText.strip()
-        if attachmentContent:
-            fullUserMessage += "\n" + attachmentContent.strip()
-
-        # Calculate token count for the new message
-        tokensInMessage = len(self.chatSession.encoding.encode(fullUserMessage))
-        currentTokenCount = self.chatSession.countTokens()
-        newTotalTokens = currentTokenCount + tokensInMessage
+        # Snapshot of the attachments, since the worker reads them in another thread.
+        filePathList = list(self.attachedFiles)
 
         # Disable the input and show busy indicator.
         self.ui.sendButton.setEnabled(False)
@@ -435,16 +529,60 @@ class ChatTab(QWidget):
         self.ui.userInput.clear()
         self.ui.conversationDisplay.moveCursor(QTextCursor.MoveOperation.End)
 
+        # Proceed to send the message
+        # One runnable per tab, reused for every message; sending is disabled until it has finished.
+        if self._sendWorker is None:
+            self._sendWorker = WorkerRunnable(self.chatSession)
+            self._sendWorker.signals.tokensCounted.connect(self.onTokensCounted)
+            self._sendWorker.signals.chunk.connect(self.onReplyChunk)
+            self._sendWorker.signals.finished.connect(self.onWorkerFinished)
+            self._sendWorker.signals.error.connect(self.onWorkerError)
+        self._sendWorker.submit(userText, filePathList)
+        self.threadPool.start(self._sendWorker)
+
+    def onTokensCounted(self, tokenCount: int):
+        """
+        Called by the worker with the number of tokens about to be sent.
+
+        Args:
+            tokenCount (int): Tokens of the conversation including the new message and its attachments.
+        """
         # Emit token counts
-        self.tokenUpdated.emit(newTotalTokens, newTotalTokens)
+        self.tokenUpdated.emit(tokenCount, tokenCount)
 
-        QApplication.processEvents()
+    def onReplyChunk(self, text: str):
+        """
+        Called by the worker for every piece of the streamed reply. The text is shown as plain text
+        at the end of the display; onWorkerFinished replaces it with the rendered reply.
 
-        # Proceed to send the message
-        worker = WorkerRunnable(self.chatSession, userText, filePathList)
-        worker.signals.finished.connect(self.onWorkerFinished)
-        worker.signals.error.connect(self.onWorkerError)
-        self.threadPool.start(worker)
+        Args:
+            text (str): The next piece of the assistant's reply.
+        """
+        display = self.ui.conversationDisplay
+        scrollBar = display.verticalScrollBar()
+        atBottom = scrollBar.value() >= scrollBar.maximum()
+        cursor = self._displayCursor
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        if self._streamStart is None:
+            self._streamStart = cursor.position()
+            if not display.document().isEmpty():
+                cursor.insertBlock()
+            cursor.insertText("Assistant: ")
+        cursor.insertText(text)
+        if atBottom:
+            scrollBar.setValue(scrollBar.maximum())
+
+    def clearStreamedReply(self):
+        """
+        Removes the plain text shown by onReplyChunk, if any.
+        """
+        if self._streamStart is None:
+            return
+        cursor = self._displayCursor
+        cursor.setPosition(self._streamStart)
+        cursor.movePosition(QTextCursor.MoveOperation.End, QTextCursor.MoveMode.KeepAnchor)
+        cursor.removeSelectedText()
+        self._streamStart = None
 
     def onWorkerFinished(self, reply: str):
         """
@@ -453,6 +591,7 @@ class ChatTab(QWidget):
         Args:
             reply (str): The assistant's reply.
         """
+        self.clearStreamedReply()
         self.appendToConversation("**Assistant:** " + reply)
         # Emit token counts
         totalTokens = self.chatSession.lastTotalTokens
@@ -460,19 +599,17 @@ class ChatTab(QWidget):
         self.tokenUpdated.emit(totalTokens, currentTokenCount)
 
         # Update the conversation title if it's the first message
-        parent = self.parentWidget()
-        while parent and not isinstance(parent, QMainWindow):
-            parent = parent.parentWidget()
-        if parent and hasattr(parent, "conversationDb"):
-            conversation = parent.conversationDb.getConversationById(self.conversationId)
-            if conversation and conversation["title"].startswith("Conversation"):
-                firstUserMessage = self.chatSession.getFirstUserMessage()
-                if firstUserMessage:
-                    # Truncate to seven words
-                    title = " ".join(firstUserMessage.split()[:7])
-                    parent.conversationDb.updateConversationTitle(self.conversationId, title)
+        parent = self._getMainWindow()
+        if self._hasDefaultTitle and parent and hasattr(parent, "conversationDb"):
+            firstUserMessage = self.chatSession.getFirstUserMessage()
+            if firstUserMessage:
+                # Truncate to seven words
+                title = " ".join(firstUserMessage.split()[:7])
+                # Checks for the default title and replaces it in a single statement.
+                if parent.conversationDb.replaceDefaultConversationTitle(self.conversationId, title):
                     # Emit the titleUpdated signal with conversationId and newTitle
                     self.titleUpdated.emit(self.conversationId, title)
+                self._hasDefaultTitle = False
 
         # Save the updated conversation history to the database
         self.saveConversationHistory()
@@ -487,6 +624,7 @@ class ChatTab(QWidget):
             errorMessage (str): The error message.
         """
         logging.error("Error when sending message: %s", errorMessage, exc_info=True)
+        self.clearStreamedReply()
         QMessageBox.critical(self, "Error", f"An error occurred: {errorMessage}")
         self.resetAfterSend()
 
@@ -507,14 +645,7 @@ class ChatTab(QWidget):
         Args:
           text (str): The text to append.
         """
-        # Get current UTC time
-        utcTime = datetime.datetime.now(datetime.timezone.utc)
-
-        # Convert UTC time to local time
-        localTime = utcTime.astimezone()  # Defaults to the system's local timezone
-
-        # Format the timestamp as desired
-        formattedTimestamp = localTime.strftime("%Y-%m-%d %H:%M:%S %z")
+        formattedTimestamp = _localTimestamp()
 
         fullTextWithTimestamp = f"{text}\n<span style='font-size: small; color: gray;'>{formattedTimestamp}</span>"
 
@@ -525,16 +656,34 @@ class ChatTab(QWidget):
             {fullHtml}
             <br>
         </div>"""
-        self.ui.conversationDisplay.append(newContent)
+        # Same result as QTextEdit.append (new block, follow the end if the view was at the bottom),
+        # without creating a temporary cursor for every message.
+        display = self.ui.conversationDisplay
+        scrollBar = display.verticalScrollBar()
+        atBottom = scrollBar.value() >= scrollBar.maximum()
+        cursor = self._displayCursor
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        if not display.document().isEmpty():
+            cursor.insertBlock()
+        cursor.insertHtml(newContent)
+        if atBottom:
+            scrollBar.setValue(scrollBar.maximum())
 
     def saveConversationHistory(self):
         """
-        Saves the current conversation history to the database.
+        Saves the current conversation history and its token count to the database.
         """
         # Assuming MainWindow holds the ConversationDatabase instance
-        parent = self.parentWidget()
-        while parent and not isinstance(parent, QMainWindow):
-            parent = parent.parentWidget()
+        parent = self._getMainWindow()
         if parent and hasattr(parent, "conversationDb"):
-            parent.conversationDb.updateConversationHistory(self.conversationId, self.chatSession.conversationHistory)
+            history = self.chatSession.conversationHistory
+            trimmedCount = self.chatSession.trimmedMessageCount
+            tokens = self.chatSession.countTokens()
+            persisted = self._persistedHistoryState
+            if persisted is not None and persisted[1] == trimmedCount and persisted[0] <= len(history):
+                # Nothing was trimmed since the last save: only the new messages need to be written.
+                saved = parent.conversationDb.appendConversationMessages(self.conversationId, history[persisted[0]:], tokens)
+            else:
+                saved = parent.conversationDb.updateConversationState(self.conversationId, history, tokens)
+            self._persistedHistoryState = (len(history), trimmedCount) if saved else None
             logging.info(f"Saved updated conversation history for ID {self.conversationId}.")
@@ -1,10 +1,25 @@
 import os
 import sys
 import logging
-import openai
-from typing import List, Dict
+import functools
+from typing import List, Dict, TYPE_CHECKING
 
+if TYPE_CHECKING:
+    import openai
+    from PySide6.QtCore import QSettings
+    from PySide6.QtGui import QIcon, QPixmap
 
+
+# Evaluated once at import time; neither value can change while the process runs.
+_FROZEN = getattr(sys, "frozen", False)
+# PyInstaller creates a temp folder and stores path in sys._MEIPASS
+_BASE_DIR_FROZEN = os.path.dirname(sys.executable)
+_BASE_DIR_SRC = os.path.dirname(os.path.abspath(__file__))
+
+
+# Unbounded: the arguments are a small fixed set of asset and file names, and an unbounded cache
+# is a plain dict lookup without the LRU bookkeeping.
+@functools.cache
 def resourcePath(relativePath: str, forcedPath: bool = False) -> str:
     """
     Get absolute path to resource, works for development and for PyInstaller.
@@ -16,62 +31,147 @@ def resourcePath(relativePath: str, forcedPath: bool = False) -> str:
     Returns:
         str: The absolute path to the resource.
     """
-    if getattr(sys, "frozen", False):
-        # PyInstaller creates a temp folder and stores path in sys._MEIPASS
-        baseDir = os.path.dirname(sys.executable)
-    else:
-        baseDir = os.path.dirname(os.path.abspath(__file__))
+    baseDir = _BASE_DIR_FROZEN if _FROZEN and not forcedPath else _BASE_DIR_SRC
+    return os.path.join(baseDir, relativePath)
 
-    if forcedPath:
-        baseDir = os.path.dirname(os.path.abspath(__file__))
 
-    return os.path.join(baseDir, relativePath)
+def loadPixmap(relativePath: str) -> "QPixmap":
+    """
+    Loads an asset pixmap through QPixmapCache, so each PNG is decoded once for the whole application.
+    Must be called from the GUI thread.
+
+    Args:
+        relativePath (str): The asset path relative to the package directory, e.g. "assets/blah.png".
+
+    Returns:
+        QPixmap: The (possibly shared) pixmap.
+    """
+    from PySide6.QtGui import QPixmap, QPixmapCache
 
+    key = "asset:" + relativePath
+    pixmap = QPixmapCache.find(key)
+    if pixmap is None:
+        pixmap = QPixmap(resourcePath(relativePath, forcedPath=True))
+        QPixmapCache.insert(key, pixmap)
+    return pixmap
 
-def initOpenAiClient(deploymentConfig: Dict[str, str]) -> [openai.OpenAI | openai.AzureOpenAI]:
+
+# Icons created by loadIcon, by asset path.
+_ICONS = {}
+
+
+def loadIcon(relativePath: str) -> "QIcon":
+    """
+    Returns the application-wide QIcon for an asset, creating it on first use.
+    Must be called from the GUI thread.
+
+    Args:
+        relativePath (str): The asset path relative to the package directory, e.g. "assets/add-square.png".
+
+    Returns:
+        QIcon: The shared icon.
+    """
+    icon = _ICONS.get(relativePath)
+    if icon is None:
+        from PySide6.QtGui import QIcon
+
+        icon = _ICONS[relativePath] = QIcon(resourcePath(relativePath, forcedPath=True))
+    return icon
+
+
+@functools.cache
+def _apiKey(deploymentType: str) -> str:
+    """
+    Looks up the API key for the given deployment type in the environment, once per process.
+    Call _apiKey.cache_clear() if the environment variables are changed at runtime.
+
+    Args:
+        deploymentType (str): The lower-cased deployment type, e.g. "azure" or "openai".
+
+    Raises:
+        ValueError: If the API key environment variable is not set.
+    """
+    apiKey = os.environ.get("AZURE_OPENAI_API_KEY") if deploymentType == "azure" else os.environ.get("OPENAI_API_KEY")
+    if not apiKey:
+        raise ValueError("API key environment variable is not set.")
+    return apiKey
+
+
+def validateDeployments(deploymentConfigs: List[Dict[str, str]]) -> None:
+    """
+    Validates all deployment configurations once, at startup, so that initOpenAiClient can trust its input.
+    Every problem is collected first and reported in a single error.
+
+    Args:
+        deploymentConfigs (List[Dict[str, str]]): The deployment configuration dictionaries.
+
+    Raises:
+        ValueError: If any deployment configuration is invalid.
+    """
+    errors = []
+    for deploymentConfig in deploymentConfigs:
+        deploymentType = deploymentConfig.get("type", "").lower()
+        endpoint = deploymentConfig.get("endpoint")
+        deploymentName = deploymentConfig.get("deploymentName")
+        apiVersion = deploymentConfig.get("apiVersion")
+
+        if deploymentType == "azure":
+            if not endpoint or not deploymentName or not apiVersion:
+                errors.append(f"{deploymentName or '<unnamed>'}: Missing required Azure OpenAI configuration.")
+        elif deploymentType == "openai":
+            if not endpoint or not deploymentName:
+                errors.append(f"{deploymentName or '<unnamed>'}: deploymentName is not set for OpenAI configuration.")
+        else:
+            errors.append(f"{deploymentName or '<unnamed>'}: Unknown deployment type: {deploymentType}")
+
+    if errors:
+        raise ValueError("Invalid deployment configuration:\n" + "\n".join(errors))
+
+
+def initOpenAiClient(deploymentConfig: Dict[str, str]) -> "openai.OpenAI | openai.AzureOpenAI":
     """
     Initializes the OpenAI client based on a specific deployment configuration.
+    The configuration is expected to have passed validateDeployments already.
 
     Args:
         deploymentConfig (Dict[str, str]): The deployment configuration dictionary.
 
     Raises:
-        ValueError: If any required settings are missing.
+        ValueError: If the API key is missing or the deployment type is unknown.
     """
-    logging.info(f"Initializing OpenAI with deployment: {deploymentConfig['deploymentName']}")
+    # Imported here rather than at module level: the SDK is heavy and only needed once a client is created.
+    import openai
+
+    logging.info("Initializing OpenAI with deployment: %s", deploymentConfig["deploymentName"])
 
     deployment_type = deploymentConfig["type"].lower()
     endpoint = deploymentConfig["endpoint"]
-    deployment_name = deploymentConfig["deploymentName"]
     api_version = deploymentConfig["apiVersion"]
 
-    api_key = os.environ.get("AZURE_OPENAI_API_KEY") if deployment_type == "azure" else os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("API key environment variable is not set.")
+    # Rejected before the API key lookup, which would otherwise report a missing key for an unknown type.
+    if deployment_type not in ("azure", "openai"):
+        raise ValueError(f"Unknown deployment type: {deployment_type}")
+
+    api_key = _apiKey(deployment_type)
 
     if deployment_type == "azure":
-        if not endpoint or not deployment_name or not api_version:
-            raise ValueError("Missing required Azure OpenAI configuration.")
         client = openai.AzureOpenAI(api_version=api_version, azure_endpoint=endpoint)
         client.api_type = "azure"
         # client.api_base = endpoint
         # client.api_version = api_version
         client.api_key = api_key
         logging.info("Azure OpenAI client configured.")
-    elif deployment_type == "openai":
-        if not endpoint or not deployment_name:
-            raise ValueError("deploymentName is not set for OpenAI configuration.")
+    else:
         client = openai.OpenAI()
         client.api_type = "openai"
         client.api_base = endpoint
         client.api_key = api_key
         logging.info("Standard OpenAI client configured.")
-    else:
-        raise ValueError(f"Unknown deployment type: {deployment_type}")
 
     return client
 
 
+@functools.cache
 def getDatabasePath() -> str:
     """
     Returns the path to the SQLite database file.
@@ -81,3 +181,38 @@ def getDatabasePath() -> str:
     """
     baseDir = os.path.dirname(resourcePath(""))
     return os.path.join(baseDir, "conversations.db")
+
+
+@functools.cache
+def getSettings() -> "QSettings":
+    """
+    Returns the application-wide QSettings object backed by settings.ini.
+    The INI file is opened and parsed once per process; every caller shares the same instance.
+
+    Returns:
+        QSettings: The shared settings object.
+    """
+    from PySide6.QtCore import QSettings
+
+    settingsFile = resourcePath("settings.ini")
+    logging.info("Reading configuration from: %s", settingsFile)
+    return QSettings(str(settingsFile), QSettings.Format.IniFormat)
+
+
+def setSettingIfChanged(settings: "QSettings", key: str, value) -> bool:
+    """
+    Stores a value in the settings unless it already holds that value.
+    QSettings marks every setValue as a change, so skipping unchanged values lets sync() leave the file alone.
+
+    Args:
+        settings (QSettings): The settings object, usually the one returned by getSettings.
+        key (str): The settings key, e.g. "App/theme".
+        value: The value to store.
+
+    Returns:
+        bool: True if the value was stored, False if it was unchanged.
+    """
+    if settings.contains(key) and settings.value(key) == value:
+        return False
+    settings.setValue(key, value)
+    return True
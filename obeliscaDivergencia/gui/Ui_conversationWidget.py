@@ -8,17 +8,15 @@
 ## WARNING! All changes made in this file will be lost when recompiling UI file!
 ################################################################################
 
-from PySide6.QtCore import (QCoreApplication, QDate, QDateTime, QLocale,
-    QMetaObject, QObject, QPoint, QRect,
-    QSize, QTime, QUrl, Qt)
-from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor,
-    QFont, QFontDatabase, QGradient, QIcon,
-    QImage, QKeySequence, QLinearGradient, QPainter,
-    QPalette, QPixmap, QRadialGradient, QTransform)
-from PySide6.QtWidgets import (QAbstractItemView, QApplication, QFrame, QHBoxLayout,
-    QLabel, QListView, QListWidget, QListWidgetItem,
-    QPushButton, QSizePolicy, QSpacerItem, QTextBrowser,
-    QTextEdit, QVBoxLayout, QWidget)
+from PySide6.QtCore import (QCoreApplication, QMetaObject, QSize, Qt)
+from PySide6.QtWidgets import (QAbstractItemView, QFrame, QHBoxLayout, QLabel,
+    QListView, QListWidget, QPushButton, QSizePolicy,
+    QSpacerItem, QTextBrowser, QTextEdit, QVBoxLayout)
+
+_SIZE_0_40 = QSize(0, 40)
+_SIZE_16777215_80 = QSize(16777215, 80)
+_SIZE_100_18 = QSize(100, 18)
+_SIZE_16_16 = QSize(16, 16)
 
 class Ui_conversationForm(object):
     def setupUi(self, conversationForm):
@@ -59,8 +57,8 @@ class Ui_conversationForm(object):
         sizePolicy.setVerticalStretch(0)
         sizePolicy.setHeightForWidth(self.attachedFilesList.sizePolicy().hasHeightForWidth())
         self.attachedFilesList.setSizePolicy(sizePolicy)
-        self.attachedFilesList.setMinimumSize(QSize(0, 40))
-        self.attachedFilesList.setMaximumSize(QSize(16777215, 80))
+        self.attachedFilesList.setMinimumSize(_SIZE_0_40)
+        self.attachedFilesList.setMaximumSize(_SIZE_16777215_80)
         self.attachedFilesList.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.attachedFilesList.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
         self.attachedFilesList.setHorizontalScrollMode(QAbstractItemView.ScrollPerPixel)
@@ -74,17 +72,17 @@ class Ui_conversationForm(object):
         self.fileButtonsLayout.setObjectName(u"fileButtonsLayout")
         self.attachDirectoryButton = QPushButton(conversationForm)
         self.attachDirectoryButton.setObjectName(u"attachDirectoryButton")
-        self.attachDirectoryButton.setMinimumSize(QSize(100, 18))
+        self.attachDirectoryButton.setMinimumSize(_SIZE_100_18)
         self.attachDirectoryButton.setStyleSheet(u"text-align: left; padding-left: 10px")
-        self.attachDirectoryButton.setIconSize(QSize(16, 16))
+        self.attachDirectoryButton.setIconSize(_SIZE_16_16)
 
         self.fileButtonsLayout.addWidget(self.attachDirectoryButton)
 
         self.attachButton = QPushButton(conversationForm)
         self.attachButton.setObjectName(u"attachButton")
-        self.attachButton.setMinimumSize(QSize(100, 18))
+        self.attachButton.setMinimumSize(_SIZE_100_18)
         self.attachButton.setStyleSheet(u"text-align: left; padding-left: 10px")
-        self.attachButton.setIconSize(QSize(16, 16))
+        self.attachButton.setIconSize(_SIZE_16_16)
 
         self.fileButtonsLayout.addWidget(self.attachButton)
 
@@ -104,8 +102,8 @@ class Ui_conversationForm(object):
         self.userInput.setObjectName(u"userInput")
         sizePolicy.setHeightForWidth(self.userInput.sizePolicy().hasHeightForWidth())
         self.userInput.setSizePolicy(sizePolicy)
-        self.userInput.setMinimumSize(QSize(0, 40))
-        self.userInput.setMaximumSize(QSize(16777215, 80))
+        self.userInput.setMinimumSize(_SIZE_0_40)
+        self.userInput.setMaximumSize(_SIZE_16777215_80)
         self.userInput.setFrameShape(QFrame.Box)
 
         self.messageLayout.addWidget(self.userInput)
@@ -114,9 +112,9 @@ class Ui_conversationForm(object):
         self.sendButtonLayout.setObjectName(u"sendButtonLayout")
         self.sendButton = QPushButton(conversationForm)
         self.sendButton.setObjectName(u"sendButton")
-        self.sendButton.setMinimumSize(QSize(100, 18))
+        self.sendButton.setMinimumSize(_SIZE_100_18)
         self.sendButton.setStyleSheet(u"text-align: left; padding-left: 10px")
-        self.sendButton.setIconSize(QSize(16, 16))
+        self.sendButton.setIconSize(_SIZE_16_16)
 
         self.sendButtonLayout.addWidget(self.sendButton)
 
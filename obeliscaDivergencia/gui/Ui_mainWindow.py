@@ -8,17 +8,11 @@
 ## WARNING! All changes made in this file will be lost when recompiling UI file!
 ################################################################################
 
-from PySide6.QtCore import (QCoreApplication, QDate, QDateTime, QLocale,
-    QMetaObject, QObject, QPoint, QRect,
-    QSize, QTime, QUrl, Qt)
-from PySide6.QtGui import (QAction, QBrush, QColor, QConicalGradient,
-    QCursor, QFont, QFontDatabase, QGradient,
-    QIcon, QImage, QKeySequence, QLinearGradient,
-    QPainter, QPalette, QPixmap, QRadialGradient,
-    QTransform)
-from PySide6.QtWidgets import (QAbstractItemView, QApplication, QHBoxLayout, QLabel,
-    QListWidget, QListWidgetItem, QMainWindow, QMenu,
-    QMenuBar, QSizePolicy, QStatusBar, QTabWidget,
+from PySide6.QtCore import (QCoreApplication, QMetaObject, QRect, QSize,
+    Qt)
+from PySide6.QtGui import (QAction, QIcon)
+from PySide6.QtWidgets import (QAbstractItemView, QHBoxLayout, QLabel, QListView,
+    QMenu, QMenuBar, QStatusBar, QTabWidget,
     QToolBar, QVBoxLayout, QWidget)
 
 class Ui_MainWindow(object):
@@ -42,7 +36,7 @@ class Ui_MainWindow(object):
 
         self.verticalLayout.addWidget(self.label)
 
-        self.conversationsList = QListWidget(self.centralwidget)
+        self.conversationsList = QListView(self.centralwidget)
         self.conversationsList.setObjectName(u"conversationsList")
         self.conversationsList.setMaximumSize(QSize(200, 16777215))
         self.conversationsList.setProperty(u"showDropIndicator", False)
@@ -0,0 +1,118 @@
+from typing import Optional
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, Signal
+from PySide6.QtGui import QIcon
+
+
+class ConversationListModel(QAbstractListModel):
+    """
+    A list model of the conversations shown in the conversationsList, one row per conversation.
+    Each row only holds the conversation ID, the displayed text and the tooltip; the icon is shared by all rows.
+    Emits titleEdited when the user edits a title in the view, but not when a title is set with setConversationText.
+    """
+
+    titleEdited = Signal(int, str)  # conversationId, newTitle
+
+    # Positions in a row list.
+    ID, TEXT, TOOLTIP = range(3)
+
+    def __init__(self, icon: Optional[QIcon] = None, parent=None):
+        super().__init__(parent)
+        self._icon = icon
+        # [conversationId, text, toolTip] per row, in display order.
+        self._rows = []
+        # Row of every conversation ID, rebuilt whenever rows are inserted or removed.
+        self._rowById = {}
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return row[self.TEXT]
+        if role == Qt.ItemDataRole.UserRole:
+            return row[self.ID]
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return row[self.TOOLTIP]
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self._icon
+        return None
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlag:
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        return Qt.ItemFlag.ItemIsSelectable | Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsEditable
+
+    def setData(self, index: QModelIndex, value, role: int = Qt.ItemDataRole.EditRole) -> bool:
+        """
+        Stores a title edited in the view and emits titleEdited.
+        """
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
+        row = self._rows[index.row()]
+        row[self.TEXT] = str(value)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole])
+        self.titleEdited.emit(row[self.ID], row[self.TEXT])
+        return True
+
+    def indexOf(self, conversationId: int) -> QModelIndex:
+        """
+        Returns the index of the conversation's row, or an invalid index if it is not in the list.
+        """
+        row = self._rowById.get(conversationId)
+        return QModelIndex() if row is None else self.index(row)
+
+    def setConversationText(self, conversationId: int, text: str) -> bool:
+        """
+        Changes the text shown for a conversation without emitting titleEdited.
+
+        Returns:
+            bool: True if the conversation is in the list.
+        """
+        index = self.indexOf(conversationId)
+        if not index.isValid():
+            return False
+        self._rows[index.row()][self.TEXT] = text
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole])
+        return True
+
+    def insertConversation(self, row: int, conversationId: int, text: str, toolTip: str):
+        """
+        Inserts a conversation at the given row.
+        """
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._rows.insert(row, [conversationId, text, toolTip])
+        self._reindex()
+        self.endInsertRows()
+
+    def loadConversations(self, rows: list):
+        """
+        Replaces the list with the given (conversationId, text, toolTip) rows in a single model reset.
+        Conversations already in the list but not among the rows (created while the rows were read) stay on top.
+        """
+        loadedIds = {row[0] for row in rows}
+        newerRows = [row for row in self._rows if row[self.ID] not in loadedIds]
+        self.beginResetModel()
+        self._rows = newerRows + [list(row) for row in rows]
+        self._reindex()
+        self.endResetModel()
+
+    def removeConversations(self, conversationIds: list):
+        """
+        Removes the rows of the given conversations. Adjacent rows are removed together.
+        """
+        rows = sorted((self._rowById[convoId] for convoId in conversationIds if convoId in self._rowById), reverse=True)
+        # Walk from the bottom, so the rows still to be removed keep their numbers.
+        while rows:
+            last = first = rows.pop(0)
+            while rows and rows[0] == first - 1:
+                first = rows.pop(0)
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self._rows[first:last + 1]
+            self._reindex()
+            self.endRemoveRows()
+
+    def _reindex(self):
+        self._rowById = {row[self.ID]: rowNumber for rowNumber, row in enumerate(self._rows)}
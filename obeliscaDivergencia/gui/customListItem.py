@@ -1,16 +1,28 @@
 import logging
 
 from PySide6.QtWidgets import QWidget, QLabel, QHBoxLayout, QPushButton
-from PySide6.QtGui import QIcon, QPixmap
 from PySide6.QtCore import QSize, Signal  # Import Signal
 
-from obeliscaDivergencia.config import resourcePath
+from obeliscaDivergencia.config import loadIcon, loadPixmap
 
 
 class CustomListItem(QWidget):
     # Define a signal that emits the file path to be removed
     removeClicked = Signal(str)
 
+    # Icons shared by all list items. Loaded lazily on first use (a QPixmap needs a QApplication).
+    _LEFT_PIXMAP = None
+    _RIGHT_ICON = None
+
+    @classmethod
+    def _assets(cls):
+        """
+        Loads the shared pixmap/icon once, so that the PNGs are not decoded again for every item.
+        """
+        if cls._LEFT_PIXMAP is None:
+            cls._LEFT_PIXMAP = loadPixmap("assets/new-file.png").scaled(16, 16)
+            cls._RIGHT_ICON = loadIcon("assets/delete-red.png")
+
     def __init__(self, text):
         super().__init__()
 
@@ -23,9 +35,10 @@ class CustomListItem(QWidget):
         self.rightIconButton.setFlat(True)
 
         # Set the pixmaps/icons for the icons.
-        self.leftIconLabel.setPixmap(QPixmap(resourcePath("assets/new-file.png", forcedPath=True)).scaled(16, 16))
+        self._assets()
+        self.leftIconLabel.setPixmap(type(self)._LEFT_PIXMAP)
         # Instead of setting the pixmap on a label, set an icon on the push button.
-        self.rightIconButton.setIcon(QIcon(resourcePath("assets/delete-red.png", forcedPath=True)))
+        self.rightIconButton.setIcon(type(self)._RIGHT_ICON)
         self.rightIconButton.setIconSize(QSize(8, 8))
 
         # Set up the horizontal layout.
@@ -1,11 +1,13 @@
-import logging
 import os
+import stat
+import itertools
+from typing import Iterator
 from PySide6.QtWidgets import QListWidget, QListWidgetItem
-from PySide6.QtCore import Qt, QMimeData
+from PySide6.QtCore import Qt, QMimeData, QTimer
 from PySide6.QtGui import QDropEvent, QDragEnterEvent
 
 from obeliscaDivergencia.gui.customListItem import CustomListItem
-from obeliscaDivergencia.utils.fileUtils import normalizeFilePath, isBinaryFile
+from obeliscaDivergencia.utils.fileUtils import normalizeFilePath, isBinaryFile, walkFiles
 
 
 class DroppableListWidget(QListWidget):
@@ -14,13 +16,20 @@ class DroppableListWidget(QListWidget):
     Emits a signal with the list of file paths when files/folders are dropped.
     """
 
-    def __init__(self, parent, binaryExtensions, folderBalcklist):
+    # Number of dropped files handed to the parent per event-loop iteration.
+    DROP_BATCH_SIZE = 256
+
+    def __init__(self, parent, binaryExtensions, folderBlacklist):
         super().__init__(parent)
         self.parent = parent
         self.setAcceptDrops(True)
         self.setDragDropMode(QListWidget.DragDropMode.DropOnly)
-        self.binaryExtensions = binaryExtensions
-        self.folderBalcklist = folderBalcklist
+        # Membership is tested once per directory entry while walking a drop, so keep it O(1).
+        self.binaryExtensions = frozenset(ext.lower() for ext in binaryExtensions)
+        self.folderBlacklist = frozenset(folderBlacklist)
+        # Iterator over the files of a drop that are not attached yet.
+        self._pendingDrop = None
+        self._dropCancelled = False
 
     def dragEnterEvent(self, event: QDragEnterEvent):
         if event.mimeData().hasUrls():
@@ -38,22 +47,64 @@ class DroppableListWidget(QListWidget):
         if event.mimeData().hasUrls():
             urls = event.mimeData().urls()
             filePaths = [url.toLocalFile() for url in urls]
-            attachedFiles = []
-            for path in filePaths:
-                if os.path.isfile(path):
-                    normalizedPath = normalizeFilePath(path)
-                    attachedFiles.append(normalizedPath)
-                elif os.path.isdir(path):
-                    # Recursively add files from the directory
-                    for root, dirs, files in os.walk(path):
-                        # Filter out blacklisted directories.
-                        dirs[:] = [dirName for dirName in dirs if dirName not in self.folderBalcklist]
-                        for file in files:
-                            fullPath = os.path.join(root, file)
-                            normalizedPath = normalizeFilePath(fullPath)
-                            attachedFiles.append(normalizedPath)
-            if attachedFiles:
-                self.parent.attachFiles(attachedFiles)
+            droppedFiles = self._iterDroppedFiles(filePaths)
             event.acceptProposedAction()
+
+            if self._pendingDrop is not None:
+                # A previous drop is still being attached; queue this one behind it.
+                self._pendingDrop = itertools.chain(self._pendingDrop, droppedFiles)
+            else:
+                self._dropCancelled = False
+                self._pendingDrop = droppedFiles
+                self._attachNextDropBatch()
         else:
             event.ignore()
+
+    def cancelPendingDrop(self):
+        """
+        Stops attaching the rest of a drop that is still being processed.
+        """
+        self._dropCancelled = True
+        self._pendingDrop = None
+
+    def _attachNextDropBatch(self):
+        """
+        Hands the next batch of dropped files to the parent, then yields to the event loop
+        so that large directory drops do not freeze the UI.
+        """
+        if self._dropCancelled or self._pendingDrop is None:
+            return
+
+        batch = list(itertools.islice(self._pendingDrop, self.DROP_BATCH_SIZE))
+        if batch:
+            self.parent.attachFiles(batch)
+        if len(batch) == self.DROP_BATCH_SIZE:
+            QTimer.singleShot(0, self._attachNextDropBatch)
+        else:
+            self._pendingDrop = None
+
+    def _iterDroppedFiles(self, filePaths: list) -> Iterator[str]:
+        """
+        Lazily yields the normalized paths of all non-binary files in the dropped paths,
+        recursing into directories (ignoring blacklisted folder names).
+        """
+        # Bind to locals once; the walk below may visit thousands of entries.
+        normalize = normalizeFilePath
+        blacklist = self.folderBlacklist
+        binaryExtensions = self.binaryExtensions
+        splitext = os.path.splitext
+        for path in filePaths:
+            # One stat call per dropped path instead of isfile() followed by isdir().
+            try:
+                mode = os.stat(path).st_mode
+            except OSError:
+                continue
+            if stat.S_ISREG(mode):
+                yield normalize(path)
+            elif stat.S_ISDIR(mode):
+                # Recursively add files from the directory; blacklisted folders are skipped by the walk.
+                for entry in walkFiles(path, blacklist):
+                    # Cheap extension filter first, so binaries are never collected.
+                    if splitext(entry.name)[1].lower() in binaryExtensions:
+                        continue
+                    yield normalize(entry.path)
@@ -1,6 +1,8 @@
 from PySide6.QtWidgets import QTextEdit
 from PySide6.QtCore import Qt, Signal
 
+SEND_KEYS = (Qt.Key.Key_Return, Qt.Key.Key_Enter)
+
 
 class SendableTextEdit(QTextEdit):
     # Custom signal to indicate that the user wants to send the message.
@@ -15,20 +17,9 @@ class SendableTextEdit(QTextEdit):
 
     def keyPressEvent(self, event):
         # Check if Ctrl+Enter (or Ctrl+Return) is pressed.
-        # Note: Qt.Key_Enter may include the KeypadModifier.
-        key = event.key()
-        mod = event.modifiers()
-
-        accepted = False
-
-        # Check for Ctrl+Return (regular Return key with Control)
-        if key == Qt.Key.Key_Return and mod == Qt.KeyboardModifier.ControlModifier:
-            accepted = True
-        # Check for Ctrl+Enter (enter key from the keypad, which comes with an extra modifier)
-        elif key == Qt.Key.Key_Enter and mod == (Qt.KeyboardModifier.ControlModifier | Qt.KeyboardModifier.KeypadModifier):
-            accepted = True
-
-        if accepted:
+        # Note: Qt.Key_Enter comes with the KeypadModifier, and some platforms add others (e.g. NumLock),
+        # so only the Control bit is tested instead of comparing the whole modifier set.
+        if event.key() in SEND_KEYS and event.modifiers() & Qt.KeyboardModifier.ControlModifier:
             self.sendMessage.emit()
             event.accept()
         else:
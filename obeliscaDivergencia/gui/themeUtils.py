@@ -5,6 +5,9 @@ Call applyTheme(app, "light") or applyTheme(app, "dark").
 from PySide6.QtGui import QPalette, QColor
 from PySide6.QtWidgets import QApplication
 
+# Palettes are built on first use and reused afterwards, keyed by theme name.
+_PALETTES: dict[str, QPalette] = {}
+
 
 def _buildLightPalette() -> QPalette:
     palette = QPalette()
@@ -44,6 +47,14 @@ def _buildDarkPalette() -> QPalette:
     return palette
 
 
+def _palette(theme: str) -> QPalette:
+    palette = _PALETTES.get(theme)
+    if palette is None:
+        palette = _buildDarkPalette() if theme == "dark" else _buildLightPalette()
+        _PALETTES[theme] = palette
+    return palette
+
+
 def applyTheme(app: QApplication, theme: str = "light"):
     """
     Force application‐wide theme.
@@ -53,11 +64,6 @@ def applyTheme(app: QApplication, theme: str = "light"):
     app   : QApplication
     theme : str  "light" | "dark"
     """
-    theme = theme.lower()
-    if theme == "dark":
-        app.setStyle("Fusion")  # Fusion style is easiest to skin
-        app.setPalette(_buildDarkPalette())
-    else:  # default to light
-        app.setStyle("Fusion")
-        app.setPalette(_buildLightPalette())
-
+    theme = "dark" if theme.lower() == "dark" else "light"  # default to light
+    app.setStyle("Fusion")  # Fusion style is easiest to skin
+    app.setPalette(_palette(theme))
@@ -1,25 +1,55 @@
+import os
 import logging
 import colorlog
+from colorlog.escape_codes import escape_codes
+
+LOG_FORMAT = "[%(asctime)s] - %(levelname)s - %(name)s - [%(module)s:%(funcName)s:%(lineno)d] - %(message)s"
+LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Environment variable that sets the log level (e.g. DEBUG); INFO if unset or unknown.
+LOG_LEVEL_VARIABLE = "OBELISCA_LOG_LEVEL"
+LOG_COLORS = {
+    "DEBUG": "white",
+    "INFO": "green",
+    "WARNING": "purple",
+    "ERROR": "red",
+    "CRITICAL": "bold_red",
+}
+
+
+class CachedColorFormatter(logging.Formatter):
+    """
+    Formatter that colors each record by its level. The escape codes are looked up once, when
+    the formatter is created, instead of being resolved for every record as colorlog does.
+    """
+
+    def __init__(self, fmt: str, datefmt: str, logColors: dict):
+        super().__init__(fmt, datefmt)
+        self._prefixes = {levelName: escape_codes[color] for levelName, color in logColors.items()}
+        self._reset = escape_codes["reset"]
+
+    def format(self, record: logging.LogRecord) -> str:
+        prefix = self._prefixes.get(record.levelname)
+        message = super().format(record)
+        if prefix is None:
+            return message
+        return "".join((prefix, message, self._reset))
+
+
+def getLogLevel() -> int:
+    """
+    Returns the log level named by the OBELISCA_LOG_LEVEL environment variable, defaulting to INFO.
+    """
+    level = getattr(logging, os.environ.get(LOG_LEVEL_VARIABLE, "INFO").upper(), None)
+    return level if isinstance(level, int) else logging.INFO
 
 
 def setupLogging():
     # Create a stream handler for console output.
     consoleHandler = colorlog.StreamHandler()
-    formatter = colorlog.ColoredFormatter(
-        "%(log_color)s[%(asctime)s] - %(levelname)s - %(name)s - [%(module)s:%(funcName)s:%(lineno)d] - %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-        log_colors={
-            "DEBUG": "white",
-            "INFO": "green",
-            "WARNING": "purple",
-            "ERROR": "red",
-            "CRITICAL": "bold_red",
-        },
-    )
-    consoleHandler.setFormatter(formatter)
+    consoleHandler.setFormatter(CachedColorFormatter(LOG_FORMAT, LOG_DATE_FORMAT, LOG_COLORS))
 
     # Get the root logger, clear existing handlers, and add the colored console handler.
     rootLogger = colorlog.getLogger()
     rootLogger.handlers = []  # Remove old handlers if any.
     rootLogger.addHandler(consoleHandler)
-    rootLogger.setLevel(logging.DEBUG)
+    rootLogger.setLevel(getLogLevel())
@@ -9,22 +9,49 @@ from PySide6.QtWidgets import (
     QApplication,
     QComboBox,
     QLabel,
-    QListWidgetItem,
-    QListWidget,
+    QListView,
     QMenu,
     QInputDialog,
     QAbstractItemView,
 )
-from PySide6.QtCore import QByteArray, QSettings, Qt, QPoint, QThreadPool
+from PySide6.QtCore import QByteArray, Qt, QPoint, QThreadPool, QTimer, QModelIndex
 from PySide6.QtGui import QIcon, QKeySequence, QAction, QActionGroup
 
 from obeliscaDivergencia.gui.Ui_mainWindow import Ui_MainWindow
+from obeliscaDivergencia.gui.conversationListModel import ConversationListModel
 from obeliscaDivergencia.gui.themeUtils import applyTheme
 from obeliscaDivergencia.chatTab import ChatTab
 from obeliscaDivergencia.chatSession import ChatSession
+from obeliscaDivergencia.worker import ConversationListWorker
 from obeliscaDivergencia.utils.database import ConversationDatabase
 from obeliscaDivergencia.utils.vacuumWorker import VacuumWorker, VacuumWorkerSignals
-from obeliscaDivergencia.config import getDatabasePath, resourcePath
+from obeliscaDivergencia.config import (
+    getDatabasePath,
+    resourcePath,
+    getSettings,
+    setSettingIfChanged,
+    loadIcon,
+    loadPixmap,
+    validateDeployments,
+)
+
+# Format of the creation time shown in the conversationsList tooltips.
+TOOLTIP_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S %z"
+
+
+def _formatCreatedAt(createdAt: str) -> str:
+    """
+    Formats a stored (UTC, ISO 8601) creation time in local time for a conversationsList tooltip.
+    Returns the stored value unchanged if it cannot be parsed.
+    """
+    try:
+        utcTimestamp = datetime.datetime.fromisoformat(createdAt)
+    except ValueError:
+        return createdAt
+    if utcTimestamp.tzinfo is None:
+        utcTimestamp = utcTimestamp.replace(tzinfo=datetime.timezone.utc)
+    # astimezone() without an argument picks the offset valid at that time, so DST changes are respected.
+    return utcTimestamp.astimezone().strftime(TOOLTIP_TIMESTAMP_FORMAT)
 
 
 class MainWindow(QMainWindow):
@@ -33,6 +60,11 @@ class MainWindow(QMainWindow):
     Manages multiple ChatTab instances and integrates conversation management via SQLite.
     """
 
+    # Minimum time between two updates of the token label; updates in between are coalesced.
+    TOKEN_DISPLAY_INTERVAL_MS = 50
+    # Quiet time after the last title edit before the edited titles are written to the database.
+    TITLE_WRITE_DELAY_MS = 500
+
     def __init__(self, systemPrompt: str):
         super().__init__()
         self.systemPrompt = systemPrompt
@@ -46,12 +78,12 @@ class MainWindow(QMainWindow):
 
         self.ui.conversationsList.setStyleSheet(
             """
-            QListWidget::item {
+            QListView::item {
                 padding: 5px;               /* padding around individual items */
                 margin: 2px;                /* spacing between items */
                 background-color: #eef2ff;  /* light blue background */
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background-color: #8aa0d7;  /* darker blue background when selected */
             }
         """
@@ -62,19 +94,19 @@ class MainWindow(QMainWindow):
         self.ui.conversationsList.customContextMenuRequested.connect(self.onConversationsListContextMenu)
 
         # Configure the File menu.
-        self.ui.actionExit.setIcon(QIcon(resourcePath("assets/delete-red.png", forcedPath=True)))
+        self.ui.actionExit.setIcon(loadIcon("assets/delete-red.png"))
         self.ui.actionExit.triggered.connect(QApplication.quit)
 
         # Create new chat action.
         self.actionNewChat = QAction("New Chat", self)
-        self.actionNewChat.setIcon(QIcon(resourcePath("assets/add-square.png", forcedPath=True)))
+        self.actionNewChat.setIcon(loadIcon("assets/add-square.png"))
         self.actionNewChat.setToolTip("Start a new conversation")
         self.actionNewChat.setShortcut(QKeySequence("Ctrl+T"))
         self.actionNewChat.triggered.connect(self.createNewChatTab)
 
         # Create delete chat action.
         self.actionDeleteChat = QAction("Delete Chat", self)
-        self.actionDeleteChat.setIcon(QIcon(resourcePath("assets/subtract-square.png", forcedPath=True)))
+        self.actionDeleteChat.setIcon(loadIcon("assets/subtract-square.png"))
         self.actionDeleteChat.setToolTip("Delete selected conversation(s)")
         self.actionDeleteChat.setShortcut(QKeySequence(Qt.Key.Key_Delete))
         self.actionDeleteChat.triggered.connect(self.deleteSelectedChat)
@@ -93,9 +125,18 @@ class MainWindow(QMainWindow):
         self.ui.toolBar.addAction(self.actionDeleteChat)
 
         # settings
-        settingsFile = resourcePath("settings.ini")
-        logging.info(f"Reading configuration from: {settingsFile}")
-        self.settings = QSettings(str(settingsFile), QSettings.Format.IniFormat)
+        self.settings = getSettings()
+        # (settings.ini modification time, deployment configurations, configurations by deployment name),
+        # filled by _loadDeploymentConfigs.
+        self._deploymentConfigsCache = None
+
+        # Icon of the conversationsList items, loaded once and shared by all items (None if the file is missing).
+        chatIconPath = resourcePath("assets/chat-spark.png", forcedPath=True)
+        if os.path.exists(chatIconPath):
+            self._chatIcon = QIcon(chatIconPath)
+        else:
+            self._chatIcon = None
+            logging.warning("Icon file not found at: %s", chatIconPath)
 
         # Deployment Combobox Setup
         self.deploymentComboBox = QComboBox()
@@ -113,18 +154,33 @@ class MainWindow(QMainWindow):
         # Token Display Labels
         self.totalTokensLabel = QLabel("Tokens: <b>0</b>")
         self.ui.statusBar.addPermanentWidget(self.totalTokensLabel)
+        # Latest total passed to updateTokenDisplay, shown when _tokenDisplayTimer fires.
+        self._pendingTotalTokens = 0
+        self._tokenDisplayTimer = QTimer(self)
+        self._tokenDisplayTimer.setSingleShot(True)
+        self._tokenDisplayTimer.setInterval(self.TOKEN_DISPLAY_INTERVAL_MS)
+        self._tokenDisplayTimer.timeout.connect(self._flushTokenDisplay)
+        # Titles edited in the conversationsList but not yet stored, by conversation ID; written by _flushTitleWrites.
+        self._pendingTitleWrites = {}
+        self._titleWriteTimer = QTimer(self)
+        self._titleWriteTimer.setSingleShot(True)
+        self._titleWriteTimer.setInterval(self.TITLE_WRITE_DELAY_MS)
+        self._titleWriteTimer.timeout.connect(self._flushTitleWrites)
 
         # Initialize the SQLite database.
         dbPath = getDatabasePath()
         self.conversationDb = ConversationDatabase(dbPath)
-        logging.info(f"Initialized ConversationDatabase at {dbPath}")
+        logging.info("Initialized ConversationDatabase at %s", dbPath)
         # Start the database vacuum in the background
         self.startDatabaseVacuum(dbPath)
 
         # Clear any pre-existing tabs.
         self.ui.tabWidget.clear()
-        self.chatTabs = []
+        # The open ChatTabs by conversation ID. Their order is the one of tabWidget, which is the only list of tabs.
         self.conversationIdToTab = {}
+        # Rows of the conversationsList view; finds a conversation's row by ID without scanning the list.
+        self.conversationsModel = ConversationListModel(self._chatIcon, self)
+        self.ui.conversationsList.setModel(self.conversationsModel)
         self.currentChatTab = None
 
         # theme menu
@@ -149,8 +205,8 @@ class MainWindow(QMainWindow):
 
         # signals
         self.ui.tabWidget.currentChanged.connect(self.onTabChanged)
-        self.ui.conversationsList.itemChanged.connect(self.onConversationTitleEdited)
-        self.ui.conversationsList.itemClicked.connect(self.onConversationSelected)
+        self.conversationsModel.titleEdited.connect(self.onConversationTitleEdited)
+        self.ui.conversationsList.clicked.connect(self.onConversationSelected)
         self.actionThemeLight.triggered.connect(lambda: self.switchTheme("light"))
         self.actionThemeDark.triggered.connect(lambda: self.switchTheme("dark"))
 
@@ -161,10 +217,18 @@ class MainWindow(QMainWindow):
         # Create context menu actions
         self.createContextMenuActions()
 
+        # Available geometry of every screen, primary screen first; built on first use by _availableScreenRects
+        # and dropped whenever the set of screens changes.
+        self._screenRects = None
+        application = QApplication.instance()
+        application.screenAdded.connect(self._invalidateScreenRects)
+        application.screenRemoved.connect(self._invalidateScreenRects)
+        application.primaryScreenChanged.connect(self._invalidateScreenRects)
+
         self.loadWindowGeometry()
         self.createNewChatTab()
         self.populateConversationsList()
-        self.setWindowIcon(QIcon(resourcePath("assets/blah.png", forcedPath=True)))
+        self.setWindowIcon(QIcon(loadPixmap("assets/blah.png")))
 
     def createContextMenuActions(self):
         """
@@ -199,8 +263,7 @@ class MainWindow(QMainWindow):
         globalPosition = self.ui.conversationsList.viewport().mapToGlobal(position)
 
         # Determine the number of selected items
-        selectedItems = self.ui.conversationsList.selectedItems()
-        selectCount = len(selectedItems)
+        selectCount = len(self.ui.conversationsList.selectionModel().selectedIndexes())
 
         # Enable or disable actions based on selection
         if selectCount == 0:
@@ -222,43 +285,43 @@ class MainWindow(QMainWindow):
         """
         Renames the selected conversation.
         """
-        selectedItems = self.ui.conversationsList.selectedItems()
-        if len(selectedItems) != 1:
+        selectedIndexes = self.ui.conversationsList.selectionModel().selectedIndexes()
+        if len(selectedIndexes) != 1:
             QMessageBox.warning(self, "Rename Conversation", "Please select a single conversation to rename.")
             return
 
-        item = selectedItems[0]
-        conversationId = item.data(Qt.ItemDataRole.UserRole)
+        index = selectedIndexes[0]
+        conversationId = index.data(Qt.ItemDataRole.UserRole)
 
         if title:
             # user already provided title
             newTitle = title.strip()
         else:
             # Prompt the user for a new name
-            newTitle, ok = QInputDialog.getText(self, "Rename Conversation", "Enter new conversation title:", text=item.text())
+            newTitle, ok = QInputDialog.getText(self, "Rename Conversation", "Enter new conversation title:", text=index.data())
             if ok and newTitle.strip():
                 newTitle = newTitle.strip()
             else:
                 # QMessageBox.information(self, "Rename Conversation", "Renaming canceled or invalid title.")
                 return
 
-        # Update the database
+        # Update the database; an edit of the same title still waiting to be written is superseded.
+        self._pendingTitleWrites.pop(conversationId, None)
         self.conversationDb.updateConversationTitle(conversationId, newTitle)
-        # Update the QListWidgetItem
-        item.setText(newTitle)
-        logging.info(f"Renamed conversation ID {conversationId} to '{newTitle}'.")
+        # Update the list row; setConversationText does not emit titleEdited, so the title is not written again.
+        self.conversationsModel.setConversationText(conversationId, newTitle)
+        logging.info("Renamed conversation ID %s to '%s'.", conversationId, newTitle)
 
     def summarizeSelectedConversation(self):
         """
         Generates and displays a summary of the selected conversation.
         """
-        selectedItems = self.ui.conversationsList.selectedItems()
-        if len(selectedItems) != 1:
+        selectedIndexes = self.ui.conversationsList.selectionModel().selectedIndexes()
+        if len(selectedIndexes) != 1:
             QMessageBox.warning(self, "Summarize Conversation", "Please select a single conversation to summarize.")
             return
 
-        item = selectedItems[0]
-        conversationId = item.data(Qt.ItemDataRole.UserRole)
+        conversationId = selectedIndexes[0].data(Qt.ItemDataRole.UserRole)
 
         # Retrieve the associated ChatTab
         if conversationId in self.conversationIdToTab:
@@ -267,51 +330,77 @@ class MainWindow(QMainWindow):
             if summary:
                 # QMessageBox.information(self, "Conversation Summary", f"Summary:\n{summary}")
                 self.renameSelectedConversation(summary)
-                logging.info(f"Generated summary for conversation ID {conversationId}.")
+                logging.info("Generated summary for conversation ID %s.", conversationId)
             else:
                 QMessageBox.warning(self, "Summarize Conversation", "Failed to generate summary.")
-                logging.warning(f"Failed to generate summary for conversation ID {conversationId}.")
+                logging.warning("Failed to generate summary for conversation ID %s.", conversationId)
         else:
             # If the conversation tab is not open, load the conversation first
-            conversation = self.conversationDb.getConversationById(conversationId)
+            conversation = self.conversationDb.getConversationById(conversationId, includeHistory=False)
             if conversation:
                 deploymentName = conversation["deployment_name"]
                 # Find the deployment config matching the deploymentName
-                deployments = self.getDeploymentConfigs()
-                deploymentConfig = next((d for d in deployments if d["deploymentName"] == deploymentName), None)
+                deploymentConfig = self.getDeploymentConfig(deploymentName)
 
                 if not deploymentConfig:
                     QMessageBox.warning(
                         self, "Deployment Not Found", f"No deployment configuration found for '{deploymentName}'."
                     )
-                    logging.error(f"No deployment configuration found for '{deploymentName}'.")
+                    logging.error("No deployment configuration found for '%s'.", deploymentName)
                     return
 
                 chatSession = ChatSession(
                     systemPrompt=self.systemPrompt, deploymentConfig=deploymentConfig, maxContextTokens=100000
                 )
-                # Load existing conversation history
-                chatSession.loadConversationHistory(conversation["conversation_history"])
-
-                # Create a temporary ChatTab to generate the summary
-                summary = chatSession.generateSummary()
+                # Summarize the stored text directly; loading the history would also tokenize every message.
+                summary = chatSession.generateSummary(self.conversationDb.getConversationText(conversationId))
                 if summary:
                     # QMessageBox.information(self, "Conversation Summary", f"Summary:\n{summary}")
                     self.renameSelectedConversation(summary)
-                    logging.info(f"Generated summary for conversation ID {conversationId}.")
+                    logging.info("Generated summary for conversation ID %s.", conversationId)
                 else:
                     QMessageBox.warning(self, "Summarize Conversation", "Failed to generate summary.")
-                    logging.warning(f"Failed to generate summary for conversation ID {conversationId}.")
+                    logging.warning("Failed to generate summary for conversation ID %s.", conversationId)
             else:
                 QMessageBox.warning(self, "Summarize Conversation", "Selected conversation could not be loaded.")
 
     def getDeploymentConfigs(self) -> List[Dict[str, str]]:
         """
         Retrieves all deployment configurations from the settings.ini file.
+        The configurations are read once and cached until settings.ini is modified.
 
         Returns:
             List[Dict[str, str]]: A list of deployment configuration dictionaries.
         """
+        return list(self._loadDeploymentConfigs()[1])
+
+    def getDeploymentConfig(self, deploymentName: str) -> Optional[Dict[str, str]]:
+        """
+        Looks up the deployment configuration with the given deployment name.
+
+        Args:
+            deploymentName (str): The deployment name stored with a conversation.
+
+        Returns:
+            Optional[Dict[str, str]]: The first configuration with that name, or None if there is none.
+        """
+        return self._loadDeploymentConfigs()[2].get(deploymentName)
+
+    def _loadDeploymentConfigs(self) -> tuple:
+        """
+        Returns the cached (modification time, configurations, configurations by name) of settings.ini,
+        reading the deployments again only if the file has been modified since.
+        """
+        try:
+            modificationTime = os.stat(self.settings.fileName()).st_mtime_ns
+        except OSError:
+            modificationTime = None
+        if self._deploymentConfigsCache is not None:
+            if self._deploymentConfigsCache[0] == modificationTime:
+                return self._deploymentConfigsCache
+            # The file was edited while the application is running; make QSettings pick up the changes.
+            self.settings.sync()
+
         deployments = []
         for group in self.settings.childGroups():
             if group.startswith("Deployment_Config"):
@@ -336,7 +425,11 @@ class MainWindow(QMainWindow):
                 }
             )
 
-        return deployments
+        deploymentsByName = {}
+        for deployment in deployments:
+            deploymentsByName.setdefault(deployment["deploymentName"], deployment)
+        self._deploymentConfigsCache = (modificationTime, deployments, deploymentsByName)
+        return self._deploymentConfigsCache
 
     def loadDeploymentOptions(self):
         """
@@ -356,6 +449,13 @@ class MainWindow(QMainWindow):
                 }
             )
 
+        # Validate all deployments once, so that misconfigurations surface at startup rather than on first use.
+        try:
+            validateDeployments(deployments)
+        except ValueError as e:
+            logging.error(str(e))
+            QMessageBox.warning(self, "Invalid Deployment Configuration", str(e))
+
         self.deploymentComboBox.clear()
         for deployment in deployments:
             displayName = deployment["deploymentName"]
@@ -364,40 +464,40 @@ class MainWindow(QMainWindow):
 
     def populateConversationsList(self):
         """
-        Populates the conversationsList QListWidget with conversations from the database.
+        Starts loading the conversations from the database in a background thread.
+        The conversationsList is filled by onConversationsLoaded once they have been read.
         """
-        self.ui.conversationsList.clear()
-        conversations = self.conversationDb.getAllConversations()
-        for convo in conversations:
-            convoId, title, deploymentName, createdAt, conversationHistory, tokens = convo
-            itemText = f"{title} (Tokens: {tokens})"
-            item = QListWidgetItem(itemText)
-            item.setData(Qt.ItemDataRole.UserRole, convoId)  # Store the conversation ID
+        worker = ConversationListWorker(self.conversationDb)
+        worker.signals.finished.connect(self.onConversationsLoaded)
+        worker.signals.error.connect(self.onConversationsLoadError)
+        QThreadPool.globalInstance().start(worker)
 
-            # Set the chat-spark icon for each item
-            chatIconPath = resourcePath("assets/chat-spark.png", forcedPath=True)
-            if os.path.exists(chatIconPath):
-                item.setIcon(QIcon(chatIconPath))
-            else:
-                logging.warning(f"Icon file not found at: {chatIconPath}")
-
-            # Parse the UTC timestamp
-            try:
-                utcTimestamp = datetime.datetime.fromisoformat(createdAt)
-                if utcTimestamp.tzinfo is None:
-                    utcTimestamp = utcTimestamp.replace(tzinfo=datetime.timezone.utc)
-                localTimestamp = utcTimestamp.astimezone()
-                formattedTimestamp = localTimestamp.strftime("%Y-%m-%d %H:%M:%S %z")
-            except ValueError:
-                # Fallback if parsing fails
-                formattedTimestamp = createdAt
-
-            item.setToolTip(f"{formattedTimestamp} | Tokens: {tokens}")
-            # Make the item editable
-            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsEditable)
-            self.ui.conversationsList.addItem(item)
+    def onConversationsLoaded(self, conversations: list):
+        """
+        Fills the conversationsList with the conversations read by the ConversationListWorker.
+
+        Args:
+            conversations (list): (id, title, deployment_name, created_at, tokens) tuples, newest first.
+        """
+        # Conversations created while the list was loading are not in the result; the model keeps them on top.
+        # The rows are replaced in a single model reset, so the view is laid out and repainted once.
+        self.conversationsModel.loadConversations(
+            [
+                (convoId, f"{title} (Tokens: {tokens})", f"{_formatCreatedAt(createdAt)} | Tokens: {tokens}")
+                for convoId, title, deploymentName, createdAt, tokens in conversations
+            ]
+        )
         logging.info("Populated conversationsList with %d conversations.", len(conversations))
 
+    def onConversationsLoadError(self, errorMessage: str):
+        """
+        Called if the conversations could not be read from the database.
+
+        Args:
+            errorMessage (str): The error message.
+        """
+        QMessageBox.warning(self, "Database Error", f"Failed to load the conversations: {errorMessage}")
+
     def createNewChatTab(self, chatSession: ChatSession = None, conversationId: Optional[int] = None):
         """
         Creates a new chat tab with its own ChatSession.
@@ -411,7 +511,7 @@ class MainWindow(QMainWindow):
                 tabIndex = self.ui.tabWidget.indexOf(existingTab)
                 if tabIndex != -1:
                     self.ui.tabWidget.setCurrentIndex(tabIndex)
-                    logging.info(f"Switched to existing tab for conversation ID {conversationId}.")
+                    logging.info("Switched to existing tab for conversation ID %s.", conversationId)
                     return  # Early exit since the tab is already open
 
         if chatSession in (None, False):
@@ -430,7 +530,7 @@ class MainWindow(QMainWindow):
             )
 
             # Add a new conversation to the database with a temporary title
-            title = f"Conversation {len(self.chatTabs) + 1}"
+            title = f"Conversation {self.ui.tabWidget.count() + 1}"
             conversationId = self.conversationDb.addConversation(
                 title, chatSession.deploymentName, chatSession.conversationHistory
             )
@@ -440,43 +540,29 @@ class MainWindow(QMainWindow):
                 )
                 logging.error("Failed to create a new conversation. Aborting tab creation.")
                 return
-            logging.info(f"Added new conversation to database with ID {conversationId} and title '{title}'.")
+            logging.info("Added new conversation to database with ID %s and title '%s'.", conversationId, title)
 
             # Add the new conversation to the conversationsList
-            itemText = f"{title} (Tokens: {chatSession.countTokens()})"
-            item = QListWidgetItem(itemText)
-            item.setData(Qt.ItemDataRole.UserRole, conversationId)
-
-            # Set the chat-spark icon for the new item
-            chatIconPath = resourcePath("assets/chat-spark.png", forcedPath=True)
-            if os.path.exists(chatIconPath):
-                item.setIcon(QIcon(chatIconPath))
-            else:
-                logging.warning(f"Icon file not found at: {chatIconPath}")
+            tokenCount = chatSession.countTokens()
 
             # Set the tooltip to the stored timestamp
-            conversation = self.conversationDb.getConversationById(conversationId)
+            conversation = self.conversationDb.getConversationById(conversationId, includeHistory=False)
             if conversation and "created_at" in conversation:
-                createdAt = conversation["created_at"]
-                utcTimestamp = datetime.datetime.fromisoformat(createdAt)
-                if utcTimestamp.tzinfo is None:
-                    utcTimestamp = utcTimestamp.replace(tzinfo=datetime.timezone.utc)
-                localTimestamp = utcTimestamp.astimezone()
-                isoTimestamp = localTimestamp.strftime("%Y-%m-%d %H:%M:%S %z")
+                isoTimestamp = _formatCreatedAt(conversation["created_at"])
             else:
                 # Fallback to current UTC time if retrieval fails
-                isoTimestamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S %z")
+                isoTimestamp = datetime.datetime.now(datetime.timezone.utc).strftime(TOOLTIP_TIMESTAMP_FORMAT)
 
-            item.setToolTip(f"{isoTimestamp} | Tokens: {chatSession.countTokens()}")
-            # Make the item editable
-            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsEditable)
-            self.ui.conversationsList.insertItem(0, item)  # Insert at top
+            # Insert at top
+            self.conversationsModel.insertConversation(
+                0, conversationId, f"{title} (Tokens: {tokenCount})", f"{isoTimestamp} | Tokens: {tokenCount}"
+            )
             logging.info("Inserted new conversation into conversationsList.")
 
         # Else, creating a tab for an existing conversation
         newTab = ChatTab(chatSession, conversationId, parent=self)
-        # Connect the tokenUpdated signal
-        newTab.tokenUpdated.connect(self.updateTokenDisplay)
+        # Connect the tokenUpdated signal once; onTabTokensUpdated ignores tabs that are not current.
+        newTab.tokenUpdated.connect(self.onTabTokensUpdated)
         # Connect the titleUpdated signal
         newTab.titleUpdated.connect(self.updateConversationsListItem)
 
@@ -484,48 +570,46 @@ class MainWindow(QMainWindow):
         tabTitle = f"Chat - {chatSession.deploymentName}"
         tabIndex = self.ui.tabWidget.addTab(newTab, tabTitle)
         self.ui.tabWidget.setCurrentIndex(tabIndex)
-        self.chatTabs.append(newTab)
 
         # Update the mapping dictionary
         self.conversationIdToTab[conversationId] = newTab
 
         logging.info(
-            f"Created new chat tab with deployment: {chatSession.deploymentName} for conversation ID {conversationId}."
+            "Created new chat tab with deployment: %s for conversation ID %s.", chatSession.deploymentName, conversationId
         )
 
-    def onConversationSelected(self, item: QListWidgetItem):
+    def onConversationSelected(self, index: QModelIndex):
         """
         Loads the selected conversation into a new chat tab and highlights it.
 
         Args:
-            item (QListWidgetItem): The selected QListWidgetItem representing a conversation.
+            index (QModelIndex): The clicked row of the conversationsList.
         """
+        conversationId = index.data(Qt.ItemDataRole.UserRole)
+        # Check if the conversation tab is already open; switching to it needs neither the database
+        # nor the deployments, nor disabling the window.
+        if conversationId in self.conversationIdToTab:
+            existingTab = self.conversationIdToTab[conversationId]
+            tabIndex = self.ui.tabWidget.indexOf(existingTab)
+            if tabIndex != -1:
+                self.ui.tabWidget.setCurrentIndex(tabIndex)
+                logging.info("Switched to existing tab for conversation ID %s.", conversationId)
+                return  # Early exit since the tab is already open
+
         self.setEnabled(False)
         QApplication.processEvents()
 
-        conversationId = item.data(Qt.ItemDataRole.UserRole)
-        conversation = self.conversationDb.getConversationById(conversationId)
+        # The history is only read once it is clear that a new tab will be opened.
+        conversation = self.conversationDb.getConversationById(conversationId, includeHistory=False)
         if conversation:
-            # Check if the conversation tab is already open
-            if conversationId in self.conversationIdToTab:
-                existingTab = self.conversationIdToTab[conversationId]
-                tabIndex = self.ui.tabWidget.indexOf(existingTab)
-                if tabIndex != -1:
-                    self.ui.tabWidget.setCurrentIndex(tabIndex)
-                    logging.info(f"Switched to existing tab for conversation ID {conversationId}.")
-                    self.setEnabled(True)
-                    QApplication.processEvents()
-                    return  # Early exit since the tab is already open
-
             # Initialize ChatSession with existing history and correct deployment name
             deploymentName = conversation["deployment_name"]
             # Find the deployment config matching the deploymentName
-            deployments = self.getDeploymentConfigs()
-            deploymentConfig = next((d for d in deployments if d["deploymentName"] == deploymentName), None)
+            deploymentConfig = self.getDeploymentConfig(deploymentName)
 
             if not deploymentConfig:
                 QMessageBox.warning(self, "Deployment Not Found", f"No deployment configuration found for '{deploymentName}'.")
-                logging.error(f"No deployment configuration found for '{deploymentName}'.")
+                logging.error("No deployment configuration found for '%s'.", deploymentName)
                 self.setEnabled(True)
                 QApplication.processEvents()
                 return
@@ -538,8 +622,8 @@ class MainWindow(QMainWindow):
                 maxContextTokens=100000,
             )
             # Load existing conversation history
-            chatSession.loadConversationHistory(conversation["conversation_history"])
-            logging.info(f"Loaded conversation ID {conversationId} into a new chat tab.")
+            chatSession.loadConversationHistory(self.conversationDb.getConversationHistory(conversationId))
+            logging.info("Loaded conversation ID %s into a new chat tab.", conversationId)
             self.createNewChatTab(chatSession, conversationId)
         else:
             QMessageBox.warning(self, "Error", "Selected conversation could not be loaded.")
@@ -551,8 +635,8 @@ class MainWindow(QMainWindow):
         """
         Deletes the currently selected conversation(s) from the database and updates the conversationsList.
         """
-        selectedItems = self.ui.conversationsList.selectedItems()
-        if not selectedItems:
+        selectedIndexes = self.ui.conversationsList.selectionModel().selectedIndexes()
+        if not selectedIndexes:
             QMessageBox.information(self, "No Selection", "Please select a conversation to delete.")
             return
 
@@ -567,32 +651,54 @@ class MainWindow(QMainWindow):
         if confirm != QMessageBox.StandardButton.Yes:
             return
 
-        for item in selectedItems:
-            conversationId = item.data(Qt.ItemDataRole.UserRole)
-            self.conversationDb.deleteConversationById(conversationId)
-            self.ui.conversationsList.takeItem(self.ui.conversationsList.row(item))
-            logging.info(f"Deleted conversation ID {conversationId} from the database.")
+        # Delete all selected conversations in one transaction before touching the list and the tabs.
+        conversationIds = [index.data(Qt.ItemDataRole.UserRole) for index in selectedIndexes]
+        self.conversationDb.deleteConversationsByIds(conversationIds)
+
+        self.conversationsModel.removeConversations(conversationIds)
 
+        for conversationId in conversationIds:
             # Check if the tab is open and remove it
             if conversationId in self.conversationIdToTab:
                 tab = self.conversationIdToTab.pop(conversationId)
+                # Do not keep attaching files of a drop to a conversation that no longer exists.
+                tab.droppableAttachedFilesList.cancelPendingDrop()
                 tabIndex = self.ui.tabWidget.indexOf(tab)
                 if tabIndex != -1:
                     self.ui.tabWidget.removeTab(tabIndex)
-                    self.chatTabs.remove(tab)
-                    logging.info(f"Removed tab for deleted conversation ID {conversationId}.")
+                    logging.info("Removed tab for deleted conversation ID %s.", conversationId)
 
         # QMessageBox.information(self, "Deleted", "Selected conversation(s) have been deleted.")
 
     def updateTokenDisplay(self, totalTokens: int, currentTokenCount: int):
         """
         Updates the token display labels in the status bar.
+        Calls arriving in quick succession are coalesced; only the latest values are shown.
 
         Args:
             totalTokens (int): The total tokens used.
             currentTokenCount (int): The current token count.
         """
-        self.totalTokensLabel.setText(f"Tokens: <b>{totalTokens}</b>")
+        self._pendingTotalTokens = totalTokens
+        if not self._tokenDisplayTimer.isActive():
+            self._tokenDisplayTimer.start()
+
+    def _flushTokenDisplay(self):
+        """
+        Shows the latest values passed to updateTokenDisplay.
+        """
+        self.totalTokensLabel.setText(f"Tokens: <b>{self._pendingTotalTokens}</b>")
+
+    def onTabTokensUpdated(self, totalTokens: int, currentTokenCount: int):
+        """
+        Receives the tokenUpdated signal of every ChatTab and shows the counts of the current one.
+
+        Args:
+            totalTokens (int): The total tokens used.
+            currentTokenCount (int): The current token count.
+        """
+        if self.sender() is self.currentChatTab:
+            self.updateTokenDisplay(totalTokens, currentTokenCount)
 
     def onTabChanged(self, index: int):
         """
@@ -602,20 +708,11 @@ class MainWindow(QMainWindow):
         Args:
             index (int): The index of the newly active tab.
         """
-        # Disconnect signal from previous chat tab
-        if self.currentChatTab:
-            try:
-                self.currentChatTab.tokenUpdated.disconnect(self.updateTokenDisplay)
-            except TypeError:
-                pass  # No connection exists
-
         # Get the new current chat tab
-        newChatTab = self.chatTabs[index] if index >= 0 and index < len(self.chatTabs) else None
+        newChatTab = self.ui.tabWidget.widget(index)  # None if the index is out of range
         self.currentChatTab = newChatTab
 
         if newChatTab:
-            # Connect the tokenUpdated signal
-            newChatTab.tokenUpdated.connect(self.updateTokenDisplay)
             # Update the status bar with the current token counts
             totalTokens = newChatTab.chatSession.lastTotalTokens
             currentTokenCount = newChatTab.chatSession.countTokens()
@@ -629,13 +726,13 @@ class MainWindow(QMainWindow):
             self.highlightConversationInList(conversationId)
         else:
             # If no tab is active, reset the status bar and selection
-            self.totalTokensLabel.setText("Tokens: <b>0</b>")
+            self.updateTokenDisplay(0, 0)
             self.ui.conversationsList.clearSelection()
             logging.info("No active chat tab. Resetting token display and conversation selection.")
 
     def highlightConversationInList(self, conversationId: int):
         """
-        Highlights the QListWidgetItem corresponding to the given conversation ID.
+        Highlights the conversationsList row of the given conversation ID.
 
         Args:
             conversationId (int): The ID of the conversation to highlight.
@@ -643,14 +740,12 @@ class MainWindow(QMainWindow):
         # ensure that the conversationsList allows only single selections
         self.ui.conversationsList.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
 
-        listWidget = self.ui.conversationsList
-        for row in range(listWidget.count()):
-            item = listWidget.item(row)
-            if item.data(Qt.ItemDataRole.UserRole) == conversationId:
-                listWidget.setCurrentItem(item)
-                listWidget.scrollToItem(item, QListWidget.ScrollHint.PositionAtCenter)
-                logging.info(f"Highlighted conversation ID {conversationId} in the list.")
-                break
+        listView = self.ui.conversationsList
+        index = self.conversationsModel.indexOf(conversationId)
+        if index.isValid():
+            listView.setCurrentIndex(index)
+            listView.scrollTo(index, QListView.ScrollHint.PositionAtCenter)
+            logging.info("Highlighted conversation ID %s in the list.", conversationId)
 
         # revert to extended selection
         self.ui.conversationsList.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
@@ -659,11 +754,12 @@ class MainWindow(QMainWindow):
         """
         Handles the event when a tab's close button is clicked.
         """
-        if index < 0 or index >= len(self.chatTabs):
+        tab = self.ui.tabWidget.widget(index)
+        if tab is None:
             return
 
-        tab = self.chatTabs.pop(index)
         conversationId = tab.conversationId
+        tab.droppableAttachedFilesList.cancelPendingDrop()
 
         # Remove from the mapping
         if conversationId in self.conversationIdToTab:
@@ -671,7 +767,7 @@ class MainWindow(QMainWindow):
 
         # Remove the tab from the widget
         self.ui.tabWidget.removeTab(index)
-        logging.info(f"Manually closed tab for conversation ID {conversationId}.")
+        logging.info("Manually closed tab for conversation ID %s.", conversationId)
 
     def loadWindowGeometry(self):
         """
@@ -693,33 +789,48 @@ class MainWindow(QMainWindow):
         else:
             logging.info("No window geometry found in settings. Centering the window.")
             # Default to Primary Screen
-            primaryScreen = QApplication.primaryScreen()
-            screenGeo = primaryScreen.availableGeometry()
+            screenGeo = self._availableScreenRects()[0]
             self.resize(700, 600)  # Default size
             self.move(screenGeo.center() - self.rect().center())
 
         # Ensure the window is fully within at least one screen
         self.ensureWindowWithinAnyScreen()
 
+    def _availableScreenRects(self) -> list:
+        """
+        Returns the available geometry of every screen, the primary screen first.
+        The rectangles are looked up once and reused until a screen is added or removed.
+        """
+        if self._screenRects is None:
+            primaryScreen = QApplication.primaryScreen()
+            otherScreens = [screen for screen in QApplication.screens() if screen is not primaryScreen]
+            self._screenRects = [screen.availableGeometry() for screen in [primaryScreen] + otherScreens]
+        return self._screenRects
+
+    def _invalidateScreenRects(self, *args):
+        """
+        Drops the cached screen geometries, so the next placement check looks them up again.
+        """
+        self._screenRects = None
+
     def ensureWindowWithinAnyScreen(self):
         """
         Ensures that the window is fully visible on at least one screen.
         If not, repositions it to the primary screen.
         """
-        windowRect = self.frameGeometry()
-        screens = QApplication.screens()
-        isVisible = False
+        windowLeft, windowTop, windowRight, windowBottom = self.frameGeometry().getCoords()
+        screenRects = self._availableScreenRects()
 
-        for screen in screens:
-            screenGeo = screen.availableGeometry()
-            if screenGeo.contains(windowRect):
+        # Containment on plain integer coordinates (inclusive, like QRect.contains).
+        isVisible = False
+        for screenLeft, screenTop, screenRight, screenBottom in (screenGeo.getCoords() for screenGeo in screenRects):
+            if screenLeft <= windowLeft and screenTop <= windowTop and windowRight <= screenRight and windowBottom <= screenBottom:
                 isVisible = True
                 break
 
-        if not isVisible and screens:
+        if not isVisible and screenRects:
             # Move to Primary Screen
-            primaryScreen = QApplication.primaryScreen()
-            screenGeo = primaryScreen.availableGeometry()
+            screenGeo = screenRects[0]
 
             newLeft = screenGeo.left() + 100  # Offset to prevent exact centering
             newTop = screenGeo.top() + 100
@@ -736,7 +847,12 @@ class MainWindow(QMainWindow):
         """
         Ensure the window settings are saved when the application is closed.
         """
+        # Only updates the in-memory QSettings; the file is synced once when the application quits.
         self.writeSettings()
+        # Hide the window before the disk work (WAL checkpoint, then the settings sync on quit),
+        # so that closing feels immediate even on slow storage.
+        self.hide()
+        self._flushTitleWrites()
         self.conversationDb.close()
         super().closeEvent(event)
 
@@ -744,48 +860,61 @@ class MainWindow(QMainWindow):
         """
         Saves the window's geometry and the last selected deployment to the INI file.
         """
-        self.settings.setValue("Window/geometry", self.saveGeometry())
-        self.settings.setValue("App/lastSelectedDeployment", self.deploymentComboBox.currentData()["deploymentName"])
-        self.settings.sync()
+        setSettingIfChanged(self.settings, "Window/geometry", self.saveGeometry())
+        setSettingIfChanged(self.settings, "App/lastSelectedDeployment", self.deploymentComboBox.currentData()["deploymentName"])
 
     def updateConversationsListItem(self, conversationId: int, newTitle: str):
         """
-        Updates the corresponding QListWidgetItem with the new title.
+        Updates the corresponding conversationsList row with the new title.
 
         Args:
             conversationId (int): The ID of the conversation.
             newTitle (str): The new title for the conversation.
         """
-        for row in range(self.ui.conversationsList.count()):
-            item = self.ui.conversationsList.item(row)
-            convoId = item.data(Qt.ItemDataRole.UserRole)
-            if convoId == conversationId:
-                # Update the item text without the timestamp
-                item.setText(newTitle)
-                break
+        # A title the user has just typed is written after this one, so keep showing it.
+        if conversationId in self._pendingTitleWrites:
+            return
+        # Update the row text without the timestamp. The ChatTab has already stored the title,
+        # and setConversationText does not emit titleEdited, so it is not written again.
+        self.conversationsModel.setConversationText(conversationId, newTitle)
 
-    def onConversationTitleEdited(self, item: QListWidgetItem):
+    def onConversationTitleEdited(self, conversationId: int, newTitle: str):
         """
         Handles the event when a conversation title is edited by the user.
 
         Args:
-            item (QListWidgetItem): The QListWidgetItem that was edited.
+            conversationId (int): The ID of the edited conversation.
+            newTitle (str): The title entered by the user.
         """
-        conversationId = item.data(Qt.ItemDataRole.UserRole)
-        newTitle = item.text().strip()
+        newTitle = newTitle.strip()
 
         if not newTitle:
             QMessageBox.warning(self, "Invalid Title", "Conversation title cannot be empty.")
-            # Revert to the previous title
-            conversation = self.conversationDb.getConversationById(conversationId)
-            if conversation:
-                item.setText(conversation["title"])
+            # Revert to the previous title, which may be an edit not written yet.
+            previousTitle = self._pendingTitleWrites.get(conversationId)
+            if previousTitle is None:
+                conversation = self.conversationDb.getConversationById(conversationId, includeHistory=False)
+                if conversation:
+                    previousTitle = conversation["title"]
+            if previousTitle is not None:
+                # Restoring the stored title must not be handled as another edit.
+                self.conversationsModel.setConversationText(conversationId, previousTitle)
                 # item.setToolTip(conversation["created_at"])
             return
 
-        # Update the database with the new title
-        self.conversationDb.updateConversationTitle(conversationId, newTitle)
-        logging.info(f"User updated conversation ID {conversationId} title to '{newTitle}'.")
+        # Store the new title once the edits have settled; quick successive edits are written together.
+        self._pendingTitleWrites[conversationId] = newTitle
+        self._titleWriteTimer.start()
+        logging.info("User updated conversation ID %s title to '%s'.", conversationId, newTitle)
+
+    def _flushTitleWrites(self):
+        """
+        Writes the titles edited since the last flush to the database in one transaction.
+        """
+        self._titleWriteTimer.stop()
+        if self._pendingTitleWrites:
+            titles, self._pendingTitleWrites = self._pendingTitleWrites, {}
+            self.conversationDb.updateConversationTitles(titles)
 
     def startDatabaseVacuum(self, dbPath: str):
         """
@@ -814,7 +943,7 @@ class MainWindow(QMainWindow):
         Args:
             errorMessage (str): The error message emitted by the VacuumWorker.
         """
-        logging.error(f"Database vacuum encountered an error: {errorMessage}")
+        logging.error("Database vacuum encountered an error: %s", errorMessage)
         QMessageBox.critical(
             self,
             "Database Vacuum Error",
@@ -826,6 +955,5 @@ class MainWindow(QMainWindow):
         Apply selected theme and persist in settings.ini
         """
         applyTheme(QApplication.instance(), themeName)
-        # store preference
-        self.settings.setValue("App/theme", themeName)
-        self.settings.sync()
\ No newline at end of file
+        # store preference (written to disk on quit)
+        setSettingIfChanged(self.settings, "App/theme", themeName)
\ No newline at end of file
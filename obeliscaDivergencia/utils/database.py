@@ -2,11 +2,62 @@ import sqlite3
 import logging
 import os
 import json
+import threading
+import contextlib
+import functools
 from datetime import datetime, timezone
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Dict
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the (slower) standard library codec.
+    orjson = None
+
+
+def loadJson(text: str):
+    """
+    Parses a JSON string, using orjson if it is installed.
+    """
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+@functools.lru_cache(maxsize=None)
+def _fileIdLookupSql(parameterCount: int) -> str:
+    """
+    Returns the query selecting the ids of up to parameterCount file paths.
+    The text is built once per count, so sqlite3 finds it in its statement cache on every later call.
+    """
+    return "SELECT id FROM files WHERE file_path IN (%s)" % ",".join("?" * parameterCount)
 
 
 class ConversationDatabase:
+    # Applied to every new connection. WAL lets readers proceed while a write is in progress and,
+    # together with synchronous=NORMAL, avoids the two fsyncs per commit of the default rollback journal.
+    CONNECTION_PRAGMAS = (
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA cache_size = -64000",  # 64 MiB
+        "PRAGMA mmap_size = 2147483648",  # 2 GiB
+        "PRAGMA busy_timeout = 5000",
+        # Truncate the -wal file back to 64 MiB after a checkpoint, so a write burst
+        # (e.g. attaching a large directory) does not leave it at its peak size for the whole session.
+        "PRAGMA journal_size_limit = 67108864",
+    )
+    # Size of the per-connection prepared statement cache (sqlite3 defaults to 128). sqlite3 keys this
+    # cache by SQL text, so every query here is a fixed string with ? placeholders and gets compiled
+    # once per connection. Never interpolate values into the SQL: each distinct text is prepared anew.
+    # The padded IN (...) lookups add a few statements of their own, so leave room beyond the fixed queries.
+    CACHED_STATEMENTS = 256
+    # Stays below SQLITE_MAX_VARIABLE_NUMBER of older SQLite builds (999).
+    MAX_QUERY_PARAMETERS = 900
+    # Files recorded per transaction by recordAttachmentsForConversation.
+    ATTACHMENT_BATCH_SIZE = 500
+    # Value of conversations.conversation_history once the messages live in the messages table.
+    EMPTY_HISTORY = "[]"
+
     def __init__(self, dbPath: str):
         """
         Initializes the ConversationDatabase with the given SQLite database path.
@@ -15,16 +66,60 @@ class ConversationDatabase:
             dbPath (str): The path to the SQLite database file.
         """
         self.dbPath = dbPath
-        self.conn = sqlite3.connect(self.dbPath)
+        # The connection may be used from worker threads; all access is serialized by self._lock.
+        # Autocommit mode (isolation_level=None): transactions are begun explicitly in _transaction.
+        self.conn = sqlite3.connect(
+            self.dbPath, cached_statements=self.CACHED_STATEMENTS, check_same_thread=False, isolation_level=None
+        )
+        self._lock = threading.RLock()
+        # Must come before switching to WAL, which already writes the first page of a fresh file.
+        self.enableIncrementalVacuum()
+        for pragma in self.CONNECTION_PRAGMAS:
+            self.conn.execute(pragma)
+        # SQLite silently keeps the rollback journal where WAL is unavailable (e.g. some network drives),
+        # in which case every commit costs extra fsyncs. In-memory databases always report "memory".
+        self.journalMode = self.conn.execute("PRAGMA journal_mode").fetchone()[0].lower()
+        if self.journalMode != "wal" and self.dbPath != ":memory:":
+            logging.warning("Database %s uses journal mode %s instead of WAL; writes will be slower.", self.dbPath, self.journalMode)
         self.conn.execute("PRAGMA foreign_keys = ON")  # Enable foreign key constraints
         self.createTables()
         self.addTokensColumnIfNotExists()
+        self.migrateConversationHistories()
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """
+        Runs the enclosed statements in one transaction while holding the connection lock.
+        Commits on success and rolls back on any exception. Nested use joins the outer transaction.
+        """
+        with self._lock:
+            if self.conn.in_transaction:
+                yield
+                return
+            self.conn.execute("BEGIN")
+            try:
+                yield
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def enableIncrementalVacuum(self):
+        """
+        Sets auto_vacuum to INCREMENTAL on a freshly created (still empty) database file.
+
+        The setting only takes effect if it is issued before any table is created. Existing databases
+        are converted once by the VacuumWorker, which runs a full VACUUM for that purpose.
+        """
+        pageCount = self.conn.execute("PRAGMA page_count").fetchone()[0]
+        if pageCount == 0:
+            self.conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
 
     def createTables(self):
         """
         Creates the conversations table if it does not already exist.
         """
-        with self.conn:
+        with self._transaction():
             self.conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS conversations (
@@ -59,6 +154,25 @@ class ConversationDatabase:
             """
             )
 
+            # One row per message, so that a new turn appends rows instead of rewriting the whole history.
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS messages (
+                    conversation_id INTEGER NOT NULL,
+                    seq INTEGER NOT NULL,
+                    role TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    PRIMARY KEY (conversation_id, seq),
+                    FOREIGN KEY (conversation_id) REFERENCES conversations(id) ON DELETE CASCADE
+                )
+            """
+            )
+
+            # Lets the sidebar read conversations in display order without sorting the table.
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_conv_created ON conversations(created_at DESC)")
+            # The primary key only covers lookups by conversation_id; orphan detection looks up by file_id.
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_attach_file ON conversation_attachements(file_id)")
+
     def addTokensColumnIfNotExists(self):
         """
         Adds the 'tokens' column to the 'conversations' table if it doesn't exist.
@@ -67,7 +181,7 @@ class ConversationDatabase:
             cursor = self.conn.execute("PRAGMA table_info(conversations)")
             columns = [row[1].lower() for row in cursor.fetchall()]
             if "tokens" not in columns:
-                with self.conn:
+                with self._transaction():
                     self.conn.execute("ALTER TABLE conversations ADD COLUMN tokens INTEGER DEFAULT 0")
                     logging.info("Added 'tokens' column to 'conversations' table.")
             else:
@@ -75,6 +189,76 @@ class ConversationDatabase:
         except sqlite3.Error as e:
             logging.error(f"Error adding 'tokens' column: {e}")
 
+    def migrateConversationHistories(self):
+        """
+        Moves histories still stored as JSON in conversations.conversation_history into the messages table.
+        Runs once per conversation; afterwards the column only holds an empty JSON array.
+        """
+        try:
+            rows = self.conn.execute(
+                "SELECT id, conversation_history FROM conversations WHERE conversation_history != ?", (self.EMPTY_HISTORY,)
+            ).fetchall()
+            if not rows:
+                return
+            with self._transaction():
+                for conversationId, conversationJson in rows:
+                    self._insertMessages(conversationId, loadJson(conversationJson), 0)
+                    self.conn.execute(
+                        "UPDATE conversations SET conversation_history = ? WHERE id = ?", (self.EMPTY_HISTORY, conversationId)
+                    )
+            logging.info("Migrated the history of %d conversations to the messages table.", len(rows))
+        except (sqlite3.Error, ValueError) as e:
+            logging.error(f"Failed to migrate conversation histories: {e}")
+
+    def _insertMessages(self, conversationId: int, messages: list, firstSeq: int):
+        """
+        Inserts the given messages for a conversation with consecutive sequence numbers starting at firstSeq.
+        Must be called inside a transaction.
+        """
+        self.conn.executemany(
+            """
+            INSERT INTO messages (conversation_id, seq, role, content)
+            VALUES (?, ?, ?, ?)
+        """,
+            [
+                (conversationId, seq, message.get("role", ""), message.get("content", ""))
+                for seq, message in enumerate(messages, firstSeq)
+            ],
+        )
+
+    def getConversationHistory(self, conversationId: int) -> list:
+        """
+        Retrieves the messages of a conversation in order.
+
+        Args:
+            conversationId (int): The ID of the conversation.
+
+        Returns:
+            list: The conversation history as a list of {"role": ..., "content": ...} dictionaries.
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT role, content FROM messages WHERE conversation_id = ? ORDER BY seq", (conversationId,)
+            ).fetchall()
+        return [{"role": role, "content": content} for role, content in rows]
+
+    def getConversationText(self, conversationId: int) -> str:
+        """
+        Retrieves the contents of all messages of a conversation in order, one per line.
+        Only the content column is read, without building a message dictionary per row.
+
+        Args:
+            conversationId (int): The ID of the conversation.
+
+        Returns:
+            str: The concatenated message contents.
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT content FROM messages WHERE conversation_id = ? ORDER BY seq", (conversationId,)
+            ).fetchall()
+        return "\n".join(row[0] for row in rows)
+
     def addConversation(self, title: str, deploymentName: str, conversationHistory: list, tokens: int = 0) -> Optional[int]:
         """
         Adds a new conversation to the database.
@@ -90,16 +274,16 @@ class ConversationDatabase:
         """
         # Use timezone-aware UTC timestamp
         created_at = datetime.now(timezone.utc).isoformat()
-        conversation_json = json.dumps(conversationHistory)
         try:
-            with self.conn:
+            with self._transaction():
                 cursor = self.conn.execute(
                     """
                     INSERT INTO conversations (title, deployment_name, created_at, conversation_history, tokens)
                     VALUES (?, ?, ?, ?, ?)
                 """,
-                    (title, deploymentName, created_at, conversation_json, tokens),
+                    (title, deploymentName, created_at, self.EMPTY_HISTORY, tokens),
                 )
+                self._insertMessages(cursor.lastrowid, conversationHistory, 0)
                 logging.info(f"Inserted conversation '{title}' with ID {cursor.lastrowid}")
                 return cursor.lastrowid
         except sqlite3.Error as e:
@@ -109,47 +293,54 @@ class ConversationDatabase:
             logging.exception(f"Unexpected error when adding conversation '{title}': {ex}")
             return None
 
-    def getAllConversations(self) -> List[Tuple[int, str, str, str, str, int]]:
+    def getAllConversations(self) -> List[Tuple[int, str, str, str, int]]:
         """
-        Retrieves all conversations from the database.
+        Retrieves the summary of all conversations from the database, newest first.
+        The (potentially large) conversation history is not read; use getConversationById for that.
 
         Returns:
-            List[Tuple[int, str, str, str, str, int]]: A list of tuples containing conversation details.
+            List[Tuple[int, str, str, str, int]]: A list of (id, title, deployment_name, created_at, tokens) tuples.
         """
-        cursor = self.conn.execute(
+        with self._lock:
+            cursor = self.conn.execute(
+                """
+                SELECT id, title, deployment_name, created_at, tokens FROM conversations ORDER BY created_at DESC
             """
-            SELECT id, title, deployment_name, created_at, conversation_history, tokens FROM conversations ORDER BY created_at DESC
-        """
-        )
-        return cursor.fetchall()
+            )
+            return cursor.fetchall()
 
-    def getConversationById(self, conversationId: int) -> Optional[dict]:
+    def getConversationById(self, conversationId: int, includeHistory: bool = True) -> Optional[dict]:
         """
         Retrieves a specific conversation by its ID.
 
         Args:
             conversationId (int): The ID of the conversation.
+            includeHistory (bool): Whether to read the messages into "conversation_history". Callers that only
+                need the title, deployment or timestamp should pass False, see getConversationHistory.
 
         Returns:
             Optional[dict]: A dictionary containing conversation details or None if not found.
         """
-        cursor = self.conn.execute(
-            """
-            SELECT id, title, deployment_name, created_at, conversation_history, tokens FROM conversations
-            WHERE id = ?
-        """,
-            (conversationId,),
-        )
-        row = cursor.fetchone()
+        with self._lock:
+            cursor = self.conn.execute(
+                """
+                SELECT id, title, deployment_name, created_at, tokens FROM conversations
+                WHERE id = ?
+            """,
+                (conversationId,),
+            )
+            row = cursor.fetchone()
         if row:
-            return {
+            conversation = {
                 "id": row[0],
                 "title": row[1],
                 "deployment_name": row[2],
                 "created_at": row[3],
-                "conversation_history": json.loads(row[4]),
-                "tokens": row[5],
+                "tokens": row[4],
             }
+            if includeHistory:
+                conversation["conversation_history"] = self.getConversationHistory(row[0])
+            return conversation
         else:
             return None
 
@@ -160,14 +351,26 @@ class ConversationDatabase:
         Args:
             conversationId (int): The ID of the conversation to delete.
         """
-        with self.conn:
-            self.conn.execute(
+        self.deleteConversationsByIds([conversationId])
+
+    def deleteConversationsByIds(self, conversationIds: list):
+        """
+        Deletes the given conversations in a single transaction, then removes the files no longer attached
+        to any conversation. Their messages and attachment relationships are removed by the foreign keys.
+
+        Args:
+            conversationIds (list): The IDs of the conversations to delete.
+        """
+        if not conversationIds:
+            return
+        with self._transaction():
+            self.conn.executemany(
                 """
                 DELETE FROM conversations WHERE id = ?
             """,
-                (conversationId,),
+                [(conversationId,) for conversationId in conversationIds],
             )
-        logging.info(f"Deleted conversation ID {conversationId} from the database.")
+        logging.info(f"Deleted conversation IDs {list(conversationIds)} from the database.")
         self.deleteOrphanedFiles()
 
     def deleteOrphanedFiles(self):
@@ -175,12 +378,12 @@ class ConversationDatabase:
         Deletes files from the files table that are not referenced in any conversation_attachements.
         """
         try:
-            with self.conn:
+            with self._transaction():
                 cursor = self.conn.execute(
                     """
                     DELETE FROM files
-                    WHERE id NOT IN (
-                        SELECT DISTINCT file_id FROM conversation_attachements
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM conversation_attachements ca WHERE ca.file_id = files.id
                     )
                 """
                 )
@@ -197,36 +400,157 @@ class ConversationDatabase:
             conversationId (int): The ID of the conversation.
             conversationHistory (list): The updated conversation history.
         """
-        conversation_json = json.dumps(conversationHistory)
-        with self.conn:
-            self.conn.execute(
+        with self._transaction():
+            self._syncMessages(conversationId, conversationHistory)
+        logging.info(f"Updated conversation history for ID {conversationId}.")
+
+    def updateConversationState(self, conversationId: int, conversationHistory: list, tokens: int) -> bool:
+        """
+        Updates the conversation history and the tokens count of a conversation in one transaction,
+        so that saving a turn costs a single commit.
+
+        Args:
+            conversationId (int): The ID of the conversation.
+            conversationHistory (list): The updated conversation history.
+            tokens (int): The number of tokens to set.
+
+        Returns:
+            bool: True if the conversation was saved.
+        """
+        try:
+            with self._transaction():
+                self._syncMessages(conversationId, conversationHistory)
+                self.conn.execute(
+                    "UPDATE conversations SET tokens = ? WHERE id = ? AND tokens IS NOT ?", (tokens, conversationId, tokens)
+                )
+            logging.info(f"Updated conversation history and tokens ({tokens}) for ID {conversationId}.")
+            return True
+        except sqlite3.Error as e:
+            logging.error(f"Failed to update conversation ID {conversationId}: {e}")
+            return False
+
+    def appendConversationMessages(self, conversationId: int, messages: list, tokens: int) -> bool:
+        """
+        Appends messages to the stored history of a conversation and updates its tokens count in one transaction.
+        Unlike updateConversationState, the stored history is neither read nor compared, so the cost does not
+        grow with the length of the conversation. Only valid if the stored history is exactly the history
+        the messages were appended to.
+
+        Args:
+            conversationId (int): The ID of the conversation.
+            messages (list): The new messages, in order.
+            tokens (int): The number of tokens to set.
+
+        Returns:
+            bool: True if the messages were saved.
+        """
+        try:
+            with self._transaction():
+                nextSeq = self.conn.execute(
+                    "SELECT COALESCE(MAX(seq) + 1, 0) FROM messages WHERE conversation_id = ?", (conversationId,)
+                ).fetchone()[0]
+                self._insertMessages(conversationId, messages, nextSeq)
+                self.conn.execute(
+                    "UPDATE conversations SET tokens = ? WHERE id = ? AND tokens IS NOT ?", (tokens, conversationId, tokens)
+                )
+            logging.info(f"Appended {len(messages)} messages and updated tokens ({tokens}) for ID {conversationId}.")
+            return True
+        except sqlite3.Error as e:
+            logging.error(f"Failed to append messages to conversation ID {conversationId}: {e}")
+            return False
+
+    def _syncMessages(self, conversationId: int, conversationHistory: list):
+        """
+        Brings the stored messages of a conversation in line with conversationHistory.
+        Must be called inside a transaction.
+
+        Only the difference to the stored history is written: the history of a session changes by
+        messages being appended at the end and by the oldest messages after the first one being
+        trimmed, so the common case is one range DELETE plus the INSERT of the new messages.
+        Any other change falls back to rewriting all messages.
+        """
+        stored = self.conn.execute(
+            "SELECT seq, role, content FROM messages WHERE conversation_id = ? ORDER BY seq", (conversationId,)
+        ).fetchall()
+        storedMessages = [(role, content) for _, role, content in stored]
+        newMessages = [(message.get("role", ""), message.get("content", "")) for message in conversationHistory]
+
+        if stored and newMessages and storedMessages[0] == newMessages[0]:
+            storedBody, newBody = storedMessages[1:], newMessages[1:]
+            # Find how many stored messages were trimmed after the first one: the rest of the
+            # stored messages must then be the beginning of the new ones.
+            trimmed = len(storedBody)
+            for candidate in range(len(storedBody)):
+                overlap = len(storedBody) - candidate
+                if overlap <= len(newBody) and storedBody[candidate:] == newBody[:overlap]:
+                    trimmed = candidate
+                    break
+            if trimmed:
+                self.conn.execute(
+                    "DELETE FROM messages WHERE conversation_id = ? AND seq BETWEEN ? AND ?",
+                    (conversationId, stored[1][0], stored[trimmed][0]),
+                )
+            appended = conversationHistory[1 + len(storedBody) - trimmed:]
+            self._insertMessages(conversationId, appended, stored[-1][0] + 1)
+        else:
+            self.conn.execute("DELETE FROM messages WHERE conversation_id = ?", (conversationId,))
+            self._insertMessages(conversationId, conversationHistory, 0)
+
+    def updateConversationTitle(self, conversationId: int, newTitle: str):
+        """
+        Updates the title of a specific conversation.
+
+        Args:
+            conversationId (int): The ID of the conversation.
+            newTitle (str): The new title for the conversation.
+        """
+        self.updateConversationTitles({conversationId: newTitle})
+
+    def updateConversationTitles(self, titles: Dict[int, str]):
+        """
+        Updates the titles of several conversations in a single transaction.
+
+        Args:
+            titles (Dict[int, str]): The new title of every conversation, by conversation ID.
+        """
+        if not titles:
+            return
+        with self._transaction():
+            self.conn.executemany(
                 """
                 UPDATE conversations
-                SET conversation_history = ?
+                SET title = ?
                 WHERE id = ?
             """,
-                (conversation_json, conversationId),
+                [(newTitle, conversationId) for conversationId, newTitle in titles.items()],
             )
-        logging.info(f"Updated conversation history for ID {conversationId}.")
+        for conversationId, newTitle in titles.items():
+            logging.info("Updated title for conversation ID %s to '%s'.", conversationId, newTitle)
 
-    def updateConversationTitle(self, conversationId: int, newTitle: str):
+    def replaceDefaultConversationTitle(self, conversationId: int, newTitle: str) -> bool:
         """
-        Updates the title of a specific conversation.
+        Updates the title of a conversation only while it still has a default "Conversation ..." title,
+        checking and writing it in one statement.
 
         Args:
             conversationId (int): The ID of the conversation.
             newTitle (str): The new title for the conversation.
+
+        Returns:
+            bool: True if the title was replaced, False if the conversation has another title or does not exist.
         """
-        with self.conn:
-            self.conn.execute(
+        with self._transaction():
+            cursor = self.conn.execute(
                 """
                 UPDATE conversations
                 SET title = ?
-                WHERE id = ?
+                WHERE id = ? AND title GLOB 'Conversation*'
             """,
                 (newTitle, conversationId),
             )
-        logging.info(f"Updated title for conversation ID {conversationId} to '{newTitle}'.")
+        if cursor.rowcount:
+            logging.info(f"Updated title for conversation ID {conversationId} to '{newTitle}'.")
+        return cursor.rowcount > 0
 
     def updateConversationTokens(self, conversationId: int, tokens: int):
         """
@@ -237,16 +561,18 @@ class ConversationDatabase:
             tokens (int): The number of tokens to set.
         """
         try:
-            with self.conn:
-                self.conn.execute(
+            with self._transaction():
+                # Skip the write (and the page change) if the count did not change.
+                cursor = self.conn.execute(
                     """
                     UPDATE conversations
                     SET tokens = ?
-                    WHERE id = ?
+                    WHERE id = ? AND tokens IS NOT ?
                 """,
-                    (tokens, conversationId),
+                    (tokens, conversationId, tokens),
                 )
-                logging.info(f"Updated tokens for conversation ID {conversationId} to {tokens}.")
+                if cursor.rowcount:
+                    logging.info(f"Updated tokens for conversation ID {conversationId} to {tokens}.")
         except sqlite3.Error as e:
             logging.error(f"Failed to update tokens for conversation ID {conversationId}: {e}")
 
@@ -260,13 +586,14 @@ class ConversationDatabase:
         Returns:
             Optional[int]: The number of tokens, or None if not found.
         """
-        cursor = self.conn.execute(
-            """
-            SELECT tokens FROM conversations WHERE id = ?
-        """,
-            (conversationId,),
-        )
-        row = cursor.fetchone()
+        with self._lock:
+            cursor = self.conn.execute(
+                """
+                SELECT tokens FROM conversations WHERE id = ?
+            """,
+                (conversationId,),
+            )
+            row = cursor.fetchone()
         if row:
             return row[0]
         else:
@@ -278,7 +605,7 @@ class ConversationDatabase:
         Returns the id of the file record.
         """
         try:
-            with self.conn:
+            with self._transaction():
                 # Insert the file path if it does not exist.
                 self.conn.execute(
                     """
@@ -307,7 +634,7 @@ class ConversationDatabase:
         Inserts a relationship entry into the conversation_attachements table.
         """
         try:
-            with self.conn:
+            with self._transaction():
                 self.conn.execute(
                     """
                     INSERT OR IGNORE INTO conversation_attachements (conversation_id, file_id)
@@ -318,17 +645,112 @@ class ConversationDatabase:
         except Exception as ex:
             logging.error("Error recording conversation attachment: %s", ex)
 
-    def recordAttachmentsForConversation(self, conversationId: int, filePaths: list):
+    def recordAttachmentsForConversation(self, conversationId: int, filePaths: list, batchSize: Optional[int] = None):
         """
-        Loops through the list of file paths and records each file and its relationship to the conversation.
+        Records all given files and their relationship to the conversation, one transaction per batch.
+        Committing per batch keeps the write lock short when thousands of files are attached at once,
+        while still costing only one commit for the usual handful of files.
+
+        Args:
+            conversationId (int): The ID of the conversation.
+            filePaths (list): The paths of the attached files.
+            batchSize (Optional[int]): Number of files per transaction. Defaults to ATTACHMENT_BATCH_SIZE.
+        """
+        # A batch is looked up with a single IN (...) query, so it must respect the parameter limit.
+        batchSize = min(batchSize or self.ATTACHMENT_BATCH_SIZE, self.MAX_QUERY_PARAMETERS)
+        for start in range(0, len(filePaths), batchSize):
+            batch = filePaths[start:start + batchSize]
+            try:
+                with self._transaction():
+                    self.conn.executemany(
+                        """
+                        INSERT OR IGNORE INTO files (file_path)
+                        VALUES (?)
+                    """,
+                        [(filePath,) for filePath in batch],
+                    )
+                    # Pad the lookup to the next power of two by repeating the last path, so that
+                    # any batch length maps to one of a handful of statements instead of its own.
+                    parameterCount = min(1 << (len(batch) - 1).bit_length(), batchSize)
+                    cursor = self.conn.execute(
+                        _fileIdLookupSql(parameterCount),
+                        batch + batch[-1:] * (parameterCount - len(batch)),
+                    )
+                    self.conn.executemany(
+                        """
+                        INSERT OR IGNORE INTO conversation_attachements (conversation_id, file_id)
+                        VALUES (?, ?)
+                    """,
+                        [(conversationId, row[0]) for row in cursor.fetchall()],
+                    )
+            except sqlite3.Error as e:
+                logging.error("Error recording attachments for conversation %s: %s", conversationId, e)
+                return
+
+    def getAttachedFiles(self, conversationId: int) -> List[str]:
         """
-        for filePath in filePaths:
-            fileId = self.addFileRecord(filePath)
-            if fileId:
-                self.recordConversationAttachment(conversationId, fileId)
+        Retrieves the paths of all files attached to a conversation.
+
+        Args:
+            conversationId (int): The ID of the conversation.
+
+        Returns:
+            List[str]: The attached file paths.
+        """
+        with self._lock:
+            cursor = self.conn.execute(
+                """
+                SELECT f.file_path
+                FROM files f
+                INNER JOIN conversation_attachements ca ON f.id = ca.file_id
+                WHERE ca.conversation_id = ?
+            """,
+                (conversationId,),
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def removeAttachment(self, conversationId: int, filePath: str):
+        """
+        Deletes the relationship between a conversation and an attached file.
+        The file record itself is left to deleteOrphanedFiles.
+
+        Args:
+            conversationId (int): The ID of the conversation.
+            filePath (str): The path of the attached file.
+        """
+        self.removeAttachments(conversationId, [filePath])
+
+    def removeAttachments(self, conversationId: int, filePaths: list):
+        """
+        Deletes the relationships between a conversation and the given attached files in a single transaction.
+        The file records themselves are left to deleteOrphanedFiles, which needs to run only once afterwards.
+
+        Args:
+            conversationId (int): The ID of the conversation.
+            filePaths (list): The paths of the attached files.
+        """
+        if not filePaths:
+            return
+        with self._transaction():
+            cursor = self.conn.executemany(
+                """
+                DELETE FROM conversation_attachements
+                WHERE conversation_id = ? AND file_id = (SELECT id FROM files WHERE file_path = ?)
+            """,
+                [(conversationId, filePath) for filePath in filePaths],
+            )
+        if cursor.rowcount:
+            logging.info(f"Deleted {cursor.rowcount} attachment relationships for conversation ID {conversationId}.")
 
     def close(self):
         """
-        Closes the database connection.
+        Checkpoints the write-ahead log, refreshes the query planner statistics and closes the database connection.
         """
-        self.conn.close()
+        with self._lock:
+            try:
+                # Fold the WAL back into the database file so it does not keep growing between sessions.
+                self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                self.conn.execute("PRAGMA optimize")
+            except sqlite3.Error as e:
+                logging.warning(f"Failed to checkpoint/optimize the database before closing: {e}")
+            self.conn.close()
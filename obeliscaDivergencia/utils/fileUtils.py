@@ -1,22 +1,92 @@
 import os
+import logging
+import functools
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Tuple
 
 
+@functools.lru_cache(maxsize=4096)
 def normalizeFilePath(filePath: str) -> str:
     """
     Normalizes the file path to a standard format.
+    Cached, since the same paths are normalized again whenever files or folders are re-added.
     """
     return os.path.normpath(filePath)
 
 
-def isBinaryFile(filePath: str, binaryExtensions: tuple) -> bool:
+def isBinaryFile(filePath: str, binaryExtensions: frozenset) -> bool:
     """
     Checks if the file has a binary extension.
+    binaryExtensions should be a frozenset of lower-case extensions (e.g. ChatSession.BINARY_EXTENSIONS),
+    so that the check is a single hashed lookup.
     """
     ext = os.path.splitext(filePath)[1].lower()
     return ext in binaryExtensions
 
 
+def _scanDirectory(directory: str, folderBlacklist: frozenset) -> Tuple[List[os.DirEntry], List[str]]:
+    """
+    Lists one directory. Returns the DirEntry of every file and the paths of all subfolders not in folderBlacklist.
+    An unreadable directory is logged and treated as empty.
+    """
+    files = []
+    subDirectories = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in folderBlacklist:
+                        subDirectories.append(entry.path)
+                elif entry.is_file():
+                    files.append(entry)
+    except OSError as e:
+        logging.warning("Cannot read directory %s: %s", directory, e)
+    return files, subDirectories
+
+
+def walkFiles(directory: str, folderBlacklist: frozenset) -> Iterator[os.DirEntry]:
+    """
+    Recursively yields the DirEntry of every file below directory, skipping folders whose name is in folderBlacklist.
+    Like os.walk, the files of a folder come before those of its subfolders and unreadable folders are skipped.
+    Blacklisted folders are dropped while their parent is scanned, so no per-folder list of names is built
+    and filtered afterwards; the DirEntry objects are kept so their cached stat results can be reused.
+    """
+    # An explicit stack instead of recursion: no generator chain per tree level that every entry
+    # has to pass through, and no recursion limit for deep trees.
+    stack = [directory]
+    while stack:
+        files, subDirectories = _scanDirectory(stack.pop(), folderBlacklist)
+        yield from files
+        # Reversed, so that the first subfolder is walked next.
+        stack.extend(reversed(subDirectories))
+
+
+def scanFiles(directory: str, folderBlacklist: frozenset, maxWorkers: Optional[int] = None) -> List[os.DirEntry]:
+    """
+    Returns the same files in the same order as walkFiles, but lists all folders of a tree level concurrently.
+    On network drives and cold caches the walk waits on directory listings, which threads can overlap.
+    """
+    if maxWorkers is None:
+        maxWorkers = min(32, (os.cpu_count() or 1) * 4)
+    listings = {}
+    level = [directory]
+    with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+        while level:
+            results = list(executor.map(lambda folder: _scanDirectory(folder, folderBlacklist), level))
+            listings.update(zip(level, results))
+            level = [subDirectory for _, subDirectories in results for subDirectory in subDirectories]
+
+    # Put the listings back into walk order: the files of a folder, then its subfolders depth first.
+    orderedFiles = []
+    stack = [directory]
+    while stack:
+        files, subDirectories = listings[stack.pop()]
+        orderedFiles.extend(files)
+        stack.extend(reversed(subDirectories))
+    return orderedFiles
+
+
 def getRelativePath(filePath: str, baseDir: str) -> str:
     """
     Returns the relative path of filePath with respect to baseDir.
@@ -1,7 +1,15 @@
+import re
+import uuid
+import functools
+import threading
+from types import MappingProxyType
 import markdown
+from markdown.extensions.codehilite import CodeHilite, CodeHiliteExtension
+from markdown.extensions.fenced_code import FencedBlockPreprocessor
 from pygments.formatters import HtmlFormatter
 
-# Generate styles once.
+# Generate styles once. They are set as the default style sheet of the conversation document
+# (see getStyleSheet) instead of being sent along with every converted message.
 pygmentsCss = HtmlFormatter().get_style_defs(".codehilite")
 additionalCss = """
     .codehilite {
@@ -9,38 +17,157 @@ additionalCss = """
         background-color: #f0f0f0;
     }
 """
-style = f"""
-<style>
+styleSheet = f"""
     body {{
         word-wrap: break-word;
         white-space: pre-wrap;
     }}
     {pygmentsCss}
     {additionalCss}
-</style>
 """
 
-# Create a global Markdown instance so that the extensions are loaded only once.
-mdConverter = markdown.Markdown(
-    extensions=["fenced_code", "codehilite"],
-    extension_configs={
-        "codehilite": {
-            "linenums": False,
-            "guess_lang": False,
-            "pygments_style": "monokai",
-            "noclasses": False,
-        }
-    },
+# Read-only, since they are shared by the converters of all threads.
+CODEHILITE_CONFIG = MappingProxyType(
+    {
+        "linenums": False,
+        "guess_lang": False,
+        "pygments_style": "monokai",
+        "noclasses": False,
+    }
 )
+_EXTENSIONS = ("fenced_code", "codehilite")
+_EXTENSION_CONFIGS = MappingProxyType({"codehilite": CODEHILITE_CONFIG})
+# The complete codehilite settings (including the extension's defaults), as fenced_code passes them to CodeHilite.
+_HIGHLIGHT_CONFIG = CodeHiliteExtension(**CODEHILITE_CONFIG).getConfigs()
+# Stands in for a fenced code block while the rest of the text is converted; unique per process,
+# so it cannot clash with text typed by the user.
+_CODE_BLOCK_TOKEN = "codeblock" + uuid.uuid4().hex
+_CODE_BLOCK_TOKEN_PATTERN = re.compile(f"<p>{_CODE_BLOCK_TOKEN}x(\\d+)x</p>|{_CODE_BLOCK_TOKEN}x(\\d+)x")
 
+# Text made only of these characters has no inline markdown (emphasis, code, links, raw HTML, entities,
+# escapes) and no block markup except for what _isPlainText checks per line.
+_PLAIN_TEXT_PATTERN = re.compile(r"[^\\`*_\[\]<>#+\-!|~=&\t\r\x02\x03]*")
+# Lines that would start an ordered list.
+_ORDERED_LIST_PATTERN = re.compile(r"^\d+\.", re.MULTILINE)
+# One or more empty lines, which separate paragraphs.
+_PARAGRAPH_BREAK_PATTERN = re.compile(r"\n{2,}")
 
-def convertMarkdownToHtml(text: str) -> str:
+# The converter keeps per-document state between reset() and convert(), so every thread
+# gets its own instance instead of sharing one behind a lock.
+_converterStorage = threading.local()
+
+
+def _converter() -> markdown.Markdown:
+    """
+    Returns the Markdown instance of the calling thread, creating it on first use
+    so that the extensions are loaded only once per thread.
+    """
+    converter = getattr(_converterStorage, "converter", None)
+    if converter is None:
+        converter = markdown.Markdown(extensions=_EXTENSIONS, extension_configs=_EXTENSION_CONFIGS, tab_length=4)
+        _converterStorage.converter = converter
+    return converter
+
+
+def _isPlainText(text: str) -> bool:
+    """
+    Returns True if markdown would render the text as nothing but paragraphs, so that the
+    whole markdown pipeline can be skipped. The check is conservative: when in doubt, it returns False.
+    """
+    if not _PLAIN_TEXT_PATTERN.fullmatch(text) or _ORDERED_LIST_PATTERN.search(text):
+        return False
+    # Indentation starts code blocks and trailing spaces make line breaks.
+    return all(line == line.strip() for line in text.split("\n"))
+
+
+def _convertPlainText(text: str) -> str:
+    """
+    Returns the HTML markdown produces for text accepted by _isPlainText: one <p> per paragraph.
+    """
+    paragraphs = _PARAGRAPH_BREAK_PATTERN.split(text.strip("\n"))
+    return "\n".join(f"<p>{paragraph}</p>" for paragraph in paragraphs if paragraph)
+
+
+def _normalizeWhitespace(text: str, tabLength: int) -> str:
+    """
+    Applies markdown's NormalizeWhitespace preprocessor to the text, so fenced code blocks are found
+    exactly where fenced_code would find them. Normalizing twice gives the same result.
+    """
+    text = text.replace(markdown.util.STX, "").replace(markdown.util.ETX, "")
+    text = text.replace("\r\n", "\n").replace("\r", "\n") + "\n\n"
+    text = text.expandtabs(tabLength)
+    return re.sub(r"(?<=\n) +\n", "\n", text)
+
+
+@functools.lru_cache(maxsize=256)
+def _highlightCode(lang: str, code: str) -> str:
+    """
+    Returns the codehilite HTML of a fenced code block, as fenced_code renders it.
+    Cached by language and source, since the same snippets often come up again in a chat.
+    """
+    config = dict(_HIGHLIGHT_CONFIG)
+    highlighter = CodeHilite(code, lang=lang or None, style=config.pop("pygments_style", "default"), **config)
+    return highlighter.hilite(shebang=False)
+
+
+def _extractCodeBlocks(text: str, tabLength: int) -> tuple:
+    """
+    Replaces every fenced code block of the text with a token and highlights it.
+    Blocks with {attrs} or hl_lines are left to fenced_code: if there is any, the text is returned unchanged.
+
+    Returns:
+        tuple: The text with the tokens, and the HTML of the blocks in token order.
+    """
+    normalized = text = _normalizeWhitespace(text, tabLength)
+    blocks = []
+    index = 0
+    while True:
+        match = FencedBlockPreprocessor.FENCED_BLOCK_RE.search(text, index)
+        if match is None:
+            return text, blocks
+        if match.group("attrs") is not None or match.group("hl_lines") is not None:
+            return normalized, []
+        token = f"{_CODE_BLOCK_TOKEN}x{len(blocks)}x"
+        blocks.append(_highlightCode(match.group("lang") or "", match.group("code")))
+        # Same replacement as fenced_code makes with its placeholder.
+        text = f"{text[:match.start()]}\n{token}\n{text[match.end():]}"
+        index = match.start() + 1 + len(token)
+
+
+@functools.lru_cache(maxsize=512)
+def _convertMarkdown(text: str) -> str:
     """
-    Convert markdown text to HTML with enhanced CSS for code highlighting,
-    using Consolas as the font for code blocks.
+    Converts markdown text to HTML with the converter of the calling thread. Results are cached by text,
+    so a message that is rendered again skips the markdown and Pygments work.
     """
+    if _isPlainText(text):
+        return _convertPlainText(text)
     # Clear any previous state (if needed) before converting new text,
     # so that the converter works correctly on subsequent invocations.
-    mdConverter.reset()
-    htmlContent = mdConverter.convert(text)
-    return f"{style}{htmlContent}"
+    converter = _converter()
+    converter.reset()
+    if "```" not in text and "~~~" not in text:
+        return converter.convert(text)
+    text, blocks = _extractCodeBlocks(text, converter.tab_length)
+    html = converter.convert(text)
+    if not blocks:
+        return html
+    # Put the highlighted blocks back, like markdown's RawHtmlPostprocessor does with its placeholders,
+    # and strip the result as Markdown.convert does after its postprocessors.
+    return _CODE_BLOCK_TOKEN_PATTERN.sub(lambda match: blocks[int(match.group(1) or match.group(2))], html).strip()
+
+
+def getStyleSheet() -> str:
+    """
+    Returns the CSS for the HTML of convertMarkdownToHtml, including the code highlighting rules.
+    Set it once with QTextDocument.setDefaultStyleSheet before inserting converted messages.
+    """
+    return styleSheet
+
+
+def convertMarkdownToHtml(text: str) -> str:
+    """
+    Convert markdown text to HTML. The HTML carries no style block; its CSS, with enhanced
+    code highlighting and Consolas as the font for code blocks, comes from getStyleSheet.
+    """
+    return _convertMarkdown(text)
@@ -22,6 +22,13 @@ class VacuumWorkerSignals(QObject):
 
 class VacuumWorker(QRunnable):
     """ Worker thread for vacuuming the SQLite database. """
+    # Value of PRAGMA auto_vacuum for incremental mode.
+    AUTO_VACUUM_INCREMENTAL = 2
+    # Maximum number of free pages reclaimed by one incremental vacuum.
+    INCREMENTAL_PAGES = 1000
+    # Fraction of free pages above which the file is rewritten with a full VACUUM.
+    FULL_VACUUM_THRESHOLD = 0.25
+
     def __init__(self, dbPath: str):
         super().__init__()
         self.dbPath = dbPath
@@ -30,15 +37,39 @@ class VacuumWorker(QRunnable):
     @Slot()
     def run(self):
         """
-        Executes the VACUUM command on the SQLite database.
+        Reclaims free pages of the SQLite database.
+
+        Normally only the freelist is trimmed with PRAGMA incremental_vacuum. A full VACUUM, which rewrites
+        the whole file, is run only to convert a database that does not use incremental auto-vacuum yet,
+        or when a large part of the file is free.
         """
         try:
             logging.info("Starting database vacuum...")
             connection = sqlite3.connect(self.dbPath)
-            cursor = connection.cursor()
-            cursor.execute("VACUUM;")
-            connection.commit()
-            connection.close()
+            try:
+                # The journal mode (WAL) is persistent; only the per-connection settings are needed here.
+                connection.execute("PRAGMA synchronous = NORMAL")
+                connection.execute("PRAGMA busy_timeout = 5000")
+                autoVacuum = connection.execute("PRAGMA auto_vacuum").fetchone()[0]
+                pageCount = connection.execute("PRAGMA page_count").fetchone()[0]
+                freelistCount = connection.execute("PRAGMA freelist_count").fetchone()[0]
+
+                if autoVacuum != self.AUTO_VACUUM_INCREMENTAL:
+                    # auto_vacuum can only be changed on an existing database by a full VACUUM.
+                    logging.info("Converting database to incremental auto-vacuum.")
+                    connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                    connection.execute("VACUUM")
+                elif pageCount and freelistCount / pageCount > self.FULL_VACUUM_THRESHOLD:
+                    logging.info(f"{freelistCount} of {pageCount} pages are free, running full vacuum.")
+                    connection.execute("VACUUM")
+                elif freelistCount:
+                    # execute() steps the pragma only once, which frees a single page; executescript()
+                    # runs it to completion.
+                    connection.executescript(f"PRAGMA incremental_vacuum({self.INCREMENTAL_PAGES});")
+                else:
+                    logging.info("No free pages, skipping vacuum.")
+            finally:
+                connection.close()
             logging.info("Database vacuum completed successfully.")
             self.signals.finished.emit()
         except Exception as e:
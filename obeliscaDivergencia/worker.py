@@ -1,34 +1,133 @@
+import os
 import logging
+from typing import Optional
 from PySide6.QtCore import QObject, Signal, QRunnable, Slot
 
 from obeliscaDivergencia.chatSession import ChatSession
+from obeliscaDivergencia.utils.fileUtils import normalizeFilePath, scanFiles
 
 
 class WorkerSignals(QObject):
+    # Text of the reply as it arrives; finished still carries the complete reply.
+    chunk = Signal(str)
     finished = Signal(str)
     error = Signal(str)
+    tokensCounted = Signal(int)
 
 
 class WorkerRunnable(QRunnable):
     """
     Worker Runnable for executing the API call in a background thread.
+    The runnable is not deleted by the thread pool, so a chat tab can keep one and reuse it (and its
+    signals object) for every message: call submit with the next message, then start it again.
     """
 
-    def __init__(self, chatSession: ChatSession, userText: str, filePathList: list):
+    def __init__(self, chatSession: ChatSession, userText: str = "", filePathList: Optional[list] = None):
         super().__init__()
+        self.setAutoDelete(False)
         self.chatSession = chatSession
+        self.signals = WorkerSignals()
+        self.submit(userText, filePathList or [])
+
+    def submit(self, userText: str, filePathList: list):
+        """
+        Sets the message sent by the next run. Must not be called while the runnable is running.
+
+        Args:
+            userText (str): The user's message.
+            filePathList (list): The attached file and directory paths.
+        """
         self.userText = userText
         self.filePathList = filePathList
-        self.signals = WorkerSignals()
 
     @Slot()
     def run(self):
         """
-        Executes the sendMessage operation in a separate thread.
+        Streams the reply of the ChatSession in a separate thread, emitting each piece through chunk.
+        Reading the attached files and counting their tokens happens here as well; the count is reported
+        through tokensCounted before the API call.
         """
         try:
-            reply = self.chatSession.sendMessage(self.userText, self.filePathList)
-            self.signals.finished.emit(reply)
+            parts = []
+            for delta in self.chatSession.streamMessage(self.userText, self.filePathList, self.signals.tokensCounted.emit):
+                parts.append(delta)
+                self.signals.chunk.emit(delta)
+            self.signals.finished.emit("".join(parts))
         except Exception as e:
             logging.error("Error in worker: %s", e, exc_info=True)
             self.signals.error.emit(str(e))
+
+
+class DirectoryScanSignals(QObject):
+    finished = Signal(list)
+    error = Signal(str)
+
+
+class DirectoryScanWorker(QRunnable):
+    """
+    Worker Runnable for collecting the attachable files of a directory in a background thread.
+    """
+
+    def __init__(self, directory: str, attachedFiles: set, folderBlacklist: frozenset, binaryExtensions: frozenset):
+        super().__init__()
+        self.directory = directory
+        # Snapshot of the already attached files, so the GUI thread can keep changing its list.
+        self.attachedFiles = set(attachedFiles)
+        self.folderBlacklist = folderBlacklist
+        self.binaryExtensions = binaryExtensions
+        self.signals = DirectoryScanSignals()
+
+    @Slot()
+    def run(self):
+        """
+        Walks the directory (skipping blacklisted folders) and emits the normalized paths of all files
+        that are neither binary nor already attached, in walk order.
+        """
+        try:
+            newFiles = []
+            # Bind to locals once; the walk below may visit many thousands of files.
+            attachedFiles = self.attachedFiles
+            binaryExtensions = self.binaryExtensions
+            splitext = os.path.splitext
+            for entry in scanFiles(self.directory, self.folderBlacklist):
+                # Cheap extension filter first, so binaries are never normalized or looked up.
+                if splitext(entry.name)[1].lower() in binaryExtensions:
+                    logging.debug("Skipping binary file: %s", entry.path)
+                    continue
+                normalizedPath = normalizeFilePath(entry.path)
+                if normalizedPath in attachedFiles:
+                    logging.debug("File already attached: %s", normalizedPath)
+                    continue
+                attachedFiles.add(normalizedPath)
+                newFiles.append(normalizedPath)
+            self.signals.finished.emit(newFiles)
+        except Exception as e:
+            logging.error("Error scanning directory %s: %s", self.directory, e, exc_info=True)
+            self.signals.error.emit(str(e))
+
+
+class ConversationListSignals(QObject):
+    finished = Signal(list)
+    error = Signal(str)
+
+
+class ConversationListWorker(QRunnable):
+    """
+    Worker Runnable for reading the conversation summaries from the database in a background thread.
+    """
+
+    def __init__(self, conversationDb):
+        super().__init__()
+        self.conversationDb = conversationDb
+        self.signals = ConversationListSignals()
+
+    @Slot()
+    def run(self):
+        """
+        Emits the (id, title, deployment_name, created_at, tokens) tuples of all conversations, newest first.
+        """
+        try:
+            self.signals.finished.emit(self.conversationDb.getAllConversations())
+        except Exception as e:
+            logging.error("Error loading the conversations list: %s", e, exc_info=True)
+            self.signals.error.emit(str(e))
@@ -1,20 +1,110 @@
 import unittest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, Mock, MagicMock, DEFAULT
 import os
-from obeliscaDivergencia.chatSession import ChatSession
-from obeliscaDivergencia.utils.database import ConversationDatabase
+import tempfile
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from types import MappingProxyType
+from obeliscaDivergencia import chatSession as chatSessionModule
+from obeliscaDivergencia.chatSession import ChatSession, API_ERROR_PREFIX, _encodingFor
+from obeliscaDivergencia.config import _apiKey
+
+
+SYSTEM_PROMPT = "You are a helpful assistant."
+# Read-only, since every test shares it.
+DEPLOYMENT_CONFIG = MappingProxyType(
+    {
+        "type": "azure",
+        "endpoint": "https://test-endpoint.openai.azure.com/",
+        "deploymentName": "test-deployment",
+        "apiVersion": "2024-12-01-preview",
+    }
+)
+
+
+@contextlib.contextmanager
+def _withoutAzureApiKey():
+    """
+    Removes the Azure API key from the environment for the duration of the block.
+    """
+    apiKey = os.environ.pop("AZURE_OPENAI_API_KEY", None)
+    try:
+        yield
+    finally:
+        if apiKey is not None:
+            os.environ["AZURE_OPENAI_API_KEY"] = apiKey
+
+
+def _writePdf(filePath: str, text: str):
+    """
+    Writes a one-page PDF showing the given (ASCII) text.
+    """
+    content = b"BT /F1 12 Tf 20 100 Td (%s) Tj ET" % text.encode("ascii")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 300 144] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    data = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xrefOffset = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xrefOffset)
+    with open(filePath, "wb") as fileHandle:
+        fileHandle.write(data)
+
+
+class _StubDatabase:
+    """
+    Stands in for ConversationDatabase. ChatSession only keeps a reference to its database
+    and never calls it, so the stub needs no methods.
+    """
+
+
+class _WordEncoder:
+    """
+    Stands in for a tiktoken encoding, with one token per whitespace-separated word, so that the
+    tests neither load nor download the BPE tables.
+    """
+
+    def encode(self, text):
+        return text.split()
+
+    def encode_batch(self, texts):
+        return [text.split() for text in texts]
 
 
 class TestChatSession(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Fixtures no test modifies, built once for the whole class.
+        cls.systemPrompt = SYSTEM_PROMPT
+        cls.deploymentConfig = DEPLOYMENT_CONFIG
+        cls.db = _StubDatabase()
+        # The external dependencies are replaced once for the whole class: the OpenAI client (so no API key is
+        # needed), the tokenizer and the document parsers, for which each test sets the behavior it needs.
+        externalsPatcher = patch.multiple(
+            "obeliscaDivergencia.chatSession",
+            initOpenAiClient=DEFAULT,
+            _encodingFor=Mock(return_value=_WordEncoder()),
+            _openDocxDocument=DEFAULT,
+            _extractPdfTextWithPdfminer=DEFAULT,
+        )
+        externalMocks = externalsPatcher.start()
+        cls.addClassCleanup(externalsPatcher.stop)
+        cls.documentMock = externalMocks["_openDocxDocument"]
+        cls.extractTextMock = externalMocks["_extractPdfTextWithPdfminer"]
+
     def setUp(self):
-        self.systemPrompt = "You are a helpful assistant."
-        self.deploymentConfig = {
-            "type": "azure",
-            "endpoint": "https://test-endpoint.openai.azure.com/",
-            "deploymentName": "test-deployment",
-            "apiVersion": "2024-12-01-preview",
-        }
-        self.db = MagicMock(spec=ConversationDatabase)
+        self.documentMock.reset_mock(return_value=True, side_effect=True)
+        self.extractTextMock.reset_mock(return_value=True, side_effect=True)
         self.chatSession = ChatSession(
             self.systemPrompt,
             self.deploymentConfig,
@@ -33,46 +123,62 @@ class TestChatSession(unittest.TestCase):
         self.assertEqual(self.chatSession.maxFileSize, 5 * 1024 * 1024)
         self.assertEqual(self.chatSession.maxContextTokens, 100000)
 
-    @patch("obeliscaDivergencia.chatSession.Document")
-    def test_extractTextFromDocx_valid(self, mock_document):
+    def test_extractTextFromDocx_valid(self):
         # Test extracting text from a valid DOCX file
-        mock_doc = MagicMock()
-        mock_doc.paragraphs = [MagicMock(text="Paragraph 1"), MagicMock(text="Paragraph 2")]
-        mock_document.return_value = mock_doc
+        mock_doc = Mock()
+        mock_doc.paragraphs = [Mock(text="Paragraph 1"), Mock(text="Paragraph 2")]
+        self.documentMock.return_value = mock_doc
         text = self.chatSession.extractTextFromDocx("dummy.docx")
-        self.assertEqual(text, "\n".join(["Paragraph 1", "Paragraph 2"]))
+        self.assertEqual(text, "Paragraph 1\nParagraph 2")
 
-    @patch("obeliscaDivergencia.chatSession.Document", side_effect=Exception("Failed to open DOCX"))
-    def test_extractTextFromDocx_exception(self, mock_document):
+    def test_extractTextFromDocx_exception(self):
         # Test extracting text from a DOCX file that raises an exception
+        self.documentMock.side_effect = Exception("Failed to open DOCX")
         text = self.chatSession.extractTextFromDocx("dummy.docx")
         self.assertEqual(text, "")
 
-    @patch("obeliscaDivergencia.chatSession.extract_text", return_value="Extracted PDF text")
-    def test_extractTextFromPdf_valid(self, mock_extract_text):
+    def test_extractTextFromDocx_matchesPythonDocx(self):
+        # Test that the direct XML extraction yields the same text as python-docx
+        import docx
+
+        with tempfile.TemporaryDirectory() as tempDir:
+            filePath = os.path.join(tempDir, "test.docx")
+            document = docx.Document()
+            document.add_paragraph("Hello\tworld")
+            paragraph = document.add_paragraph("First line")
+            paragraph.add_run().add_break()
+            paragraph.add_run("second line")
+            document.add_table(rows=1, cols=1).cell(0, 0).text = "Table cell"
+            document.add_paragraph("")
+            document.add_paragraph("End")
+            document.save(filePath)
+
+            expected = "\n".join(para.text for para in docx.Document(filePath).paragraphs)
+            self.assertEqual(self.chatSession.extractTextFromDocx(filePath), expected)
+
+    def test_extractTextFromPdf_valid(self):
         # Test extracting text from a valid PDF file
+        self.extractTextMock.return_value = "Extracted PDF text"
         text = self.chatSession.extractTextFromPdf("dummy.pdf")
         self.assertEqual(text, "Extracted PDF text")
 
-    @patch("obeliscaDivergencia.chatSession.extract_text", side_effect=Exception("Failed to open PDF"))
-    def test_extractTextFromPdf_exception(self, mock_extract_text):
+    def test_extractTextFromPdf_exception(self):
         # Test extracting text from a PDF file that raises an exception
+        self.extractTextMock.side_effect = Exception("Failed to open PDF")
         text = self.chatSession.extractTextFromPdf("dummy.pdf")
         self.assertEqual(text, "")
 
-    @patch("obeliscaDivergencia.chatSession.os.path.exists", return_value=True)
-    @patch("obeliscaDivergencia.chatSession.os.path.isdir", return_value=False)
-    @patch("obeliscaDivergencia.chatSession.ChatSession._readSingleFile", return_value="File Content")
-    def test_readFilesContent_singleFile(self, mock_read_single_file, mock_isdir, mock_exists):
+    @patch.multiple("obeliscaDivergencia.chatSession.os.path", exists=Mock(return_value=True), isdir=Mock(return_value=False))
+    @patch("obeliscaDivergencia.chatSession.ChatSession._readFile", return_value=("read", "File Content"))
+    def test_readFilesContent_singleFile(self, mock_read_single_file):
         # Test reading content from a single file
         content = self.chatSession.readFilesContent("dummy.txt")
         self.assertEqual(content, "File Content")
         mock_read_single_file.assert_called_with("dummy.txt")
 
-    @patch("obeliscaDivergencia.chatSession.os.path.exists", return_value=True)
-    @patch("obeliscaDivergencia.chatSession.os.path.isdir", side_effect=[False, False])
-    @patch("obeliscaDivergencia.chatSession.ChatSession._readSingleFile", side_effect=["Content1", "Content2"])
-    def test_readFilesContent_multipleFiles(self, mock_read_single_file, mock_isdir, mock_exists):
+    @patch.multiple("obeliscaDivergencia.chatSession.os.path", exists=Mock(return_value=True), isdir=Mock(return_value=False))
+    @patch("obeliscaDivergencia.chatSession.ChatSession._readFile", side_effect=[("read", "Content1"), ("read", "Content2")])
+    def test_readFilesContent_multipleFiles(self, mock_read_single_file):
         # Test reading content from multiple files
         content = self.chatSession.readFilesContent("file1.txt,file2.txt")
         self.assertEqual(content, "Content1Content2")
@@ -80,46 +186,273 @@ class TestChatSession(unittest.TestCase):
         mock_read_single_file.assert_any_call("file1.txt")
         mock_read_single_file.assert_any_call("file2.txt")
 
-    # @patch("obeliscaDivergencia.chatSession.initOpenAiClient")
-    # @patch("obeliscaDivergencia.chatSession.os.environ", {})
-    @patch.dict('obeliscaDivergencia.config.os.environ', {}, clear=True)
-    def test_sendMessage_missing_api_key(self):
-        # Ensure ValueError is raised when API key is missing
-        with self.assertRaises(ValueError) as context:
-            ChatSession(
-                self.systemPrompt,
-                self.deploymentConfig,
-                conversationId=None,
-                db=self.db,
-                maxContextTokens=100000,
-            )
-        self.assertIn("API key environment variable is not set.", str(context.exception))
+    @patch.multiple("obeliscaDivergencia.chatSession.os.path", exists=Mock(return_value=True), isdir=Mock(return_value=False))
+    def test_readFilesContent_documentsConcurrently(self):
+        # Test that a few files are read concurrently once one of them is a DOCX document, keeping their order
+        readingThreads = []
+
+        def readFile(filePath):
+            readingThreads.append(threading.current_thread())
+            return "read", f"<{filePath}>"
+
+        cases = [
+            (["a.txt", "b.txt", "c.txt"], False),
+            (["a.pdf", "b.PDF", "c.txt"], False),
+            (["a.txt", "b.pdf", "c.DOCX"], True),
+        ]
+        for filePaths, concurrent in cases:
+            with self.subTest(filePaths=filePaths), patch.object(ChatSession, "_readFile", side_effect=readFile):
+                readingThreads.clear()
+                content = self.chatSession.readFilesContent(",".join(filePaths))
+                self.assertEqual(content, "".join(f"<{filePath}>" for filePath in filePaths))
+                self.assertEqual(threading.main_thread() not in readingThreads, concurrent)
+
+    @unittest.skipIf(chatSessionModule.pdfium is None, "pypdfium2 is not installed")
+    def test_extractTextFromPdf_concurrently(self):
+        # Test that PDFs extracted on several threads at once are read one at a time and each yields its own text
+        with tempfile.TemporaryDirectory() as tempDir:
+            filePaths = []
+            for i in range(8):
+                filePath = os.path.join(tempDir, f"file{i}.pdf")
+                _writePdf(filePath, f"Document number {i}")
+                filePaths.append(filePath)
+
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                texts = list(executor.map(self.chatSession.extractTextFromPdf, filePaths * 4))
+            self.assertEqual([text.strip() for text in texts], [f"Document number {i}" for i in range(8)] * 4)
+            self.extractTextMock.assert_not_called()
+
+            # While another thread uses PDFium, an extraction waits for it
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                with chatSessionModule._pdfiumLock:
+                    future = executor.submit(self.chatSession.extractTextFromPdf, filePaths[0])
+                    with self.assertRaises(FutureTimeoutError):
+                        future.result(timeout=0.2)
+                self.assertEqual(future.result(timeout=5).strip(), "Document number 0")
+
+    def test_readFilesContent_directory_keepsOrder(self):
+        # Test that a directory read concurrently still produces the content in walk order
+        with tempfile.TemporaryDirectory() as tempDir:
+            fileCount = ChatSession.PARALLEL_READ_THRESHOLD * 2
+            for i in range(fileCount):
+                fileName = f"file{i:02d}.txt"
+                with open(os.path.join(tempDir, fileName), "w", encoding="utf-8") as fileHandle:
+                    fileHandle.write(f"content of {fileName}")
+            expected = [f"content of {fileName}" for fileName in next(os.walk(tempDir))[2]]
+
+            content = self.chatSession.readFilesContent(tempDir)
+            positions = [content.index(text + ChatSession.FILE_MARKER_END) for text in expected]
+            self.assertEqual(positions, sorted(positions))
+            self.assertEqual(content.count(ChatSession.FILE_MARKER_START), fileCount)
 
-    @patch("obeliscaDivergencia.chatSession.initOpenAiClient")
-    @patch("obeliscaDivergencia.chatSession.os.environ", {"AZURE_OPENAI_API_KEY": "test-api-key"})
-    def test_sendMessage_api_exception(self, mock_init_openai_client):
+    def test_readFilesContent_logsSummary(self):
+        # Test that a directory read logs one summary with the number of read and skipped files
+        with tempfile.TemporaryDirectory() as tempDir:
+            for fileName in ("a.txt", "b.txt", "c.png"):
+                with open(os.path.join(tempDir, fileName), "w", encoding="utf-8") as fileHandle:
+                    fileHandle.write("data")
+
+            with self.assertLogs("obeliscaDivergencia.chatSession", level="INFO") as logs:
+                self.chatSession.readFilesContent(tempDir)
+            self.assertIn("Read 2 files, skipped 1 binary, 0 oversize, 0 unreadable", logs.output[-1])
+
+    @patch("obeliscaDivergencia.chatSession.ChatSession.extractTextFromDocx", return_value="Document text")
+    def test_readSingleFile_cachesUnchangedFiles(self, mock_extract_docx):
+        # Test that an unchanged file is parsed only once and a modified file is parsed again
+        with tempfile.TemporaryDirectory() as tempDir:
+            filePath = os.path.join(tempDir, "test.docx")
+            with open(filePath, "wb") as fileHandle:
+                fileHandle.write(b"1")
+
+            first = self.chatSession._readSingleFile(filePath)
+            second = self.chatSession._readSingleFile(filePath)
+            self.assertEqual(first, second)
+            self.assertIn("Document text", first)
+            self.assertEqual(mock_extract_docx.call_count, 1)
+
+            with open(filePath, "wb") as fileHandle:
+                fileHandle.write(b"12")
+            self.chatSession._readSingleFile(filePath)
+            self.assertEqual(mock_extract_docx.call_count, 2)
+
+    def test_sendMessage_api_exception(self):
         # Mock the OpenAI client to raise an exception
-        mock_client = MagicMock()
+        mock_client = Mock()
         mock_client.chat.completions.create.side_effect = Exception("API Error")
-        mock_init_openai_client.return_value = mock_client
+        self.chatSession.client = mock_client
 
         reply = self.chatSession.sendMessage("Hello", [])
-        self.assertEqual(reply[:21], "Error during API call")
+        self.assertTrue(reply.startswith(API_ERROR_PREFIX))
         self.assertEqual(len(self.chatSession.conversationHistory), 2)  # system prompt and Hello
 
-    @patch("obeliscaDivergencia.chatSession.tiktoken.get_encoding")
-    def test_countTokens(self, mock_get_encoding):
-        # Mock the tokenizer
-        mock_encoder = MagicMock()
-        mock_encoder.encode.side_effect = [
-            [0, 1, 2],  # system prompt
-            [3, 4],     # user message
-        ]
-        mock_get_encoding.return_value = mock_encoder
+    @patch("obeliscaDivergencia.chatSession.ChatSession.readFilesContent", return_value="\n<|file|>[Content from a.txt]:\nData<|/file|>\n")
+    def test_sendMessage_withAttachments(self, mock_read_files_content):
+        # Test that file content is sent to the API but not stored in the conversation history
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value.choices[0].message.content = "Reply"
+        mock_client.chat.completions.create.return_value.usage.total_tokens = 10
+        self.chatSession.client = mock_client
 
+        reply = self.chatSession.sendMessage("Hello", ["a.txt"])
+        self.assertEqual(reply, "Reply")
+        sentMessages = mock_client.chat.completions.create.call_args.kwargs["messages"]
+        self.assertEqual(sentMessages[-1]["content"], "Hello\n<|file|>[Content from a.txt]:\nData<|/file|>")
+        self.assertEqual(
+            self.chatSession.conversationHistory[1:],
+            [{"role": "user", "content": "Hello"}, {"role": "assistant", "content": "Reply"}],
+        )
+
+    @patch("obeliscaDivergencia.chatSession.ChatSession.readFilesContent", return_value="\n<|file|>[Content from a.txt]:\nData<|/file|>\n")
+    def test_sendMessage_reportsTokensSent(self, mock_read_files_content):
+        # Test that the token count reported before the API call includes the file content
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value.choices[0].message.content = "Reply"
+        self.chatSession.client = mock_client
+        tokenCounts = []
+
+        self.chatSession.sendMessage("Hello", ["a.txt"], tokenCounts.append)
+        sentMessages = mock_client.chat.completions.create.call_args.kwargs["messages"]
+        expected = sum(len(self.chatSession.encoding.encode(message["content"])) for message in sentMessages)
+        self.assertEqual(tokenCounts, [expected])
+
+    def test_streamMessage_yieldsChunks(self):
+        # Test that a streamed reply is yielded piece by piece and stored once complete
+        def streamChunk(content, totalTokens=None):
+            chunk = Mock()
+            chunk.choices = [] if content is None else [Mock()]
+            if content is not None:
+                chunk.choices[0].delta.content = content
+            chunk.usage = None if totalTokens is None else Mock(total_tokens=totalTokens)
+            return chunk
+
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = iter([streamChunk("Re"), streamChunk(""), streamChunk("ply"), streamChunk(None, 12)])
+        self.chatSession.client = mock_client
+
+        chunks = list(self.chatSession.streamMessage("Hello", []))
+        self.assertEqual(chunks, ["Re", "ply"])
+        self.assertTrue(mock_client.chat.completions.create.call_args.kwargs["stream"])
+        self.assertEqual(self.chatSession.lastTotalTokens, 12)
+        self.assertEqual(
+            self.chatSession.conversationHistory[1:],
+            [{"role": "user", "content": "Hello"}, {"role": "assistant", "content": "Reply"}],
+        )
+
+    def test_streamMessage_failsMidStream(self):
+        # Test that a stream failing after some text raises instead of appending the error to the partial reply
+        def failingStream():
+            chunk = Mock(usage=None, choices=[Mock()])
+            chunk.choices[0].delta.content = "Partial"
+            yield chunk
+            raise ConnectionError("Connection reset")
+
+        mock_client = Mock()
+        mock_client.chat.completions.create.return_value = failingStream()
+        self.chatSession.client = mock_client
+
+        chunks = []
+        with self.assertRaises(RuntimeError) as context:
+            for chunk in self.chatSession.streamMessage("Hello", []):
+                chunks.append(chunk)
+        self.assertEqual(chunks, ["Partial"])
+        self.assertTrue(str(context.exception).startswith(API_ERROR_PREFIX))
+        self.assertIn("Connection reset", str(context.exception))
+        self.assertEqual(self.chatSession.conversationHistory, [{"role": "user", "content": self.systemPrompt}])
+
+    def test_streamMessage_failsBeforeText(self):
+        # Test that a stream failing before any text yields the error message as the reply
+        mock_client = Mock()
+        mock_client.chat.completions.create.side_effect = ConnectionError("Connection refused")
+        self.chatSession.client = mock_client
+
+        chunks = list(self.chatSession.streamMessage("Hello", []))
+        self.assertEqual(len(chunks), 1)
+        self.assertTrue(chunks[0].startswith(API_ERROR_PREFIX))
+        self.assertEqual(len(self.chatSession.conversationHistory), 2)  # system prompt and Hello
+
+    def test_generateSummary_givenText(self):
+        # Test that a given conversation text is summarized instead of the loaded history
+        mock_client = MagicMock()
+        mock_client.chat.completions.create.return_value.choices[0].message.content = " Short summary "
+        self.chatSession.client = mock_client
+
+        self.assertEqual(self.chatSession.generateSummary("Stored text"), "Short summary")
+        prompt = mock_client.chat.completions.create.call_args.kwargs["messages"][0]["content"]
+        self.assertTrue(prompt.endswith("\nStored text"))
+        self.assertNotIn(self.systemPrompt, prompt)
+
+    def test_countTokens(self):
+        # The class-wide tokenizer counts one token per word; both new messages are encoded in one batch
+        self.chatSession.encoding = Mock(wraps=self.chatSession.encoding)
         self.chatSession.conversationHistory.append({"role": "user", "content": "Test message"})
         token_count = self.chatSession.countTokens()
-        self.assertEqual(token_count, 8)  # 3 + 2
+        self.assertEqual(token_count, 7)  # 5 + 2
+        self.chatSession.encoding.encode_batch.assert_called_once_with([self.systemPrompt, "Test message"])
+
+    def test_countTokens_encodesMessagesOnce(self):
+        # Test that new messages are encoded in one batch and repeated counts reuse the cached token counts
+        mock_encoder = Mock()
+        mock_encoder.encode.side_effect = lambda text: text.split()
+        mock_encoder.encode_batch.side_effect = lambda texts: [text.split() for text in texts]
+        self.chatSession.encoding = mock_encoder
+
+        self.chatSession.conversationHistory.append({"role": "user", "content": "Test message"})
+        self.assertEqual(self.chatSession.countTokens(), 7)
+        self.assertEqual(self.chatSession.countTokens(), 7)
+        mock_encoder.encode_batch.assert_called_once()
+        mock_encoder.encode.assert_not_called()
+
+        # A single new message is encoded on its own
+        self.chatSession.conversationHistory.append({"role": "assistant", "content": "Reply"})
+        self.assertEqual(self.chatSession.countTokens(), 8)
+        mock_encoder.encode.assert_called_once_with("Reply")
+
+    def test_trimConversationHistory(self):
+        # Test that the oldest messages after the system prompt are removed until the limit is met
+        mock_encoder = Mock()
+        mock_encoder.encode.side_effect = lambda text: text.split()
+        mock_encoder.encode_batch.side_effect = lambda texts: [text.split() for text in texts]
+        self.chatSession.encoding = mock_encoder
+        self.chatSession.maxContextTokens = 9
+
+        self.chatSession.conversationHistory.extend(
+            [
+                {"role": "user", "content": "one two"},
+                {"role": "assistant", "content": "three four"},
+                {"role": "user", "content": "five"},
+            ]
+        )
+        self.chatSession.trimConversationHistory()
+        self.assertEqual(
+            [message["content"] for message in self.chatSession.conversationHistory],
+            [self.systemPrompt, "three four", "five"],
+        )
+        self.assertEqual(self.chatSession.countTokens(), 8)
+
+    @patch("obeliscaDivergencia.chatSession.tiktoken.get_encoding")
+    def test_encodingFor(self, mock_get_encoding):
+        # Test that encodings are looked up per model once and unknown deployments use the default
+        mock_get_encoding.side_effect = lambda name: Mock(name=name)
+        _encodingFor.cache_clear()
+        try:
+            self.assertIs(_encodingFor("gpt-4o"), _encodingFor("gpt-4o"))
+            _encodingFor("my-custom-deployment")
+            self.assertEqual(
+                [call.args[0] for call in mock_get_encoding.call_args_list], ["o200k_base", "cl100k_base"]
+            )
+        finally:
+            _encodingFor.cache_clear()
+
+
+class TestChatSessionInit(unittest.TestCase):
+    # Tests of failing constructions, which must not pay for the ChatSession that TestChatSession.setUp builds.
+
+    def test_missing_api_key(self):
+        # Ensure ValueError is raised when API key is missing
+        _apiKey.cache_clear()
+        with _withoutAzureApiKey(), self.assertRaises(ValueError) as context:
+            ChatSession(SYSTEM_PROMPT, DEPLOYMENT_CONFIG, db=_StubDatabase())
+        self.assertIn("API key environment variable is not set.", str(context.exception))
 
 
 if __name__ == "__main__":
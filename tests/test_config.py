@@ -1,28 +1,66 @@
 import unittest
 from unittest.mock import patch, MagicMock
 import os
-from obeliscaDivergencia.config import initOpenAiClient
-import configparser
-import openai
+import contextlib
+import tempfile
+from types import MappingProxyType
+from obeliscaDivergencia.config import initOpenAiClient, validateDeployments, _apiKey, getSettings, setSettingIfChanged
+
+
+API_KEY_VARIABLES = ("AZURE_OPENAI_API_KEY", "OPENAI_API_KEY")
+# Read-only, so that no test can change them for the others; tests needing a variant copy them with {**CONFIG, ...}.
+AZURE_CONFIG = MappingProxyType(
+    {
+        "type": "azure",
+        "endpoint": "https://test-endpoint.openai.azure.com/",
+        "deploymentName": "test-deployment",
+        "apiVersion": "2024-12-01-preview",
+    }
+)
+OPENAI_CONFIG = MappingProxyType(
+    {
+        "type": "openai",
+        "endpoint": "https://api.openai.com/v1",
+        "deploymentName": "gpt-3.5-turbo",
+        "apiVersion": "",  # Not required for openai
+    }
+)
+
+
+@contextlib.contextmanager
+def _environment(**variables):
+    """
+    Sets the given variables, removes any other API key variable and forgets the cached API keys.
+    Only these variables are saved and restored afterwards, not the whole environment.
+    """
+    names = set(API_KEY_VARIABLES).union(variables)
+    saved = {name: os.environ.pop(name, None) for name in names}
+    try:
+        os.environ.update(variables)
+        _apiKey.cache_clear()
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
 
 
 class TestConfig(unittest.TestCase):
-    @patch("obeliscaDivergencia.config.openai.AzureOpenAI")
-    @patch("obeliscaDivergencia.config.openai.OpenAI")
+    def setUp(self):
+        # The API key lookup is cached per process; each test patches its own environment.
+        _apiKey.cache_clear()
+
+    @patch("openai.AzureOpenAI")
+    @patch("openai.OpenAI")
     @patch.dict(os.environ, {"AZURE_OPENAI_API_KEY": "test-api-key"})
     def test_initOpenAI_azure_success(self, mock_openai_class, mock_azure_openai_class):
         # Mock the AzureOpenAI client
         mock_client = MagicMock()
         mock_azure_openai_class.return_value = mock_client
 
-        deploymentConfig = {
-            "type": "azure",
-            "endpoint": "https://test-endpoint.openai.azure.com/",
-            "deploymentName": "test-deployment",
-            "apiVersion": "2024-12-01-preview",
-        }
-
-        client = initOpenAiClient(deploymentConfig)
+        client = initOpenAiClient(AZURE_CONFIG)
 
         # Assert AzureOpenAI configurations
         mock_azure_openai_class.assert_called_once_with(api_version="2024-12-01-preview", azure_endpoint="https://test-endpoint.openai.azure.com/")
@@ -30,22 +68,15 @@ class TestConfig(unittest.TestCase):
         self.assertEqual(client.api_key, "test-api-key")
         # self.assertEqual(client.api_base, "https://test-endpoint.openai.azure.com/")
 
-    @patch("obeliscaDivergencia.config.openai.OpenAI")
-    @patch("obeliscaDivergencia.config.openai.AzureOpenAI")
+    @patch("openai.OpenAI")
+    @patch("openai.AzureOpenAI")
     @patch.dict(os.environ, {"OPENAI_API_KEY": "test-openai-key"})
     def test_initOpenAI_openai_success(self, mock_azure_openai_class, mock_openai_class):
         # Mock the OpenAI client
         mock_client = MagicMock()
         mock_openai_class.return_value = mock_client
 
-        deploymentConfig = {
-            "type": "openai",
-            "endpoint": "https://api.openai.com/v1",
-            "deploymentName": "gpt-3.5-turbo",
-            "apiVersion": "",  # Not required for openai
-        }
-
-        client = initOpenAiClient(deploymentConfig)
+        client = initOpenAiClient(OPENAI_CONFIG)
 
         # Assert OpenAI configurations
         mock_openai_class.assert_called_once()
@@ -53,57 +84,73 @@ class TestConfig(unittest.TestCase):
         self.assertEqual(client.api_key, "test-openai-key")
         self.assertEqual(client.api_base, "https://api.openai.com/v1")
 
-    def test_initOpenAI_missing_api_key(self):
-        # Ensure ValueError is raised when API key is missing
-        deploymentConfig = {
-            "type": "azure",
-            "endpoint": "https://test-endpoint.openai.azure.com/",
-            "deploymentName": "test-deployment",
-            "apiVersion": "2024-12-01-preview",
-        }
-        with patch.dict(os.environ, {}, clear=True):
-            with self.assertRaises(ValueError) as context:
-                initOpenAiClient(deploymentConfig)
-            self.assertIn("API key environment variable is not set.", str(context.exception))
-
-    def test_initOpenAI_missing_azure_config(self):
-        # Test missing required Azure configuration
-        deploymentConfig = {
-            "type": "azure",
-            "endpoint": "",
-            "deploymentName": "test-deployment",
-            "apiVersion": "2024-12-01-preview",
-        }
-        with patch.dict(os.environ, {"AZURE_OPENAI_API_KEY": "test-api-key"}):
-            with self.assertRaises(ValueError) as context:
-                initOpenAiClient(deploymentConfig)
-            self.assertIn("Missing required Azure OpenAI configuration.", str(context.exception))
-
-    def test_initOpenAI_missing_openai_deploymentName(self):
-        # Test missing deploymentName for OpenAI configuration
-        deploymentConfig = {
-            "type": "openai",
-            "endpoint": "https://api.openai.com/v1",
-            "deploymentName": "",
-            "apiVersion": "",
-        }
-        with patch.dict(os.environ, {"OPENAI_API_KEY": "test-openai-key"}):
-            with self.assertRaises(ValueError) as context:
-                initOpenAiClient(deploymentConfig)
-            self.assertIn("deploymentName is not set for OpenAI configuration.", str(context.exception))
-
-    def test_initOpenAI_unknown_deployment_type(self):
-        # Test unknown deployment type
-        deploymentConfig = {
-            "type": "unknown",
-            "endpoint": "https://unknown-endpoint.com/api",
-            "deploymentName": "unknown-deployment",
-            "apiVersion": "2024-12-01-preview",
-        }
-        with patch.dict(os.environ, {"AZURE_OPENAI_API_KEY": "test-api-key"}):
-            with self.assertRaises(ValueError) as context:
-                initOpenAiClient(deploymentConfig)
-            self.assertIn("Unknown deployment type: unknown", str(context.exception))
+    def test_initOpenAI_errors(self):
+        # Ensure ValueError is raised when the API key is missing or the deployment type is unknown
+        cases = [
+            ({}, AZURE_CONFIG, "API key environment variable is not set."),
+            # Only the Azure key is set; an OPENAI_API_KEY of the surrounding environment must not leak in.
+            ({"AZURE_OPENAI_API_KEY": "test-api-key"}, OPENAI_CONFIG, "API key environment variable is not set."),
+            (
+                {"AZURE_OPENAI_API_KEY": "test-api-key"},
+                {**AZURE_CONFIG, "type": "unknown", "endpoint": "https://unknown-endpoint.com/api", "deploymentName": "unknown-deployment"},
+                "Unknown deployment type: unknown",
+            ),
+        ]
+        for environment, deploymentConfig, expectedError in cases:
+            with self.subTest(type=deploymentConfig["type"]), _environment(**environment):
+                with self.assertRaises(ValueError) as context:
+                    initOpenAiClient(deploymentConfig)
+                self.assertIn(expectedError, str(context.exception))
+
+    def test_validateDeployments_missing_config(self):
+        # Test missing required Azure configuration and missing deploymentName for OpenAI configuration
+        cases = [
+            ({**AZURE_CONFIG, "endpoint": ""}, "Missing required Azure OpenAI configuration."),
+            ({**OPENAI_CONFIG, "deploymentName": ""}, "deploymentName is not set for OpenAI configuration."),
+        ]
+        for deploymentConfig, expectedError in cases:
+            with self.subTest(type=deploymentConfig["type"]):
+                with self.assertRaises(ValueError) as context:
+                    validateDeployments([deploymentConfig])
+                self.assertIn(expectedError, str(context.exception))
+
+    def test_validateDeployments_aggregatesErrors(self):
+        # All invalid deployments are reported in a single error, valid ones are ignored
+        deploymentConfigs = [
+            {"type": "azure", "endpoint": "", "deploymentName": "o3", "apiVersion": "2024-12-01-preview"},
+            {"type": "openai", "endpoint": "https://api.openai.com/v1", "deploymentName": "gpt-4o", "apiVersion": ""},
+            {"type": "unknown", "endpoint": "https://unknown-endpoint.com/api", "deploymentName": "other", "apiVersion": ""},
+        ]
+        with self.assertRaises(ValueError) as context:
+            validateDeployments(deploymentConfigs)
+        message = str(context.exception)
+        self.assertIn("o3: Missing required Azure OpenAI configuration.", message)
+        self.assertIn("other: Unknown deployment type: unknown", message)
+        self.assertNotIn("gpt-4o", message)
+
+    def test_apiKey_cached(self):
+        # The environment is only read on the first lookup
+        with patch.dict(os.environ, {"AZURE_OPENAI_API_KEY": "first-key"}):
+            self.assertEqual(_apiKey("azure"), "first-key")
+        with patch.dict(os.environ, {"AZURE_OPENAI_API_KEY": "second-key"}):
+            self.assertEqual(_apiKey("azure"), "first-key")
+            _apiKey.cache_clear()
+            self.assertEqual(_apiKey("azure"), "second-key")
+
+    def test_getSettings_shared(self):
+        # settings.ini is opened once; every caller gets the same QSettings object
+        self.assertIs(getSettings(), getSettings())
+
+    def test_setSettingIfChanged(self):
+        # Only new or different values are written
+        from PySide6.QtCore import QSettings
+
+        with tempfile.TemporaryDirectory() as tempDir:
+            settings = QSettings(os.path.join(tempDir, "settings.ini"), QSettings.Format.IniFormat)
+            self.assertTrue(setSettingIfChanged(settings, "App/theme", "dark"))
+            self.assertFalse(setSettingIfChanged(settings, "App/theme", "dark"))
+            self.assertTrue(setSettingIfChanged(settings, "App/theme", "light"))
+            self.assertEqual(settings.value("App/theme"), "light")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,233 @@
+import os
+import json
+import tempfile
+import unittest
+from unittest.mock import patch
+from obeliscaDivergencia.utils.database import ConversationDatabase
+
+
+class TestConversationDatabase(unittest.TestCase):
+    def setUp(self):
+        self.db = ConversationDatabase(":memory:")
+        self.conversationId = self.db.addConversation("Test", "test-deployment", [])
+
+    def tearDown(self):
+        self.db.close()
+
+    def getAttachedPaths(self, conversationId: int) -> list:
+        cursor = self.db.conn.execute(
+            """
+            SELECT f.file_path FROM files f
+            INNER JOIN conversation_attachements ca ON f.id = ca.file_id
+            WHERE ca.conversation_id = ?
+            ORDER BY f.file_path
+        """,
+            (conversationId,),
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    def test_getAllConversations(self):
+        # Test that the summaries are returned newest first, without the conversation history
+        otherId = self.db.addConversation("Other", "other-deployment", [{"role": "user", "content": "Hi"}], tokens=5)
+        conversations = self.db.getAllConversations()
+        self.assertEqual([row[0] for row in conversations], [otherId, self.conversationId])
+        self.assertEqual(conversations[0][1], "Other")
+        self.assertEqual(conversations[0][2], "other-deployment")
+        self.assertEqual(conversations[0][4], 5)
+        self.assertEqual(len(conversations[0]), 5)
+
+    def test_getAllConversations_usesCreatedAtIndex(self):
+        # Test that the newest-first order is read from the index instead of sorting the table
+        statements = []
+        self.db.conn.set_trace_callback(statements.append)
+        self.db.getAllConversations()
+        self.db.conn.set_trace_callback(None)
+        plan = " ".join(row[3] for row in self.db.conn.execute("EXPLAIN QUERY PLAN " + statements[-1]))
+        self.assertIn("idx_conv_created", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_getConversationById_roundTripsHistory(self):
+        # Test that the history is stored and loaded unchanged, including non-ASCII text
+        history = [{"role": "user", "content": "Grüße 👋"}, {"role": "assistant", "content": "Hi\n\"there\""}]
+        self.db.updateConversationHistory(self.conversationId, history)
+        conversation = self.db.getConversationById(self.conversationId)
+        self.assertEqual(conversation["conversation_history"], history)
+
+    def test_getConversationById_withoutHistory(self):
+        # Test that the summary columns are returned without reading the messages
+        self.db.updateConversationHistory(self.conversationId, [{"role": "user", "content": "one"}])
+        with patch.object(self.db, "getConversationHistory") as getConversationHistory:
+            conversation = self.db.getConversationById(self.conversationId, includeHistory=False)
+        getConversationHistory.assert_not_called()
+        self.assertNotIn("conversation_history", conversation)
+        self.assertEqual(conversation["id"], self.conversationId)
+
+    def test_getConversationText(self):
+        # Test that the message contents are joined in order, one per line
+        history = [{"role": "user", "content": "system"}, {"role": "assistant", "content": "two\nlines"}]
+        self.db.updateConversationHistory(self.conversationId, history)
+        self.assertEqual(self.db.getConversationText(self.conversationId), "system\ntwo\nlines")
+
+    def test_updateConversationHistory_appendsAndTrims(self):
+        # Test that appended and trimmed messages are reflected without touching the kept rows
+        history = [{"role": "user", "content": "system"}, {"role": "user", "content": "one"}]
+        self.db.updateConversationHistory(self.conversationId, history)
+        keptRow = self.db.conn.execute("SELECT rowid FROM messages WHERE content = 'one'").fetchone()
+
+        history = history + [{"role": "assistant", "content": "two"}, {"role": "user", "content": "three"}]
+        self.db.updateConversationHistory(self.conversationId, history)
+        self.assertEqual(self.db.getConversationHistory(self.conversationId), history)
+        self.assertEqual(self.db.conn.execute("SELECT rowid FROM messages WHERE content = 'one'").fetchone(), keptRow)
+
+        trimmedHistory = [history[0]] + history[2:] + [{"role": "assistant", "content": "four"}]
+        self.db.updateConversationHistory(self.conversationId, trimmedHistory)
+        self.assertEqual(self.db.getConversationHistory(self.conversationId), trimmedHistory)
+
+    def test_updateConversationHistory_rewritesChangedHistory(self):
+        # Test that a history which is not an append/trim of the stored one is replaced completely
+        self.db.updateConversationHistory(self.conversationId, [{"role": "user", "content": "a"}, {"role": "user", "content": "b"}])
+        newHistory = [{"role": "user", "content": "x"}, {"role": "assistant", "content": "b"}]
+        self.db.updateConversationHistory(self.conversationId, newHistory)
+        self.assertEqual(self.db.getConversationHistory(self.conversationId), newHistory)
+
+    def test_updateConversationState(self):
+        # Test that history and tokens are saved together
+        history = [{"role": "user", "content": "system"}, {"role": "assistant", "content": "Hello"}]
+        self.db.updateConversationState(self.conversationId, history, 42)
+        conversation = self.db.getConversationById(self.conversationId)
+        self.assertEqual(conversation["conversation_history"], history)
+        self.assertEqual(conversation["tokens"], 42)
+
+    def test_updateConversationTokens_skipsUnchangedCount(self):
+        # Test that setting the same token count again does not write the row
+        self.db.updateConversationTokens(self.conversationId, 7)
+        changes = self.db.conn.total_changes
+        self.db.updateConversationTokens(self.conversationId, 7)
+        self.assertEqual(self.db.conn.total_changes, changes)
+        self.assertEqual(self.db.getConversationTokens(self.conversationId), 7)
+
+    def test_migrateConversationHistories(self):
+        # Test that histories stored in the legacy JSON column are moved to the messages table
+        history = [{"role": "user", "content": "system"}, {"role": "assistant", "content": "Hello"}]
+        self.db.conn.execute(
+            "UPDATE conversations SET conversation_history = ? WHERE id = ?", (json.dumps(history), self.conversationId)
+        )
+        self.db.migrateConversationHistories()
+        self.assertEqual(self.db.getConversationById(self.conversationId)["conversation_history"], history)
+        storedJson = self.db.conn.execute("SELECT conversation_history FROM conversations").fetchone()[0]
+        self.assertEqual(storedJson, ConversationDatabase.EMPTY_HISTORY)
+
+    def test_deleteConversationById_deletesMessages(self):
+        # Test that the messages of a deleted conversation are removed as well
+        self.db.updateConversationHistory(self.conversationId, [{"role": "user", "content": "system"}])
+        self.db.deleteConversationById(self.conversationId)
+        self.assertEqual(self.db.conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0], 0)
+
+    def test_recordAttachmentsForConversation(self):
+        # Test that all files and their relationships are recorded
+        self.db.recordAttachmentsForConversation(self.conversationId, ["/a.txt", "/b.txt"])
+        self.assertEqual(self.getAttachedPaths(self.conversationId), ["/a.txt", "/b.txt"])
+
+    def test_recordAttachmentsForConversation_existingFiles(self):
+        # Test that files already known from another conversation are reused, not duplicated
+        otherId = self.db.addConversation("Other", "test-deployment", [])
+        self.db.recordAttachmentsForConversation(otherId, ["/a.txt"])
+        self.db.recordAttachmentsForConversation(self.conversationId, ["/a.txt", "/a.txt", "/b.txt"])
+        self.assertEqual(self.getAttachedPaths(self.conversationId), ["/a.txt", "/b.txt"])
+        self.assertEqual(self.db.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0], 2)
+
+    def test_recordAttachmentsForConversation_manyFiles(self):
+        # Test more files than fit into a single query
+        filePaths = [f"/file{i:04d}.txt" for i in range(ConversationDatabase.MAX_QUERY_PARAMETERS * 2 + 1)]
+        self.db.recordAttachmentsForConversation(self.conversationId, filePaths)
+        self.assertEqual(self.getAttachedPaths(self.conversationId), filePaths)
+
+    def test_recordAttachmentsForConversation_smallBatches(self):
+        # Test that files split over several transactions, including repeated ones, are all recorded once
+        filePaths = ["/a.txt", "/b.txt", "/c.txt", "/a.txt", "/d.txt"]
+        self.db.recordAttachmentsForConversation(self.conversationId, filePaths, batchSize=2)
+        self.assertEqual(self.getAttachedPaths(self.conversationId), ["/a.txt", "/b.txt", "/c.txt", "/d.txt"])
+
+    def test_recordAttachmentsForConversation_paddedLookup(self):
+        # Test that a batch padded to the next power of two records each file exactly once
+        filePaths = ["/a.txt", "/b.txt", "/c.txt", "/d.txt", "/e.txt"]
+        self.db.recordAttachmentsForConversation(self.conversationId, filePaths, batchSize=8)
+        self.assertEqual(self.getAttachedPaths(self.conversationId), filePaths)
+
+    def test_removeAttachment(self):
+        # Test that only the given file is detached from the conversation
+        self.db.recordAttachmentsForConversation(self.conversationId, ["/a.txt", "/b.txt"])
+        self.db.removeAttachment(self.conversationId, "/a.txt")
+        self.assertEqual(self.db.getAttachedFiles(self.conversationId), ["/b.txt"])
+
+    def test_removeAttachments(self):
+        # Test that several files are detached at once and unknown paths are ignored
+        self.db.recordAttachmentsForConversation(self.conversationId, ["/a.txt", "/b.txt", "/c.txt"])
+        self.db.removeAttachments(self.conversationId, ["/a.txt", "/c.txt", "/missing.txt"])
+        self.assertEqual(self.db.getAttachedFiles(self.conversationId), ["/b.txt"])
+
+    def test_fileDatabase_usesWal(self):
+        # Test that a database file is opened in WAL mode
+        with tempfile.TemporaryDirectory() as tempDir:
+            db = ConversationDatabase(os.path.join(tempDir, "test.db"))
+            try:
+                self.assertEqual(db.journalMode, "wal")
+                self.assertEqual(db.conn.execute("PRAGMA journal_size_limit").fetchone()[0], 67108864)
+            finally:
+                db.close()
+
+    def test_appendConversationMessages(self):
+        # Test that appended messages follow the stored ones and the tokens count is updated
+        history = [{"role": "user", "content": "System"}, {"role": "user", "content": "Hi"}]
+        self.db.updateConversationState(self.conversationId, history, 3)
+        newMessages = [{"role": "assistant", "content": "Hello"}, {"role": "user", "content": "Bye"}]
+        self.assertTrue(self.db.appendConversationMessages(self.conversationId, newMessages, 7))
+        self.assertEqual(self.db.getConversationHistory(self.conversationId), history + newMessages)
+        self.assertEqual(self.db.getConversationById(self.conversationId)["tokens"], 7)
+
+    def test_transaction_rollsBackOnError(self):
+        # Test that a failing transaction leaves no partial writes behind
+        with self.assertRaises(RuntimeError):
+            with self.db._transaction():
+                self.db.conn.execute("UPDATE conversations SET title = 'Changed'")
+                raise RuntimeError("fail")
+        self.assertEqual(self.db.getConversationById(self.conversationId)["title"], "Test")
+
+    def test_deleteConversationById_deletesOrphanedFiles(self):
+        # Test that only files no longer attached to any conversation are removed
+        otherId = self.db.addConversation("Other", "test-deployment", [])
+        self.db.recordAttachmentsForConversation(self.conversationId, ["/a.txt", "/b.txt"])
+        self.db.recordAttachmentsForConversation(otherId, ["/b.txt"])
+        self.db.deleteConversationById(self.conversationId)
+        filePaths = [row[0] for row in self.db.conn.execute("SELECT file_path FROM files")]
+        self.assertEqual(filePaths, ["/b.txt"])
+
+    def test_replaceDefaultConversationTitle(self):
+        # Test that only a default title is replaced
+        conversationId = self.db.addConversation("Conversation 2", "test-deployment", [])
+        self.assertTrue(self.db.replaceDefaultConversationTitle(conversationId, "First question"))
+        self.assertFalse(self.db.replaceDefaultConversationTitle(conversationId, "Second question"))
+        self.assertFalse(self.db.replaceDefaultConversationTitle(self.conversationId, "Other question"))
+        self.assertEqual(self.db.getConversationById(conversationId, includeHistory=False)["title"], "First question")
+        self.assertEqual(self.db.getConversationById(self.conversationId, includeHistory=False)["title"], "Test")
+
+    def test_updateConversationTitles(self):
+        # Test that several titles are updated at once and other conversations keep theirs
+        otherId = self.db.addConversation("Other", "test-deployment", [])
+        keptId = self.db.addConversation("Kept", "test-deployment", [])
+        self.db.updateConversationTitles({self.conversationId: "First", otherId: "Second"})
+        titles = {row[0]: row[1] for row in self.db.getAllConversations()}
+        self.assertEqual(titles, {self.conversationId: "First", otherId: "Second", keptId: "Kept"})
+
+    def test_deleteConversationsByIds(self):
+        # Test that only the given conversations are deleted, together with their files
+        otherId = self.db.addConversation("Other", "test-deployment", [])
+        keptId = self.db.addConversation("Kept", "test-deployment", [])
+        self.db.recordAttachmentsForConversation(otherId, ["/a.txt"])
+        self.db.deleteConversationsByIds([self.conversationId, otherId])
+        self.assertEqual([row[0] for row in self.db.getAllConversations()], [keptId])
+        self.assertEqual(self.db.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,9 @@
 import unittest
 import os
-from obeliscaDivergencia.utils.fileUtils import normalizeFilePath, isBinaryFile, getRelativePath
+import tempfile
+from obeliscaDivergencia.utils.fileUtils import normalizeFilePath, isBinaryFile, getRelativePath, walkFiles, scanFiles
+
+BINARY_EXTENSIONS = frozenset({".png", ".exe"})
 
 
 class TestFileUtils(unittest.TestCase):
@@ -10,17 +13,46 @@ class TestFileUtils(unittest.TestCase):
         normalized = normalizeFilePath(path)
         self.assertEqual(normalized, "C:\\Users\\Documents\\file.txt")
 
-    def test_isBinaryFile_true(self):
-        # Test binary file detection
-        binaryExtensions = (".png", ".exe")
-        self.assertTrue(isBinaryFile("image.png", binaryExtensions))
-        self.assertTrue(isBinaryFile("installer.EXE", binaryExtensions))
-
-    def test_isBinaryFile_false(self):
-        # Test non-binary file detection
-        binaryExtensions = (".png", ".exe")
-        self.assertFalse(isBinaryFile("document.txt", binaryExtensions))
-        self.assertFalse(isBinaryFile("script.py", binaryExtensions))
+    def test_normalizeFilePath_cached(self):
+        # Test that repeated paths are answered from the cache
+        normalizeFilePath.cache_clear()
+        for _ in range(1000):
+            normalizeFilePath("folder/../file.txt")
+        self.assertEqual(normalizeFilePath.cache_info().hits, 999)
+
+    def test_isBinaryFile(self):
+        # Test binary and non-binary file detection
+        for filePath, expected in [("image.png", True), ("installer.EXE", True), ("document.txt", False), ("script.py", False)]:
+            with self.subTest(filePath=filePath):
+                self.assertIs(isBinaryFile(filePath, BINARY_EXTENSIONS), expected)
+        # Any container of extensions still works, e.g. a tuple
+        self.assertTrue(isBinaryFile("image.png", (".png", ".exe")))
+
+    def test_walkFiles_skipsBlacklistedFolders(self):
+        # Test that the walk yields files of nested folders but nothing below a blacklisted folder
+        with tempfile.TemporaryDirectory() as tempDir:
+            for relativePath in ("a.txt", os.path.join("sub", "b.txt"), os.path.join(".git", "config")):
+                fullPath = os.path.join(tempDir, relativePath)
+                os.makedirs(os.path.dirname(fullPath), exist_ok=True)
+                with open(fullPath, "w", encoding="utf-8") as fileHandle:
+                    fileHandle.write("data")
+
+            names = [entry.name for entry in walkFiles(tempDir, frozenset({".git"}))]
+            self.assertEqual(names, ["a.txt", "b.txt"])
+
+    def test_scanFiles_matchesWalkOrder(self):
+        # Test that the concurrent scan returns the same files in the same order as walkFiles
+        with tempfile.TemporaryDirectory() as tempDir:
+            for relativePath in ("a.txt", os.path.join("x", "b.txt"), os.path.join("x", "y", "c.txt"), os.path.join("z", "d.txt")):
+                fullPath = os.path.join(tempDir, relativePath)
+                os.makedirs(os.path.dirname(fullPath), exist_ok=True)
+                with open(fullPath, "w", encoding="utf-8") as fileHandle:
+                    fileHandle.write("data")
+
+            walked = [entry.path for entry in walkFiles(tempDir, frozenset())]
+            scanned = [entry.path for entry in scanFiles(tempDir, frozenset(), maxWorkers=4)]
+            self.assertEqual(scanned, walked)
+            self.assertEqual(len(scanned), 4)
 
     def test_getRelativePath(self):
         # Test relative path calculation
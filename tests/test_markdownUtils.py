@@ -1,5 +1,8 @@
+import threading
 import unittest
-from obeliscaDivergencia.utils.markdownUtils import convertMarkdownToHtml
+from unittest.mock import patch
+from obeliscaDivergencia.utils import markdownUtils
+from obeliscaDivergencia.utils.markdownUtils import convertMarkdownToHtml, getStyleSheet
 
 
 class TestMarkdownUtils(unittest.TestCase):
@@ -15,30 +18,70 @@ class TestMarkdownUtils(unittest.TestCase):
         markdown_text = "```python\nprint('Hello, World!')\n```"
         html = convertMarkdownToHtml(markdown_text)
         # self.assertIn("<code class=\"language-python\">", html)
-        self.assertIn(".codehilite", html)
+        self.assertIn(".codehilite", getStyleSheet())
         self.assertIn('class="codehilite"', html)
 
+    def test_convertMarkdownToHtml_reusesConverterCleanly(self):
+        # Test that the shared converter carries nothing over from the previous conversion
+        convertMarkdownToHtml("```python\nprint('Hello, World!')\n```")
+        html = convertMarkdownToHtml("Plain text")
+        self.assertIn("<p>Plain text</p>", html)
+        self.assertNotIn('class="codehilite"', html)
+
+    def test_convertMarkdownToHtml_cachesRepeatedText(self):
+        # Test that converting the same text again does not run the converter again
+        first = convertMarkdownToHtml("Cached **text**")
+        with patch.object(markdownUtils._converter(), "convert") as convert:
+            second = convertMarkdownToHtml("Cached **text**")
+        convert.assert_not_called()
+        self.assertEqual(first, second)
+
+    def test_convertMarkdownToHtml_reusesHighlightedCode(self):
+        # Test that a code block seen before is not highlighted again, even inside a different message
+        code = "```python\nprint('cached block')\n```"
+        first = convertMarkdownToHtml("First message\n\n" + code)
+        with patch.object(markdownUtils.CodeHilite, "hilite") as hilite:
+            second = convertMarkdownToHtml("Second message\n\n" + code)
+        hilite.assert_not_called()
+        self.assertIn('class="codehilite"', second)
+        self.assertEqual(first.split("</p>", 1)[1], second.split("</p>", 1)[1])
+
+    def test_convertMarkdownToHtml_plainTextSkipsMarkdown(self):
+        # Test that text without markdown is rendered like markdown would, without running the converter
+        text = "First line\nsecond line.\n\n\nNext paragraph: 42 (ok)?"
+        with patch.object(markdownUtils._converter(), "convert") as convert:
+            html = convertMarkdownToHtml(text)
+        convert.assert_not_called()
+        self.assertEqual(html, "<p>First line\nsecond line.</p>\n<p>Next paragraph: 42 (ok)?</p>")
+
+    def test_converter_perThread(self):
+        # Test that each thread gets its own converter and reuses it
+        results = []
+        thread = threading.Thread(target=lambda: results.append((markdownUtils._converter(), markdownUtils._converter())))
+        thread.start()
+        thread.join()
+        first, second = results[0]
+        self.assertIs(first, second)
+        self.assertIsNot(first, markdownUtils._converter())
+
     def test_convertMarkdownToHtml_empty(self):
         # Test empty markdown conversion
         markdown_text = ""
         html = convertMarkdownToHtml(markdown_text)
 
-        # Check for the presence of the <style> tag
-        self.assertIn("<style>", html)
-        self.assertIn("</style>", html)
+        # The style block is no longer part of the converted HTML
+        self.assertNotIn("<style>", html)
+        self.assertEqual(html.strip(), "")
 
+    def test_getStyleSheet(self):
         # Check for essential CSS rules
-        self.assertIn("word-wrap: break-word;", html)
-        self.assertIn("white-space: pre-wrap;", html)
-        self.assertIn(".codehilite {", html)
-        self.assertIn("font-family: 'Consolas', monospace;", html)
-        self.assertIn("background-color: #f0f0f0;", html)
-
-        # # Optionally, ensure there's no additional HTML content
-        # # This can be done by stripping the style block and checking the remainder
-        # stripped_html = html.replace("<style>", "").replace("</style>", "").strip()
-        # self.assertEqual(stripped_html, "")
-
+        css = getStyleSheet()
+        self.assertNotIn("<style>", css)
+        self.assertIn("word-wrap: break-word;", css)
+        self.assertIn("white-space: pre-wrap;", css)
+        self.assertIn(".codehilite {", css)
+        self.assertIn("font-family: 'Consolas', monospace;", css)
+        self.assertIn("background-color: #f0f0f0;", css)
 
 if __name__ == "__main__":
     unittest.main()